@@ -0,0 +1,94 @@
+"""Offline benchmark for quote-page price extraction.
+
+Usage:
+    python benchmarks/bench_extract.py
+    python benchmarks/bench_extract.py --repeat 50 --fixtures benchmarks/fixtures
+
+Runs every *.html fixture through the fast path, the BeautifulSoup path
+and the combined extract_price() chain, checks each result against
+fixtures/expected.json (and against the BeautifulSoup result), and prints
+per-fixture latency and speedup. Save real quote pages into the fixtures
+folder (and add their price to expected.json) to benchmark them too.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from stockitup.extract import extract_price, fast_extract, soup_extract, to_price
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def price_or_none(extractor, html):
+    text = extractor(html)
+    try:
+        return to_price(text) if text else None
+    except ValueError:
+        return None
+
+
+def best_of(fn, html, repeat):
+    """Best wall-clock time of `repeat` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def run(fixtures=FIXTURES, repeat=20):
+    expected_file = os.path.join(fixtures, "expected.json")
+    expected = {}
+    if os.path.exists(expected_file):
+        with open(expected_file, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+
+    results = []
+    for name in sorted(os.listdir(fixtures)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(fixtures, name), "r", encoding="utf-8") as f:
+            html = f.read()
+
+        fast = price_or_none(fast_extract, html)
+        soup = price_or_none(soup_extract, html)
+        chained = extract_price(html)
+        ok = chained == soup and (name not in expected or chained == expected[name])
+
+        results.append({
+            "fixture": name,
+            "bytes": len(html),
+            "price": chained,
+            "fast_hit": fast is not None,
+            "correct": ok,
+            "fast_ms": best_of(fast_extract, html, repeat),
+            "soup_ms": best_of(soup_extract, html, repeat),
+            "extract_ms": best_of(extract_price, html, repeat),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark price extraction over saved HTML")
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = run(args.fixtures, args.repeat)
+    print(f"{'fixture':36} {'KB':>6} {'price':>10} {'fast':>5} {'soup ms':>9} {'chain ms':>9} {'speedup':>8}  ok")
+    for r in results:
+        speedup = r["soup_ms"] / r["extract_ms"] if r["extract_ms"] else float("inf")
+        print(f"{r['fixture']:36} {r['bytes'] / 1024:6.0f} {str(r['price']):>10} "
+              f"{'hit' if r['fast_hit'] else 'miss':>5} {r['soup_ms']:9.3f} {r['extract_ms']:9.3f} "
+              f"{speedup:7.0f}x  {'✅' if r['correct'] else '❌'}")
+
+    if not all(r["correct"] for r in results):
+        raise SystemExit("❌ Extraction mismatch")
+
+
+if __name__ == "__main__":
+    main()
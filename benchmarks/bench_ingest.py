@@ -0,0 +1,110 @@
+"""Per-tick ingest cost versus history length.
+
+Usage:
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --sizes 10000 100000 --ticks 500
+
+For synthetic histories of each size, times one collector write: the
+JSONL append, the column-store append and the candle update, plus the
+candle builder's resume on a restart. For comparison it also times the old
+whole-file JSON array rewrite, up to LEGACY_MAX ticks, because past that
+size a single write takes seconds. Every cost should stay flat as history
+grows, except the legacy one.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.synthetic import STEP_MS, make_array, make_log
+from stockitup.candles import CandleBuilder
+from stockitup.colstore import open_columns
+from stockitup.ticklog import append_tick, last_entry, parse_ts_ms
+
+SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_MAX = 100_000
+
+
+def legacy_append(array_file, entry):
+    """The collectors' original append_to_array: read, append, rewrite"""
+    with open(array_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data.append(entry)
+    with open(array_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def per_call_us(fn, calls):
+    t0 = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+def run(workdir, sizes=SIZES, ticks=200):
+    results = []
+    scratch = tempfile.mkdtemp(dir=workdir)  # written to; the synthetic logs are reused
+    for n in sizes:
+        base = make_log(os.path.join(workdir, "ingest.jsonl"), n)
+        log_file = os.path.join(scratch, f"ingest_{n}.jsonl")
+        shutil.copy(base, log_file)
+        last = last_entry(log_file)
+        start = parse_ts_ms(last["timestamp"])
+
+        def entry(i):
+            ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime((start + (i + 1) * STEP_MS) / 1000))
+            return {"ticker": "BENCH", "exchange": "NSE", "price": 1000.0 + i % 7, "timestamp": ts}
+
+        CandleBuilder(log_file)  # the first start writes the closed candles
+        t0 = time.perf_counter()
+        candles = CandleBuilder(log_file)
+        resume_ms = (time.perf_counter() - t0) * 1000
+        columns = open_columns(log_file, "BENCH")
+
+        row = {
+            "ticks": n,
+            "append_us": per_call_us(lambda i: append_tick(log_file, entry(i)), ticks),
+            "columns_us": per_call_us(lambda i: columns.append(start + (ticks + i + 1) * STEP_MS, 1000.0), ticks),
+            "candles_us": per_call_us(lambda i: candles.update(start + (i + 1) * STEP_MS, 1000.0 + i % 7), ticks),
+            "candles_resume_ms": resume_ms,
+            "legacy_array_ms": None,
+        }
+        columns.close()
+
+        if n <= LEGACY_MAX:
+            array_file = make_array(base)
+            work_array = os.path.join(scratch, f"ingest_{n}.json")
+            shutil.copy(array_file, work_array)
+            row["legacy_array_ms"] = per_call_us(lambda i: legacy_append(work_array, entry(i)), 3) / 1000
+        results.append(row)
+    shutil.rmtree(scratch)
+    return results
+
+
+def print_table(results):
+    print(f"{'ticks':>10} {'append us':>10} {'columns us':>11} {'candles us':>11} {'resume ms':>10} {'legacy ms':>10}")
+    for r in results:
+        legacy = f"{r['legacy_array_ms']:10.1f}" if r["legacy_array_ms"] is not None else f"{'-':>10}"
+        print(f"{r['ticks']:>10} {r['append_us']:10.1f} {r['columns_us']:11.1f} {r['candles_us']:11.1f} "
+              f"{r['candles_resume_ms']:10.1f} {legacy}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-tick ingest cost")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--workdir", help="keep synthetic data here (default: a temp dir)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="stockitup-bench-")
+    print_table(run(workdir, args.sizes, args.ticks))
+    if not args.workdir:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
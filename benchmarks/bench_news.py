@@ -0,0 +1,117 @@
+"""Throughput of scripts/build_news.py against a local stand-in for NewsAPI.
+
+Usage:
+    python benchmarks/bench_news.py
+    python benchmarks/bench_news.py --latency-ms 200 --articles 50
+    NEWS_RATE=100 NEWS_BURST=100 python benchmarks/bench_news.py
+
+Starts a stub API on an ephemeral port that answers every topic with
+`--articles` articles after `--latency-ms`, then runs build_news.py twice
+in a scratch directory: a full build, then an incremental run that finds
+nothing new. NEWS_CONCURRENCY / NEWS_RATE / NEWS_BURST are passed
+through, so their effect can be measured; with the defaults the rate
+limiter, not the stub, sets the pace.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPT = os.path.join(ROOT, "scripts", "build_news.py")
+
+
+def make_stub(articles: int, latency_ms: float):
+    """Stub NewsAPI server; counts the requests it answers"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            topic = query.get("q", [""])[0]
+            time.sleep(latency_ms / 1000)
+            body = json.dumps({"status": "ok", "articles": [{
+                "title": f"{topic} story {i}",
+                "url": f"https://example.com/{topic.replace(' ', '-')}/{i}",
+                "source": {"name": "Bench Wire"},
+                "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1_700_000_000 + i * 60)),
+                "urlToImage": None,
+            } for i in range(articles)]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with server.lock:
+                server.requests += 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = 0
+    return server
+
+
+def timed_run(cwd, env):
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, SCRIPT], cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode:
+        raise SystemExit(f"❌ build_news.py failed:\n{proc.stdout}{proc.stderr}")
+    return elapsed
+
+
+def run(articles=20, latency_ms=50.0):
+    server = make_stub(articles, latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    env = dict(os.environ, NEWSAPI_KEY="bench",
+               NEWSAPI_BASE_URL=f"http://127.0.0.1:{server.server_port}/v2/everything")
+    env.pop("NEWS_FULL", None)
+    try:
+        with tempfile.TemporaryDirectory(prefix="stockitup-news-") as cwd:
+            full_s = timed_run(cwd, env)
+            full_requests = server.requests
+            incremental_s = timed_run(cwd, env)
+            with open(os.path.join(cwd, "news.json"), "r", encoding="utf-8") as f:
+                written = len(json.load(f))
+    finally:
+        server.shutdown()
+        server.server_close()
+    fetched = full_requests * articles
+    return {
+        "latency_ms": latency_ms,
+        "concurrency": env.get("NEWS_CONCURRENCY", "default"),
+        "rate": env.get("NEWS_RATE", "default"),
+        "requests": full_requests,
+        "articles_fetched": fetched,
+        "articles_written": written,
+        "full_s": full_s,
+        "incremental_s": incremental_s,
+        "articles_per_s": fetched / full_s if full_s else None,
+    }
+
+
+def print_table(r):
+    print(f"{'requests':>8} {'fetched':>8} {'written':>8} {'full s':>8} {'incr s':>8} {'articles/s':>11}")
+    print(f"{r['requests']:>8} {r['articles_fetched']:>8} {r['articles_written']:>8} "
+          f"{r['full_s']:8.2f} {r['incremental_s']:8.2f} {r['articles_per_s']:11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark build_news.py against a stub API")
+    parser.add_argument("--articles", type=int, default=20, help="articles per topic")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="stub response delay")
+    args = parser.parse_args()
+    print_table(run(args.articles, args.latency_ms))
+
+
+if __name__ == "__main__":
+    main()
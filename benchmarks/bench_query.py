@@ -0,0 +1,88 @@
+"""Range-query latency for every chart range.
+
+Usage:
+    python benchmarks/bench_query.py
+    python benchmarks/bench_query.py --ticks 1000000 --repeat 10
+
+Builds one synthetic history (with its candle files and column store, as
+a running collector would leave them), then times query_series for every
+RANGE_OPTIONS key over both on-disk indexes: TickIndex, which parses the
+log itself, and ColumnIndex, which memory-maps the columns. Cold index
+construction is timed separately. The source column shows whether a
+range was answered from raw ticks or from candles.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.synthetic import make_log
+from stockitup.candles import CandleBuilder
+from stockitup.colstore import ColumnIndex, columns_dir_for, open_columns
+from stockitup.series import MAX_POINTS, RANGE_OPTIONS, TickIndex, query_series
+
+TICKS = 100_000
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def run(workdir, ticks=TICKS, repeat=20):
+    log_file = make_log(os.path.join(workdir, "query.jsonl"), ticks)
+    CandleBuilder(log_file)
+    open_columns(log_file, "BENCH").close()
+
+    indexes = {
+        "log": lambda: TickIndex(log_file, "BENCH").refresh(),
+        "columns": lambda: ColumnIndex(columns_dir_for(log_file), "BENCH", log_file).refresh(),
+    }
+    results = []
+    for kind, build in indexes.items():
+        t0 = time.perf_counter()
+        index = build()
+        build_ms = (time.perf_counter() - t0) * 1000
+        for range_key in RANGE_OPTIONS:
+            result = query_series(index, range_key, MAX_POINTS)
+            results.append({
+                "index": kind,
+                "ticks": ticks,
+                "range": range_key,
+                "source": result["source"],
+                "points": len(result["timestamps"]),
+                "build_ms": build_ms,
+                "query_ms": best_ms(lambda: query_series(index, range_key, MAX_POINTS), repeat),
+            })
+    return results
+
+
+def print_table(results):
+    print(f"{'index':8} {'ticks':>9} {'range':>6} {'source':>12} {'points':>7} {'build ms':>9} {'query ms':>9}")
+    for r in results:
+        print(f"{r['index']:8} {r['ticks']:>9} {r['range']:>6} {r['source']:>12} {r['points']:>7} "
+              f"{r['build_ms']:9.1f} {r['query_ms']:9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark range queries")
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workdir", help="keep synthetic data here (default: a temp dir)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="stockitup-bench-")
+    print_table(run(workdir, args.ticks, args.repeat))
+    if not args.workdir:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Run every benchmark and save the numbers for comparison across commits.
+
+Usage:
+    python benchmarks/run_all.py
+    python benchmarks/run_all.py --sizes 10000 100000 --skip news
+    python benchmarks/run_all.py --compare benchmarks/results/<earlier run>.json
+
+Sections: ingest (per-tick write cost at each history size), query (every
+chart range), extract (quote-page parsing over the HTML fixtures) and
+news (build_news.py against a stub API). Results go to
+benchmarks/results/<UTC time>-<commit>.json along with the commit,
+Python and NumPy versions. --compare prints each metric next to the
+same metric from an earlier file. Times are all "lower is better", apart
+from articles/s.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks import bench_extract, bench_ingest, bench_news, bench_query
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "results")
+SECTIONS = ("ingest", "query", "extract", "news")
+HIGHER_IS_BETTER = ("articles_per_s",)
+
+
+def git_commit() -> str:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results: dict) -> dict:
+    """{'ingest.100000.append_us': 27.5, ...} for every numeric metric"""
+    keys = {"ingest": ("ticks",), "query": ("index", "range"), "extract": ("fixture",)}
+    per_index = {"build_ms"}  # repeated on every range row of an index
+    flat = {}
+    for section, rows in results.items():
+        for row in rows if isinstance(rows, list) else [rows]:
+            for name, value in row.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                if not name.endswith(("_us", "_ms", "_s")):
+                    continue
+                fields = ("index",) if name in per_index else keys.get(section, ())
+                flat[".".join([section] + [str(row[k]) for k in fields] + [name])] = value
+    return flat
+
+
+def compare(current: dict, baseline_file: str):
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before, after = flatten(baseline["results"]), flatten(current["results"])
+    print(f"\n📁 Compared with {os.path.basename(baseline_file)} ({baseline['meta']['commit']})")
+    print(f"{'metric':52} {'before':>10} {'after':>10} {'change':>8}")
+    for key in sorted(after.keys() & before.keys()):
+        old, new = before[key], after[key]
+        change = (new - old) / old * 100 if old else 0.0
+        worse = change < -10 if key.endswith(HIGHER_IS_BETTER) else change > 10
+        print(f"{key:52} {old:10.3f} {new:10.3f} {change:+7.0f}%{'  ⚠️' if worse else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all benchmarks and save the results")
+    parser.add_argument("--sizes", type=int, nargs="+", default=bench_ingest.SIZES, help="ingest history sizes")
+    parser.add_argument("--query-ticks", type=int, default=bench_query.TICKS)
+    parser.add_argument("--skip", nargs="+", choices=SECTIONS, default=[])
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--workdir", help="keep synthetic data here between runs (default: a temp dir)")
+    parser.add_argument("--out", help="results file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="stockitup-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    results = {}
+    try:
+        if "ingest" not in args.skip:
+            print("💹 Ingest")
+            results["ingest"] = bench_ingest.run(workdir, args.sizes)
+            bench_ingest.print_table(results["ingest"])
+        if "query" not in args.skip:
+            print("\n💹 Range queries")
+            results["query"] = bench_query.run(workdir, args.query_ticks)
+            bench_query.print_table(results["query"])
+        if "extract" not in args.skip:
+            print("\n💹 Price extraction")
+            results["extract"] = bench_extract.run()
+            for r in results["extract"]:
+                print(f"{r['fixture']:36} {r['extract_ms']:9.3f} ms {'✅' if r['correct'] else '❌'}")
+        if "news" not in args.skip:
+            print("\n💹 News build")
+            results["news"] = bench_news.run()
+            bench_news.print_table(results["news"])
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir)
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📁 Saved {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
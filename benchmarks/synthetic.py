@@ -0,0 +1,44 @@
+"""Synthetic tick logs for the benchmarks (deterministic, so runs compare)."""
+import json
+import os
+import random
+import time
+
+STEP_MS = 10 * 1000  # the collector's default poll interval
+END_MS = 1_758_794_400_000  # 2025-09-25 10:00 UTC: a fixed end, so every run gets the same ticks
+
+
+def make_log(path: str, n: int, ticker: str = "BENCH", end_ms: int = END_MS, seed: int = 7) -> str:
+    """Write an n-tick JSONL log ending at `end_ms`; returns its path.
+
+    The file name gets the parameters (foo.jsonl -> foo.BENCH-1000-7-<end_ms>.jsonl),
+    so a log left by an earlier run is reused only if it holds the same ticks.
+    """
+    root, ext = os.path.splitext(path)
+    path = f"{root}.{ticker}-{n}-{seed}-{end_ms}{ext}"
+    if os.path.exists(path):
+        return path
+    rng = random.Random(seed)
+    t = end_ms - (n - 1) * STEP_MS
+    price = 1000.0
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for _ in range(n):
+            price = round(price * (1 + rng.gauss(0, 0.0005)), 2)
+            ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t / 1000))
+            f.write(json.dumps({"ticker": ticker, "exchange": "NSE", "price": price, "timestamp": ts},
+                               separators=(",", ":")) + "\n")
+            t += STEP_MS
+    os.replace(tmp, path)
+    return path
+
+
+def make_array(log_file: str) -> str:
+    """Legacy JSON array with the same ticks as a log, next to it (same key)"""
+    path = os.path.splitext(log_file)[0] + ".json"
+    if not os.path.exists(path):
+        with open(log_file, "r", encoding="utf-8") as src:
+            data = [json.loads(line) for line in src]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    return path
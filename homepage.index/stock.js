@@ -39,35 +39,74 @@ document.addEventListener('DOMContentLoaded', () => {
     if(list.length===0){ul.innerHTML='<div style="color:var(--muted);padding:8px">No tickers yet.</div>';return}
     list.forEach(t=>{
       const li=document.createElement('li');
-      li.innerHTML=`<div style="font-weight:700">${t}</div><div style="opacity:0.8">-- $</div>`;
+      li.innerHTML=`<div style="font-weight:700">${t}</div><div class="watch-price" data-ticker="${t}" style="opacity:0.8">-- $</div>`;
       const rm=document.createElement('button');rm.textContent='Remove';rm.className='input';rm.style.marginLeft='8px';
       rm.onclick=()=>{saveWatch(loadWatch().filter(x=>x!==t));renderWatch()};
       li.appendChild(rm);ul.appendChild(li);
     });
+    refreshQuotes();
   }
 
-  // News
+  // Live quotes for the whole watchlist in one request (served by the Python
+  // API; on a static host the prices just stay "--")
+  const QUOTES_API='/api/quotes', QUOTES_EVERY_MS=5000;
+  async function refreshQuotes(){
+    const list=loadWatch(); if(list.length===0)return;
+    try{
+      const r=await fetch(`${QUOTES_API}?tickers=${encodeURIComponent(list.join(','))}`,{cache:'no-store'});
+      if(!r.ok||!(r.headers.get('content-type')||'').includes('application/json'))return;
+      const {quotes}=await r.json();
+      document.querySelectorAll('#watch-ul .watch-price').forEach(d=>{
+        const q=quotes[d.dataset.ticker]; if(!q)return;
+        const sign=q.change>0?'+':'';
+        const pct=q.change_pct!=null?`, ${sign}${q.change_pct.toFixed(2)}%`:'';
+        d.textContent=`${q.price.toFixed(2)} (${sign}${q.change.toFixed(2)}${pct})`;
+        d.style.color=q.change>0?'#2ecc71':q.change<0?'#ff6b6b':'';
+        d.title=`Last tick ${q.timestamp}`;
+      });
+    }catch(e){}
+  }
+
+  // News: ranked search served by the Python API (/api/news/search, one page
+  // per request); on a static host, filter news.json here instead
+  const NEWS_API='/api/news/search', NEWS_FILE='../news.json', NEWS_PER_PAGE=10;
+  const timeAgo=iso=>{const m=Math.round((Date.now()-new Date(iso))/60000);return isNaN(m)?'':m<60?`${m}m`:m<1440?`${Math.round(m/60)}h`:`${Math.round(m/1440)}d`};
+  async function searchNews(q){
+    try{
+      const r=await fetch(`${NEWS_API}?${new URLSearchParams({q,per_page:NEWS_PER_PAGE})}`,{cache:'no-store'});
+      if(r.ok&&(r.headers.get('content-type')||'').includes('application/json'))return (await r.json()).results;
+    }catch(e){}
+    const r=await fetch(NEWS_FILE,{cache:'no-cache'});
+    if(!r.ok)throw new Error(r.status);
+    const terms=q.toLowerCase().split(/[^a-z0-9]+/).filter(Boolean);
+    return (await r.json()).filter(a=>terms.every(t=>`${a.title} ${a.topic} ${a.source}`.toLowerCase().includes(t))).slice(0,NEWS_PER_PAGE);
+  }
   async function fetchNews(){
     const list=el('news-list'); list.innerHTML='<div style="color:var(--muted)">Loading news...</div>';
     try{
-      await new Promise(r=>setTimeout(r,500));
-      const items=[{title:'Markets drift higher as earnings season begins',time:'1h'},{title:'Tech leads gains; chipmakers rally',time:'2h'},{title:'Economists watch inflation data closely',time:'4h'}];
+      const items=await searchNews(el('news-query').value.trim());
       list.innerHTML='';
+      if(items.length===0){list.innerHTML='<div style="color:var(--muted)">No matching news.</div>';return}
       items.forEach(it=>{
         const d=document.createElement('div');d.className='news-item';
-        d.innerHTML=`<strong>${it.title}</strong><div style="font-size:12px;color:var(--muted);margin-top:6px">${it.time} ago — quick summary</div>`;
-        list.appendChild(d);
+        const a=document.createElement('a');a.href=it.url;a.target='_blank';a.rel='noopener';
+        const s=document.createElement('strong');s.textContent=it.title||'';a.appendChild(s);d.appendChild(a);
+        const meta=document.createElement('div');meta.style.cssText='font-size:12px;color:var(--muted);margin-top:6px';
+        meta.textContent=`${timeAgo(it.publishedAt)} ago — ${it.source||''} · ${it.topic||''}`;
+        d.appendChild(meta);list.appendChild(d);
       });
     }catch(e){list.innerHTML='<div style="color:var(--muted)">Failed to load news.</div>'}
   }
 
   // Init
   initChart(); renderWatch(); fetchNews(); startSim(1000);
+  setInterval(refreshQuotes,QUOTES_EVERY_MS);
 
   el('add-btn').onclick=()=>{const val=el('ticker-input').value.trim().toUpperCase();if(!val)return;const list=loadWatch();if(!list.includes(val)){list.push(val);saveWatch(list);renderWatch();}el('ticker-input').value='';};
   el('clear-btn').onclick=()=>{if(confirm('Clear watchlist?')){saveWatch([]);renderWatch();}};
   el('populate-btn').onclick=()=>{saveWatch(['AAPL','TSLA','GOOG','MSFT']);renderWatch();};
   el('refresh-news').onclick=fetchNews;
+  el('news-query').onkeydown=e=>{if(e.key==='Enter')fetchNews()};
   el('start').onclick=()=>{const iv=parseInt(el('interval').value.replace('s',''))||1;startSim(iv*1000)};
   el('stop').onclick=stopSim;
 });
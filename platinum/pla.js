@@ -1,7 +1,7 @@
 (function () {
   // -------- CONFIG --------
   const DISPLAY_TICKER = "ICICIBANK";       // Company name to display in tooltip
-  const DATA_URL = "../pla.json";           // Path to your JSON feed
+  const DATA_URL = "../pla.jsonl";           // Path to your JSON feed
   const POLL_INTERVAL_MS = 5000;            // Poll every 5s
   const MAX_POINTS = 200;                   // Show max 200 points
   const CHART_JS_CDN = "https://cdn.jsdelivr.net/npm/chart.js";
@@ -24,7 +24,6 @@
   let lastSelectedRangeKey = null;
   let lastPlottedTs = null;
   let lastPlottedPrice = null;
-  let observedLatestTs = null;
 
   // Debug UI
   function ensureDebugBox() {
@@ -213,68 +212,128 @@
     });
   }
 
+  // Tick logs are JSON Lines (one tick per line); fall back to the legacy
+  // JSON array when no log has been written yet.
   async function fetchJsonData(url, signal) {
     const r = await fetch(url, { cache: "no-store", signal });
+    const isLog = url.endsWith(".jsonl");
+    if (r.status === 404 && isLog) return fetchJsonData(url.slice(0, -1), signal);
     if (!r.ok) throw new Error(r.status + " " + r.statusText);
-    return r.json();
+    if (!isLog) return r.json();
+    const rows = [];
+    for (const line of (await r.text()).split("\n")) {
+      if (!line.trim()) continue;
+      try { rows.push(JSON.parse(line)); } catch { /* torn last line */ }
+    }
+    return rows;
+  }
+
+  // Series: windowed by the Python API (/api/series); on a static host,
+  // read from a prebuilt per-range snapshot (python -m stockitup.snapshots),
+  // or computed here from the raw tick feed.
+  const SERIES_API = "/api/series";
+  let seriesApiAvailable = true;
+  let snapshotsAvailable = true;
+  function snapshotUrl() {
+    const i = DATA_URL.lastIndexOf("/") + 1;
+    return `${DATA_URL.slice(0, i)}snapshots/${DATA_URL.slice(i).replace(/\.jsonl$/, "")}.${selectedRangeKey}.json`;
+  }
+
+  function seriesFromRows(json) {
+    const matches = json.filter(e => e.ticker === DISPLAY_TICKER);
+    if (!matches.length) {
+      showDebug(`No entries for ticker "${DISPLAY_TICKER}" in JSON.`, true);
+      return null;
+    }
+
+    // filter by range, relative to the latest timestamp in THIS dataset
+    const normalized = matches.map(r => ({ row: r, tsMs: parseRowTsMs(r) }));
+    const datasetLatestTs = Math.max(...normalized.map(n => n.tsMs || 0));
+    let filtered = normalized;
+    if (datasetLatestTs && RANGE_OPTIONS[selectedRangeKey] !== Infinity) {
+      const cutoff = datasetLatestTs - RANGE_OPTIONS[selectedRangeKey];
+      filtered = normalized.filter(n => n.tsMs && n.tsMs >= cutoff);
+      showDebug(`Range=${selectedRangeKey}, cutoff=${new Date(cutoff).toLocaleString()}, points=${filtered.length}`);
+    }
+
+    // build arrays
+    const labels = [], prices = [];
+    filtered.sort((a, b) => a.tsMs - b.tsMs).forEach(item => {
+      const p = parseFloat(item.row.price);
+      if (isFinite(p)) { labels.push(item.tsMs); prices.push(p); }
+    });
+
+    // dedup consecutive
+    const tsArr = [], priceArr = [];
+    for (let i = 0; i < prices.length; i++) {
+      if (!priceArr.length || !nearlyEqual(prices[i], priceArr[priceArr.length - 1])) {
+        priceArr.push(prices[i]); tsArr.push(labels[i]);
+      }
+    }
+
+    // enforce max
+    const keepFrom = Math.max(0, priceArr.length - MAX_POINTS);
+    return { timestamps: tsArr.slice(keepFrom), prices: priceArr.slice(keepFrom) };
+  }
+
+  // since = the cursor of the last response (the newest stored tick): the
+  // API then returns only newer ticks, and an unchanged feed answers 304.
+  // log = this page's feed, so the API reads the same file.
+  let seriesEtag = null, seriesEtagUrl = null;
+  async function fetchSeries(signal, since = null) {
+    if (seriesApiAvailable) {
+      try {
+        const params = {
+          ticker: DISPLAY_TICKER, range: selectedRangeKey, max_points: MAX_POINTS,
+          log: new URL(DATA_URL, location.href).pathname
+        };
+        if (since != null) params.since = since;
+        const url = `${SERIES_API}?${new URLSearchParams(params)}`;
+        const headers = url === seriesEtagUrl && seriesEtag ? { "If-None-Match": seriesEtag } : {};
+        const r = await fetch(url, { cache: "no-store", headers, signal });
+        if (r.status === 304) return { timestamps: [], prices: [] };
+        const isJson = (r.headers.get("content-type") || "").includes("application/json");
+        if (r.ok && isJson) {
+          seriesEtagUrl = url;
+          seriesEtag = r.headers.get("ETag");
+          return r.json();
+        }
+        if (!isJson) seriesApiAvailable = false; // static host, no API here
+      } catch (err) {
+        if (err.name === "AbortError") throw err;
+        seriesApiAvailable = false;
+      }
+    }
+    if (snapshotsAvailable) {
+      const r = await fetch(snapshotUrl(), { cache: "no-cache", signal });
+      if (r.ok) return r.json();
+      if (r.status === 404) snapshotsAvailable = false;
+    }
+    return seriesFromRows(await fetchJsonData(DATA_URL, signal));
   }
 
   // Chart updating
   let isUpdating = false, currentAbort = null, pollIntervalId = null;
+  let seriesCursor = null;
   async function updateChartFromJson(chart, opts = { forceFull: false }) {
     if (isUpdating) return;
     isUpdating = true;
     try {
       if (currentAbort) currentAbort.abort();
       currentAbort = new AbortController();
-      const json = await fetchJsonData(DATA_URL, currentAbort.signal);
-      const matches = json.filter(e => e.ticker === DISPLAY_TICKER);
-      if (!matches.length) {
-        showDebug(`No entries for ticker "${DISPLAY_TICKER}" in JSON.`, true);
+      const needFull = opts.forceFull || lastSelectedRangeKey !== selectedRangeKey || lastPlottedTs == null;
+      const series = await fetchSeries(currentAbort.signal, needFull ? null : (seriesCursor ?? lastPlottedTs));
+      if (!series) return;
+      if (series.cursor != null) seriesCursor = series.cursor;
+      else if (needFull) seriesCursor = null; // snapshot or raw feed: no cursor
+      const finalPrices = series.prices;
+      const finalTimestamps = series.timestamps;
+      if (!finalPrices.length) {
+        if (needFull) showDebug("No valid price data to plot.", true);
         return;
       }
 
-      const normalized = matches.map(r => ({ row: r, tsMs: parseRowTsMs(r) }));
-      const latestTs = Math.max(...normalized.map(n => n.tsMs || 0));
-      if (!observedLatestTs || latestTs >= observedLatestTs) observedLatestTs = latestTs;
-
-      // filter by range
-      const datasetLatestTs = Math.max(...normalized.map(n => n.tsMs || 0));
-      let filtered = normalized;
-      if (datasetLatestTs && RANGE_OPTIONS[selectedRangeKey] !== Infinity) {
-        const cutoff = datasetLatestTs - RANGE_OPTIONS[selectedRangeKey];
-        filtered = normalized.filter(n => n.tsMs && n.tsMs >= cutoff);
-        showDebug(`Range=${selectedRangeKey}, cutoff=${new Date(cutoff).toLocaleString()}, points=${filtered.length}`);
-      }
-
-      // build arrays
-      const labels = [], prices = [];
-      filtered.sort((a, b) => a.tsMs - b.tsMs).forEach(item => {
-        const p = parseFloat(item.row.price);
-        if (isFinite(p)) { labels.push(item.tsMs); prices.push(p); }
-      });
-
-      if (!prices.length) {
-        showDebug("No valid price data to plot.", true);
-        return;
-      }
-
-      // dedup consecutive
-      const tsArr = [], priceArr = [];
-      for (let i = 0; i < prices.length; i++) {
-        if (!priceArr.length || !nearlyEqual(prices[i], priceArr[priceArr.length - 1])) {
-          priceArr.push(prices[i]);
-          tsArr.push(labels[i]);
-        }
-      }
-
-      // enforce max
-      const keepFrom = Math.max(0, priceArr.length - MAX_POINTS);
-      const finalPrices = priceArr.slice(keepFrom);
-      const finalTimestamps = tsArr.slice(keepFrom);
-
       // replace vs append
-      const needFull = opts.forceFull || lastSelectedRangeKey !== selectedRangeKey;
       if (needFull) {
         chart.data.labels = finalPrices.map(() => "");
         chart.data.datasets[0].data = finalPrices;
@@ -317,6 +376,48 @@
     }
   }
 
+  // Live push (SSE) with polling fallback
+  const STREAM_URL = "/api/stream";
+  let eventSource = null;
+
+  function startPolling(chart) {
+    if (!pollIntervalId) pollIntervalId = setInterval(() => updateChartFromJson(chart), POLL_INTERVAL_MS);
+  }
+
+  function stopPolling() {
+    if (pollIntervalId) { clearInterval(pollIntervalId); pollIntervalId = null; }
+  }
+
+  function pushTick(chart, tick) {
+    const ts = parseRowTsMs(tick);
+    const p = Number(tick.price);
+    if (!isFinite(p) || !ts || (lastPlottedTs && ts <= lastPlottedTs)) return;
+    if (seriesCursor == null || ts > seriesCursor) seriesCursor = ts; // stored, even if flat
+    if (lastPlottedPrice != null && nearlyEqual(p, lastPlottedPrice)) return;
+    const data = chart.data.datasets[0].data;
+    data.push(p); chart._timestamps.push(ts);
+    while (data.length > MAX_POINTS) { data.shift(); chart._timestamps.shift(); }
+    chart.data.labels = data.map(() => "");
+    lastPlottedTs = ts; lastPlottedPrice = p;
+    safeChartUpdate(chart);
+  }
+
+  // Ticks are pushed by the Python API as they are stored; until the first
+  // one arrives (and while the stream is down, or on a static host without
+  // the API) we keep polling.
+  function subscribeStream(chart) {
+    startPolling(chart);
+    if (!window.EventSource) return;
+    if (eventSource) eventSource.close();
+    eventSource = new EventSource(`${STREAM_URL}?ticker=${encodeURIComponent(DISPLAY_TICKER)}&log=${encodeURIComponent(new URL(DATA_URL, location.href).pathname)}`);
+    eventSource.addEventListener("open", () => updateChartFromJson(chart));
+    eventSource.addEventListener("tick", ev => {
+      stopPolling();
+      try { pushTick(chart, JSON.parse(ev.data)); } catch (e) { console.warn("Bad tick event:", e); }
+    });
+    eventSource.addEventListener("error", () => startPolling(chart));
+  }
+
   // Entry
   async function start() {
     try {
@@ -326,9 +427,10 @@
       window._chartInstance = chart;
       ensureRangeControls(canvas.parentElement || document.body);
       await updateChartFromJson(chart, { forceFull: true });
-      pollIntervalId = setInterval(() => updateChartFromJson(chart), POLL_INTERVAL_MS);
+      subscribeStream(chart);
       window.addEventListener("beforeunload", () => {
         if (pollIntervalId) clearInterval(pollIntervalId);
+        if (eventSource) eventSource.close();
         if (currentAbort) currentAbort.abort();
       });
       showDebug(`Live chart started for "${DISPLAY_TICKER}" (default ${selectedRangeKey})`);
@@ -1,7 +1,21 @@
+import hashlib
+import json
 import os
-from flask import Flask, request, render_template, send_from_directory
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from flask import Flask, request, render_template, send_from_directory, jsonify, url_for
+from werkzeug.utils import secure_filename
 from pptx import Presentation
 
+try:
+    from PIL import Image
+except ImportError:  # no Pillow: decks get the full-size PNGs only
+    Image = None
+
 # Optional: install python-pptx, pillow
 # pip install flask python-pptx pillow
 
@@ -11,29 +25,181 @@ SLIDES_FOLDER = "static/slides"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(SLIDES_FOLDER, exist_ok=True)
 
+# Conversions run in a bounded process pool, so at most CONVERT_WORKERS
+# LibreOffice processes exist at once and uploads never wait on them.
+CONVERT_WORKERS = int(os.environ.get("SLIDE_WORKERS", 2))
+MAX_PENDING = int(os.environ.get("SLIDE_MAX_PENDING", 20))  # queued + running jobs before uploads get 503
+CONVERT_TIMEOUT = 300  # seconds per deck
+JOB_TTL = 60 * 60      # finished jobs are forgotten after an hour
+
+# Decks are content-addressed: static/slides/<sha256 prefix>/ holds the
+# slides of one upload, so a repeat upload reuses them with no conversion,
+# and every file under /slides/ can be cached forever.
+DECK_ID_LENGTH = 16
+MANIFEST = "manifest.json"
+THUMB_WIDTH = 320
+IMMUTABLE = 365 * 24 * 60 * 60
+
+_pool = None
+jobs = {}  # job id -> {"future", "created", "deck"}
+jobs_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=CONVERT_WORKERS)
+    return _pool
+
+
+def make_variants(deck_dir, png):
+    """Thumbnail and WebP copies of one slide; returns their paths relative to the deck"""
+    variants = {"png": png}
+    if Image is None:
+        return variants
+    stem = os.path.splitext(png)[0]
+    with Image.open(os.path.join(deck_dir, png)) as img:
+        img.save(os.path.join(deck_dir, stem + ".webp"), "WEBP", quality=85)
+        variants["webp"] = stem + ".webp"
+        thumb = img.copy()
+        thumb.thumbnail((THUMB_WIDTH, THUMB_WIDTH * 10))
+        thumb.save(os.path.join(deck_dir, stem + ".thumb.png"), optimize=True)
+        variants["thumb"] = stem + ".thumb.png"
+    return variants
+
+
+def convert(filepath, deck_dir, name):
+    """Runs in a pool worker: PPTX -> PNG with LibreOffice plus variants; returns the manifest"""
+    work_dir = f"{deck_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    try:
+        # Argument list, not a shell string, so the file name can't inject commands
+        subprocess.run(["libreoffice", "--headless", "--convert-to", "png", "--outdir", work_dir, filepath],
+                       check=True, timeout=CONVERT_TIMEOUT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        pngs = sorted(f for f in os.listdir(work_dir) if f.endswith(".png"))
+        manifest = {"deck": os.path.basename(deck_dir), "name": name,
+                    "slides": [make_variants(work_dir, png) for png in pngs]}
+        with open(os.path.join(work_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        # Publish the finished deck in one rename; readers never see a partial one
+        try:
+            os.rename(work_dir, deck_dir)
+        except OSError:  # converted concurrently by another worker: keep theirs
+            pass
+        return manifest
+    finally:
+        # Gone after the rename; left behind by a failed or timed-out conversion
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def load_manifest(deck_id):
+    try:
+        with open(os.path.join(SLIDES_FOLDER, deck_id, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def slide_urls(manifest):
+    deck = manifest["deck"]
+    return [{kind: url_for("serve_slide", filename=f"{deck}/{path}") for kind, path in slide.items()}
+            for slide in manifest["slides"]]
+
+
+def save_upload(ppt_file):
+    """Save an upload under its content hash; returns (deck id, path)"""
+    digest = hashlib.sha256()
+    tmp = os.path.join(UPLOAD_FOLDER, f"upload-{uuid.uuid4().hex}.tmp")
+    with open(tmp, "wb") as f:
+        for chunk in iter(lambda: ppt_file.stream.read(1 << 16), b""):
+            digest.update(chunk)
+            f.write(chunk)
+    deck_id = digest.hexdigest()[:DECK_ID_LENGTH]
+    filepath = os.path.abspath(os.path.join(UPLOAD_FOLDER, deck_id + ".pptx"))
+    os.replace(tmp, filepath)
+    return deck_id, filepath
+
+
+def submit_job(deck_id, filepath, name):
+    """Queue a conversion (or join the one already running for this deck);
+    returns the job id, or None if too many are pending"""
+    now = time.time()
+    with jobs_lock:
+        for job_id, job in list(jobs.items()):
+            if job["future"].done() and now - job["created"] > JOB_TTL:
+                del jobs[job_id]
+        for job_id, job in jobs.items():
+            if job["deck"] == deck_id and not job["future"].done():
+                return job_id
+        if sum(not job["future"].done() for job in jobs.values()) >= MAX_PENDING:
+            return None
+        job_id = uuid.uuid4().hex
+        deck_dir = os.path.abspath(os.path.join(SLIDES_FOLDER, deck_id))
+        jobs[job_id] = {"future": get_pool().submit(convert, filepath, deck_dir, name), "created": now, "deck": deck_id}
+    return job_id
+
+
+def job_status(job_id):
+    with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        return None
+    future = job["future"]
+    status = {"id": job_id, "deck": job["deck"], "status": "queued", "slides": [], "error": None}
+    if future.running():
+        status["status"] = "running"
+    elif future.done():
+        error = future.exception()
+        if error is None:
+            status["status"] = "done"
+            status["slides"] = slide_urls(load_manifest(job["deck"]) or future.result())
+        else:
+            status["status"] = "failed"
+            status["error"] = str(error)
+    return status
+
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
         ppt_file = request.files["pptx"]
         if ppt_file and ppt_file.filename.endswith(".pptx"):
-            filepath = os.path.join(UPLOAD_FOLDER, ppt_file.filename)
-            ppt_file.save(filepath)
+            deck_id, filepath = save_upload(ppt_file)
+            manifest = load_manifest(deck_id)
+            if manifest is not None:
+                # Same file converted before: serve it, no LibreOffice call
+                slides = slide_urls(manifest)
+                if request.accept_mimetypes.best == "application/json":
+                    return jsonify({"deck": deck_id, "status": "done", "slides": slides})
+                return render_template("viewer.html", slides=slides)
 
-            # Convert PPTX → images (requires libreoffice/unoconv OR aspose or similar tool)
-            # Simpler: python-pptx cannot render directly, so we use "unoconv" via system call
-            output_dir = os.path.abspath(SLIDES_FOLDER)
-            os.system(f'libreoffice --headless --convert-to png --outdir "{output_dir}" "{filepath}"')
-
-            # Collect converted slides
-            slides = sorted([f for f in os.listdir(SLIDES_FOLDER) if f.endswith(".png")])
-
-            return render_template("viewer.html", slides=slides)
+            # Convert PPTX → images in the background (python-pptx cannot render directly)
+            job_id = submit_job(deck_id, filepath, secure_filename(ppt_file.filename))
+            if job_id is None:
+                return jsonify({"error": "Too many conversions in progress, try again shortly"}), 503
+            status_url = url_for("job", job_id=job_id)
+            if request.accept_mimetypes.best == "application/json":
+                return jsonify({"job": job_id, "deck": deck_id, "status_url": status_url}), 202
+            return render_template("viewer.html", slides=[], job_id=job_id, status_url=status_url)
 
     return render_template("index.html")
 
-@app.route("/slides/<filename>")
+@app.route("/jobs/<job_id>")
+def job(job_id):
+    """Conversion status: queued, running, done (with slide URLs) or failed"""
+    status = job_status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(status)
+
+@app.route("/slides/<path:filename>")
 def serve_slide(filename):
-    return send_from_directory(SLIDES_FOLDER, filename)
+    """Slide files never change under a deck id, so they are cached forever"""
+    response = send_from_directory(SLIDES_FOLDER, filename, max_age=IMMUTABLE, etag=False)
+    response.set_etag(filename)  # the path starts with the deck's content hash
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -1,10 +1,10 @@
-import os, json, time, requests
-from datetime import datetime
+import os, json, time, threading, requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
 
 API_KEY = os.environ.get("NEWSAPI_KEY")
-if not API_KEY:
-    raise SystemExit("❌ NEWSAPI_KEY environment variable not set. Add it in GitHub Secrets.")
 
 # Topics you want news for (add or remove as you like)
 TOPICS = [
@@ -13,10 +13,52 @@ TOPICS = [
     "reliance", "tcs", "infosys", "hdfc", "icici", "sbin", "airtel"
 ]
 
-BASE_URL = "https://newsapi.org/v2/everything"
+# NEWSAPI_BASE_URL points the script at a local stand-in server for testing
+BASE_URL = os.environ.get("NEWSAPI_BASE_URL", "https://newsapi.org/v2/everything")
+CONCURRENCY = int(os.environ.get("NEWS_CONCURRENCY", 4))  # topics in flight at once
+RATE = float(os.environ.get("NEWS_RATE", 4))              # requests per second (token bucket)
+BURST = int(os.environ.get("NEWS_BURST", 4))              # requests allowed back to back
+RETRIES = int(os.environ.get("NEWS_RETRIES", 3))          # extra attempts after a 429 or 5xx
+BACKOFF = float(os.environ.get("NEWS_BACKOFF", 1))        # seconds before the first retry, doubled per retry
+MAX_RETRY_AFTER = 60                                      # cap on a server's Retry-After
 
-def fetch_topic(query: str):
-    """Fetch articles for a given query from NewsAPI"""
+NEWS_FILE = "news.json"
+# Seen URLs and the newest publishedAt per topic, so each run only asks for
+# (and writes) what is new. NEWS_FULL=1 rebuilds news.json from scratch.
+INDEX_FILE = "news.index.json"
+MAX_ARTICLES = int(os.environ.get("NEWS_MAX_ARTICLES", 500))  # kept in news.json
+SEEN_LIMIT = 5000                                             # URLs remembered in the index
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, `burst` at once"""
+    def __init__(self, rate: float, burst: int):
+        self.rate, self.capacity = rate, burst
+        self.tokens, self.updated = float(burst), time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+bucket = TokenBucket(RATE, BURST)
+
+def make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CONCURRENCY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_topic(query: str, session=requests, since: str = None):
+    """Fetch articles for a given query from NewsAPI (only from `since` on, if given)"""
     params = {
         "q": query,
         "language": "en",
@@ -24,11 +66,25 @@ def fetch_topic(query: str):
         "pageSize": 20,
         "apiKey": API_KEY
     }
+    if since:
+        params["from"] = since
     url = f"{BASE_URL}?{urlencode(params)}"
-    r = requests.get(url, timeout=30)
+    for attempt in range(RETRIES + 1):
+        bucket.acquire()  # be nice to API (retries included)
+        r = session.get(url, timeout=30)
+        if attempt == RETRIES or (r.status_code != 429 and r.status_code < 500):
+            break
+        time.sleep(retry_delay(r, attempt))
     r.raise_for_status()
     return r.json().get("articles", [])
 
+def retry_delay(response, attempt: int) -> float:
+    """The server's Retry-After (in seconds, capped), else exponential backoff"""
+    try:
+        return max(0.0, min(float(response.headers.get("Retry-After", "")), MAX_RETRY_AFTER))
+    except ValueError:
+        return BACKOFF * 2 ** attempt
+
 def normalize(article: dict, topic: str):
     """Simplify article JSON for frontend use"""
     return {
@@ -43,33 +99,75 @@ def parse_ts(ts: str):
     try:
         return datetime.fromisoformat(ts.replace("Z", "+00:00"))
     except Exception:
-        return datetime.min
+        return datetime.min.replace(tzinfo=timezone.utc)
 
-def main():
-    seen_urls = set()
-    results = []
+def load_json(path: str, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return default
+
+def write_json(path: str, data):
+    """Write via a temp file and rename, so readers never see a partial file"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
 
-    for topic in TOPICS:
+def fetch_all(topics, cursors=None):
+    """Fetch every topic concurrently; returns [(topic, articles)] in topic order"""
+    cursors = cursors or {}
+
+    def fetch(session, topic):
         try:
-            articles = fetch_topic(topic)
-            for art in articles:
-                url = art.get("url")
-                if not url or url in seen_urls:
-                    continue
-                seen_urls.add(url)
-                results.append(normalize(art, topic))
-            time.sleep(0.5)  # be nice to API
-        except requests.HTTPError as e:
+            return topic, fetch_topic(topic, session, cursors.get(topic))
+        except requests.RequestException as e:
             print(f"⚠️ Error fetching {topic}: {e}")
+            return topic, []
+
+    with make_session() as session, ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        return list(pool.map(lambda topic: fetch(session, topic), topics))
+
+def main():
+    if not API_KEY:
+        raise SystemExit("❌ NEWSAPI_KEY environment variable not set. Add it in GitHub Secrets.")
+    full = os.environ.get("NEWS_FULL") == "1" or not os.path.exists(NEWS_FILE)
+    index = {} if full else load_json(INDEX_FILE, None)
+    if index is None:  # first incremental run: seed the index from news.json
+        index = {"seen": [a["url"] for a in load_json(NEWS_FILE, []) if a.get("url")]}
+    seen = index.get("seen", [])
+    seen_urls = set(seen)
+    cursors = index.get("cursors", {})
+    new = []
+
+    # Dedupe in topic order, so the first topic to list a URL keeps it, as before
+    for topic, articles in fetch_all(TOPICS, cursors):
+        for art in articles:
+            published = art.get("publishedAt")
+            if published and (topic not in cursors or parse_ts(published) > parse_ts(cursors[topic])):
+                cursors[topic] = published
+            url = art.get("url")
+            if not url or url in seen_urls:
+                continue
+            seen_urls.add(url)
+            seen.append(url)
+            new.append(normalize(art, topic))
+
+    if not new:
+        print(f"✅ No new articles; {NEWS_FILE} unchanged")
+        return
 
-    # Sort newest first
+    # Merge into the existing file, newest first, keeping the newest MAX_ARTICLES
+    results = new + ([] if full else load_json(NEWS_FILE, []))
     results.sort(key=lambda a: parse_ts(a["publishedAt"] or ""), reverse=True)
+    del results[MAX_ARTICLES:]
 
     # Save to news.json at repo root
-    with open("news.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    write_json(NEWS_FILE, results)
+    write_json(INDEX_FILE, {"cursors": cursors, "seen": seen[-SEEN_LIMIT:]})
 
-    print(f"✅ Wrote {len(results)} articles to news.json")
+    print(f"✅ Added {len(new)} articles; {NEWS_FILE} has {len(results)}")
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,7 @@
 (() => {
   // -------- CONFIG --------
   let DISPLAY_TICKER = "Reliance";
-  let DATA_URL = "../Company-Jsons/Reliance.json";
+  let DATA_URL = "../Company-Jsons/Reliance.jsonl";
   const POLL_INTERVAL_MS = 10000;
   const MAX_POINTS = 200;
   const CHART_JS_CDN = "https://cdn.jsdelivr.net/npm/chart.js";
@@ -21,6 +21,7 @@
   let selectedRangeKey = "6H";
   let lastSelectedRangeKey = null;
   let lastPlottedTs = null;
+  let seriesCursor = null; // newest stored tick the API has sent (may be a repeat price)
   let lastPlottedPrice = null;
   let currentAbort = null;
   let pollIntervalId = null;
@@ -83,6 +84,7 @@
   // ==============================
   function destroyExistingChart() {
     if (pollIntervalId) { clearInterval(pollIntervalId); pollIntervalId = null; }
+    if (eventSource) { eventSource.close(); eventSource = null; }
     if (currentAbort) { currentAbort.abort(); currentAbort = null; }
     if (window._chartInstance) {
       try { window._chartInstance.destroy(); } catch (e) { console.warn("Failed to destroy old chart:", e); }
@@ -137,10 +139,20 @@
     });
   }
 
+  // Tick logs are JSON Lines (one tick per line); fall back to the legacy
+  // JSON array when no log has been written yet.
   async function fetchJsonData(url, signal) {
     const r = await fetch(url, { cache: "no-store", signal });
+    const isLog = url.endsWith(".jsonl");
+    if (r.status === 404 && isLog) return fetchJsonData(url.slice(0, -1), signal);
     if (!r.ok) throw new Error(r.status + " " + r.statusText);
-    return r.json();
+    if (!isLog) return r.json();
+    const rows = [];
+    for (const line of (await r.text()).split("\n")) {
+      if (!line.trim()) continue;
+      try { rows.push(JSON.parse(line)); } catch { /* torn last line */ }
+    }
+    return rows;
   }
 
   function createChartOnCanvas(canvas) {
@@ -218,45 +230,101 @@
     try { localStorage.setItem("lastRange", key); } catch (_) { }
   }
 
-  async function updateChartFromJson(chart, opts = { forceFull: false }) {
-    if (isUpdating) return;
-    isUpdating = true;
-    try {
-      if (currentAbort) currentAbort.abort();
-      currentAbort = new AbortController();
-      const json = await fetchJsonData(DATA_URL, currentAbort.signal);
-      const matches = json.filter(e => e.ticker === DISPLAY_TICKER);
-      if (!matches.length) return showDebug(`No entries for ticker "${DISPLAY_TICKER}".`, true);
+  // ==============================
+  // Series: windowed by the Python API (/api/series); on a static host,
+  // read from a prebuilt snapshot (python -m stockitup.snapshots), or
+  // computed here from the raw tick feed
+  // ==============================
+  const SERIES_API = "/api/series";
+  let seriesApiAvailable = true;
+  let snapshotsAvailable = true;
 
-      const normalized = matches.map(r => ({ row: r, tsMs: new Date(r.timestamp).getTime() }));
-      const datasetLatestTs = Math.max(...normalized.map(n => n.tsMs || 0));
-      let filtered = normalized;
+  function snapshotUrl() {
+    const i = DATA_URL.lastIndexOf("/") + 1;
+    return `${DATA_URL.slice(0, i)}snapshots/${DATA_URL.slice(i).replace(/\.jsonl$/, "")}.${selectedRangeKey}.json`;
+  }
 
-      if (datasetLatestTs && RANGE_OPTIONS[selectedRangeKey] !== Infinity) {
-        const cutoff = datasetLatestTs - RANGE_OPTIONS[selectedRangeKey];
-        filtered = normalized.filter(n => n.tsMs && n.tsMs >= cutoff);
-      }
+  function seriesFromRows(json) {
+    const matches = json.filter(e => e.ticker === DISPLAY_TICKER);
+    if (!matches.length) { showDebug(`No entries for ticker "${DISPLAY_TICKER}".`, true); return null; }
 
-      const labels = [], prices = [];
-      filtered.sort((a, b) => a.tsMs - b.tsMs).forEach(item => {
-        const p = parseFloat(item.row.price);
-        if (isFinite(p)) { labels.push(item.tsMs); prices.push(p); }
-      });
+    const normalized = matches.map(r => ({ row: r, tsMs: new Date(r.timestamp).getTime() }));
+    const datasetLatestTs = Math.max(...normalized.map(n => n.tsMs || 0));
+    let filtered = normalized;
+
+    if (datasetLatestTs && RANGE_OPTIONS[selectedRangeKey] !== Infinity) {
+      const cutoff = datasetLatestTs - RANGE_OPTIONS[selectedRangeKey];
+      filtered = normalized.filter(n => n.tsMs && n.tsMs >= cutoff);
+    }
 
-      if (!prices.length) return showDebug("No valid price data to plot.", true);
+    const labels = [], prices = [];
+    filtered.sort((a, b) => a.tsMs - b.tsMs).forEach(item => {
+      const p = parseFloat(item.row.price);
+      if (isFinite(p)) { labels.push(item.tsMs); prices.push(p); }
+    });
 
-      const tsArr = [], priceArr = [];
-      for (let i = 0; i < prices.length; i++) {
-        if (!priceArr.length || !nearlyEqual(prices[i], priceArr[priceArr.length - 1])) {
-          priceArr.push(prices[i]); tsArr.push(labels[i]);
+    const tsArr = [], priceArr = [];
+    for (let i = 0; i < prices.length; i++) {
+      if (!priceArr.length || !nearlyEqual(prices[i], priceArr[priceArr.length - 1])) {
+        priceArr.push(prices[i]); tsArr.push(labels[i]);
+      }
+    }
+
+    const keepFrom = Math.max(0, priceArr.length - MAX_POINTS);
+    return { timestamps: tsArr.slice(keepFrom), prices: priceArr.slice(keepFrom) };
+  }
+
+  // since = the cursor of the last response (the newest stored tick, which
+  // may be a repeat of the plotted price): the API then returns only newer
+  // ticks, and an unchanged feed answers 304 with no body.
+  let seriesEtag = null, seriesEtagUrl = null;
+  async function fetchSeries(signal, since = null) {
+    if (seriesApiAvailable) {
+      try {
+        const params = { ticker: DISPLAY_TICKER, range: selectedRangeKey, max_points: MAX_POINTS };
+        if (since != null) params.since = since;
+        const url = `${SERIES_API}?${new URLSearchParams(params)}`;
+        const headers = url === seriesEtagUrl && seriesEtag ? { "If-None-Match": seriesEtag } : {};
+        const r = await fetch(url, { cache: "no-store", headers, signal });
+        if (r.status === 304) return { timestamps: [], prices: [] };
+        const isJson = (r.headers.get("content-type") || "").includes("application/json");
+        if (r.ok && isJson) {
+          seriesEtagUrl = url;
+          seriesEtag = r.headers.get("ETag");
+          return r.json();
         }
+        if (!isJson) seriesApiAvailable = false; // static host, no API here
+      } catch (err) {
+        if (err.name === "AbortError") throw err;
+        seriesApiAvailable = false;
       }
+    }
+    if (snapshotsAvailable) {
+      const r = await fetch(snapshotUrl(), { cache: "no-cache", signal });
+      if (r.ok) return r.json();
+      if (r.status === 404) snapshotsAvailable = false;
+    }
+    return seriesFromRows(await fetchJsonData(DATA_URL, signal));
+  }
 
-      const keepFrom = Math.max(0, priceArr.length - MAX_POINTS);
-      const finalPrices = priceArr.slice(keepFrom);
-      const finalTimestamps = tsArr.slice(keepFrom);
+  async function updateChartFromJson(chart, opts = { forceFull: false }) {
+    if (isUpdating) return;
+    isUpdating = true;
+    try {
+      if (currentAbort) currentAbort.abort();
+      currentAbort = new AbortController();
+      const needFull = opts.forceFull || lastSelectedRangeKey !== selectedRangeKey || lastPlottedTs == null;
+      const series = await fetchSeries(currentAbort.signal, needFull ? null : (seriesCursor ?? lastPlottedTs));
+      if (!series) return;
+      if (series.cursor != null) seriesCursor = series.cursor;
+      else if (needFull) seriesCursor = null; // snapshot or raw feed: no cursor
+      const finalPrices = series.prices;
+      const finalTimestamps = series.timestamps;
+      if (!finalPrices.length) {
+        if (needFull) showDebug("No valid price data to plot.", true);
+        return;
+      }
 
-      const needFull = opts.forceFull || lastSelectedRangeKey !== selectedRangeKey;
       if (needFull) {
         chart.data.labels = finalPrices.map(() => "");
         chart.data.datasets[0].data = finalPrices;
@@ -293,6 +361,50 @@
     } finally { isUpdating = false; currentAbort = null; }
   }
 
+  // ==============================
+  // Live push (SSE) with polling fallback
+  // ==============================
+  const STREAM_URL = "/api/stream";
+  let eventSource = null;
+
+  function startPolling(chart) {
+    if (!pollIntervalId) pollIntervalId = setInterval(() => updateChartFromJson(chart), POLL_INTERVAL_MS);
+  }
+
+  function stopPolling() {
+    if (pollIntervalId) { clearInterval(pollIntervalId); pollIntervalId = null; }
+  }
+
+  function pushTick(chart, tick) {
+    const ts = new Date(tick.timestamp).getTime();
+    const p = Number(tick.price);
+    if (!isFinite(p) || !ts || (lastPlottedTs && ts <= lastPlottedTs)) return;
+    if (seriesCursor == null || ts > seriesCursor) seriesCursor = ts; // stored, even if flat
+    if (lastPlottedPrice != null && nearlyEqual(p, lastPlottedPrice)) return;
+    const data = chart.data.datasets[0].data;
+    data.push(p); chart._timestamps.push(ts);
+    while (data.length > MAX_POINTS) { data.shift(); chart._timestamps.shift(); }
+    chart.data.labels = data.map(() => "");
+    lastPlottedTs = ts; lastPlottedPrice = p;
+    safeChartUpdate(chart);
+  }
+
+  // Ticks are pushed by the Python API as they are stored; until the first
+  // one arrives (and while the stream is down, or on a static host without
+  // the API) we keep polling.
+  function subscribeStream(chart) {
+    startPolling(chart);
+    if (!window.EventSource) return;
+    if (eventSource) eventSource.close();
+    eventSource = new EventSource(`${STREAM_URL}?ticker=${encodeURIComponent(DISPLAY_TICKER)}`);
+    eventSource.addEventListener("open", () => updateChartFromJson(chart));
+    eventSource.addEventListener("tick", ev => {
+      stopPolling();
+      try { pushTick(chart, JSON.parse(ev.data)); } catch (e) { console.warn("Bad tick event:", e); }
+    });
+    eventSource.addEventListener("error", () => startPolling(chart));
+  }
+
   // ==============================
   // Start chart
   // ==============================
@@ -305,9 +417,10 @@
       window._chartInstance = chart;
       ensureRangeControls(canvas.parentElement || document.body);
       await updateChartFromJson(chart, { forceFull: true });
-      pollIntervalId = setInterval(() => updateChartFromJson(chart), POLL_INTERVAL_MS);
+      subscribeStream(chart);
       window.addEventListener("beforeunload", () => {
         if (pollIntervalId) clearInterval(pollIntervalId);
+        if (eventSource) eventSource.close();
         if (currentAbort) currentAbort.abort();
       });
       showDebug(`Live chart started for "${DISPLAY_TICKER}" (default ${selectedRangeKey})`);
@@ -328,7 +441,8 @@
       console.log(data.status || data.error);
 
       DISPLAY_TICKER = ticker;
-      DATA_URL = `../Company-Jsons/${ticker}.json`;
+      DATA_URL = `../Company-Jsons/${ticker}.jsonl`;
+      snapshotsAvailable = true;
       const title = document.getElementById("chartTitle");
       if (title) title.textContent = `Live Chart — ${DISPLAY_TICKER}`;
 
@@ -1,27 +1,29 @@
 import requests
-from bs4 import BeautifulSoup
 import time
-import json
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from stockitup.extract import extract_price
+from stockitup.schedule import PollSchedule, default_calendar
+from stockitup.ticklog import append_tick, migrate_array
 
 ticker = "TCS"
 exchange = "NSE"
 base_url = f"https://www.google.com/finance/quote/{ticker}:{exchange}?hl=en"
-class_name = "YMlKec fxKbKc"
 
 array_file = "array.json"
+log_file = migrate_array(array_file)
 
 
 def fetch_price():
     try:
         response = requests.get(base_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        price_element = soup.find(class_=class_name)
+        price = extract_price(response.text)
 
-        if price_element:
-            price = price_element.text.strip()[1:].replace(",", "")
+        if price is not None:
             print(f"💹 Current price of {ticker}: {price}")
-            return float(price)
+            return price
         else:
             print("⚠️ Price element not found. The page structure may have changed.")
             return None
@@ -30,28 +32,20 @@ def fetch_price():
         return None
 
 def append_to_array(entry):
-    if os.path.exists(array_file):
-        try:
-            with open(array_file, "r") as f:
-                print(f"📁 Logging to: {os.path.abspath(array_file)}")
-                data = json.load(f)
-                if not isinstance(data, list):
-                    data = []
-        except json.JSONDecodeError:
-            data = []
-    else:
-        data = []
-
-    data.append(entry)
-
     try:
-        with open(array_file, "w") as f:
-            json.dump(data, f, indent=2)
+        append_tick(log_file, entry)
     except Exception as e:
         print(f"❌ Error writing to file: {e}")
 
+# no polls while the exchange is closed; slower ones while the price is flat
+schedule = PollSchedule(ticker, exchange, fast=3, calendar=default_calendar())
+
 try:
     while True:
+        closed_for = schedule.closed_for()
+        if closed_for:
+            time.sleep(closed_for)
+            continue
         price = fetch_price()
         if price:
             entry = {
@@ -62,6 +56,6 @@ try:
             }
             append_to_array(entry)
 
-        time.sleep(3)
+        time.sleep(schedule.next_delay(price))
 except KeyboardInterrupt:
     print("🛑 Stopped by user.")
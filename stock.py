@@ -1,10 +1,12 @@
 import requests
-from bs4 import BeautifulSoup
 import time
-import json
 import os
 import sys
 
+from stockitup.extract import extract_price
+from stockitup.schedule import PollSchedule, default_calendar
+from stockitup.ticklog import append_tick, migrate_array
+
 # ==============================
 # Config from command line args
 # ==============================
@@ -22,10 +24,12 @@ os.makedirs(JSON_FOLDER, exist_ok=True)
 # full path for this ticker's JSON file
 array_file = os.path.join(JSON_FOLDER, f"{ticker}.json")
 
+# append-only tick log next to it (history from the old array is carried over once)
+log_file = migrate_array(array_file)
+
 
 
 base_url = f"https://www.google.com/finance/quote/{ticker}:{exchange}?hl=en"
-class_name = "YMlKec fxKbKc"
 
 # ==============================
 # Fetch current price
@@ -34,13 +38,11 @@ def fetch_price():
     try:
         response = requests.get(base_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        price_element = soup.find(class_=class_name)
+        price = extract_price(response.text)
 
-        if price_element:
-            price = price_element.text.strip()[1:].replace(",", "")
+        if price is not None:
             print(f"💹 Current price of {ticker} ({exchange}): {price}")
-            return float(price)
+            return price
         else:
             print("⚠️ Price element not found. The page structure may have changed.")
             return None
@@ -49,33 +51,26 @@ def fetch_price():
         return None
 
 # ==============================
-# Append entry to JSON file
+# Append entry to tick log
 # ==============================
 def append_to_array(entry):
-    if os.path.exists(array_file):
-        try:
-            with open(array_file, "r") as f:
-                data = json.load(f)
-                if not isinstance(data, list):
-                    data = []
-        except json.JSONDecodeError:
-            data = []
-    else:
-        data = []
-
-    data.append(entry)
-
     try:
-        with open(array_file, "w") as f:
-            json.dump(data, f, indent=2)
+        append_tick(log_file, entry)
     except Exception as e:
         print(f"❌ Error writing to file: {e}")
 
 # ==============================
 # Main loop
 # ==============================
+# no polls while the exchange is closed; slower ones while the price is flat
+schedule = PollSchedule(ticker, exchange, fast=10, calendar=default_calendar())
+
 try:
     while True:
+        closed_for = schedule.closed_for()
+        if closed_for:
+            time.sleep(closed_for)
+            continue
         price = fetch_price()
         if price:
             entry = {
@@ -86,6 +81,6 @@ try:
             }
             append_to_array(entry)
 
-        time.sleep(10)  # poll every 3 seconds
+        time.sleep(schedule.next_delay(price))
 except KeyboardInterrupt:
     print("🛑 Stopped by user.")
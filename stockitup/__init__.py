@@ -0,0 +1 @@
+"""Shared Python backend for Stock It Up (tick storage, collectors, API)."""
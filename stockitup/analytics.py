@@ -0,0 +1,243 @@
+"""Cross-ticker analytics: aligned resampling, rolling returns, correlation.
+
+Every collector stores ticks on its own irregular clock (every 3-10 s, with
+gaps). resample() puts any set of tickers on one common time grid. Each
+grid point takes the ticker's last known price at or before it
+(encoding.expand: an as-of, forward-filled join done with one searchsorted
+per ticker), which also fills in the flat stretches of change-only logs.
+From the aligned price matrix, rolling log returns over `window` grid
+steps and the pairwise correlation matrix come out of a few whole-matrix
+NumPy operations. A ticker that has no data yet at the start of the grid is
+compared with the others only over the points where both have data. The
+grid ends at the newest tick of the selected logs, not at the wall clock,
+so a range still covers data after the market closes or the collector
+stops.
+
+Long ranges read candle closes at the coarsest resolution finer than one
+grid step, plus the raw ticks after the last closed candle, so ranges
+that compaction has already rolled up still work. Results are cached per
+(ticker set, range, step, window) until the grid gains a point.
+"""
+import collections
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+from stockitup.candles import RESOLUTIONS, first_candle, last_candle, query_candles
+from stockitup.compact import JSON_FOLDER, default_logs
+from stockitup.encoding import expand
+from stockitup.series import RANGE_OPTIONS, get_index
+from stockitup.ticklog import last_tick
+
+MAX_GRID = 2000            # grid points per range
+MIN_STEP = 10 * 1000       # ms: the collectors' usual poll interval
+CACHE_SIZE = 64
+
+
+def logs_by_ticker() -> dict:
+    """TICKER -> stored ticks for every log compact.default_logs() knows
+    (Company-Jsons/ and the metal pages), by the ticker of its last tick.
+    A legacy .json array stands in where no .jsonl log exists yet."""
+    roots = dict.fromkeys(os.path.splitext(p)[0] for p in default_logs() + glob.glob(os.path.join(JSON_FOLDER, "*.json")))
+    out = {}
+    for root in roots:
+        path = next((p for p in (root + ".jsonl", root + ".json") if os.path.exists(p)), None)
+        ticker = _ticker_of(path) if path else None
+        if ticker:
+            out.setdefault(ticker, path)
+    return out
+
+
+_tickers = {}  # path -> (mtime_ns, TICKER of its last tick)
+
+
+def _ticker_of(path: str):
+    """Ticker of a log's last tick, re-read only when the file changes"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _tickers.get(path)
+    if cached is None or cached[0] != mtime:
+        last = last_tick(path)
+        cached = _tickers[path] = (mtime, str(last["ticker"]).upper() if last and last.get("ticker") else None)
+    return cached[1]
+
+
+# ==============================
+# Alignment
+# ==============================
+def price_series(path: str, ticker: str, start_ms: int, step_ms: int):
+    """(ts, prices) of one ticker from just before `start_ms` on: candle closes
+    (stamped at the end of their bucket, when they became known) where
+    a resolution finer than `step_ms` covers the start, then raw ticks"""
+    index = get_index(path, ticker)
+    first_raw = index.bounds(None)[0]
+    for res in sorted(RESOLUTIONS, key=RESOLUTIONS.get, reverse=True):
+        span = RESOLUTIONS[res]
+        if span > step_ms:
+            continue
+        candles = query_candles(path, res, start_ms - 2 * span)
+        if not candles["t"] or (first_raw is not None and candles["t"][0] > max(start_ms, first_raw)):
+            continue
+        ts = np.asarray(candles["t"], dtype=np.int64) + span
+        tail_ts, tail_prices = index.since(int(ts[-1]) - 1)
+        return (np.concatenate((ts, np.asarray(tail_ts, dtype=np.int64))),
+                np.concatenate((np.asarray(candles["c"], dtype=np.float64), np.asarray(tail_prices, dtype=np.float64))))
+    ts, prices = index.window(None)
+    ts, prices = np.asarray(ts, dtype=np.int64), np.asarray(prices, dtype=np.float64)
+    lo = max(0, int(np.searchsorted(ts, start_ms, side="right")) - 1)
+    return ts[lo:], prices[lo:]
+
+
+def oldest(path: str, ticker: str):
+    """Epoch ms of a ticker's oldest data, raw or candle"""
+    starts = [t for t in (get_index(path, ticker).bounds(None)[0], first_candle(path, "1D")) if t is not None]
+    return min(starts) if starts else None
+
+
+def newest(path: str, ticker: str):
+    """Epoch ms of a ticker's newest data: its last raw tick, else the close
+    of its last candle"""
+    latest = get_index(path, ticker).latest_ts
+    if latest is None:
+        ends = []
+        for res, span in RESOLUTIONS.items():
+            start = last_candle(path, res)
+            if start is not None:
+                ends.append(start + span)
+        latest = max(ends, default=None)
+    return latest
+
+
+def make_grid(range_key: str, logs: dict, step_ms: int = None, end_ms: int = None) -> np.ndarray:
+    """Common grid for a range: ends at the last whole step before the newest
+    tick of `logs` (now if there is none), with at most MAX_GRID points (the
+    step grows with the range if need be)"""
+    if end_ms is None:
+        ends = [t for t in (newest(path, ticker) for ticker, path in logs.items()) if t is not None]
+        end_ms = max(ends) if ends else int(time.time() * 1000)
+    span = RANGE_OPTIONS[range_key]
+    if span is None:
+        starts = [t for t in (oldest(path, ticker) for ticker, path in logs.items()) if t is not None]
+        span = end_ms - min(starts) if starts else MIN_STEP
+    step = max(step_ms or MIN_STEP, MIN_STEP, -(-span // (MAX_GRID - 1)))
+    end = end_ms // step * step
+    return np.arange(end - span // step * step, end + 1, step, dtype=np.int64)
+
+
+def resample(logs: dict, grid) -> np.ndarray:
+    """tickers x grid matrix of as-of prices, rows in the order of `logs`.
+    Prices carry forward across any gap: a closed market keeps its last price."""
+    step = int(grid[1] - grid[0]) if len(grid) > 1 else MIN_STEP
+    return np.vstack([expand(*price_series(path, ticker, int(grid[0]), step), step,
+                             int(grid[0]), int(grid[-1]), max_gap_ms=None)[1]
+                      for ticker, path in logs.items()]) if logs else np.empty((0, len(grid)))
+
+
+# ==============================
+# Returns and correlation
+# ==============================
+def rolling_returns(prices, window: int = 1) -> np.ndarray:
+    """Log return over `window` grid steps at every point (NaN where undefined)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.full(prices.shape, np.nan)
+    if prices.shape[-1] > window:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logs = np.log(np.where(prices > 0, prices, np.nan))
+        out[..., window:] = logs[..., window:] - logs[..., :-window]
+    return out
+
+
+def correlation(returns) -> np.ndarray:
+    """Pairwise Pearson correlation of the rows, each pair over the points
+    where both are defined. Four matrix products, no per-pair loop."""
+    r = np.asarray(returns, dtype=np.float64)
+    valid = ~np.isnan(r)
+    m = valid.astype(np.float64)
+    x = np.where(valid, r, 0.0)
+    n = m @ m.T                     # points both rows have
+    sum_x = x @ m.T                 # [i, j]: sum of row i where j is defined
+    sum_sq = (x * x) @ m.T
+    products = x @ x.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_i, mean_j = sum_x / n, sum_x.T / n
+        cov = products / n - mean_i * mean_j
+        var_i = sum_sq / n - mean_i ** 2
+        var_j = sum_sq.T / n - mean_j ** 2
+        corr = cov / np.sqrt(var_i * var_j)
+    corr[(n < 2) | (var_i <= 1e-18) | (var_j <= 1e-18)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _clean(values) -> list:
+    """NaN -> None for JSON (nested lists too)"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), None, np.round(values, 6)).tolist()
+
+
+def analyze(logs: dict, range_key: str, step_ms: int = None, window: int = 1,
+            series: bool = False, grid=None) -> dict:
+    """Correlation matrix and per-ticker returns for tickers {TICKER: log}"""
+    grid = make_grid(range_key, logs, step_ms) if grid is None else grid
+    prices = resample(logs, grid)
+    returns = rolling_returns(prices, window)
+    tickers = list(logs)
+    rows = np.arange(len(tickers))
+    has_price = ~np.isnan(prices)
+    first = np.where(has_price.any(axis=1), prices[rows, has_price.argmax(axis=1)], np.nan) if len(grid) else None
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=1)
+    mean = np.where(valid, returns, 0.0).sum(axis=1) / np.maximum(count, 1)
+    variance = np.where(valid, (returns - mean[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(count, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = np.log(prices[:, -1] / first) if len(grid) else np.full(len(tickers), np.nan)
+    volatility = np.where(count > 0, np.sqrt(variance), np.nan)
+    out = {
+        "tickers": tickers,
+        "range": range_key,
+        "step_ms": int(grid[1] - grid[0]) if len(grid) > 1 else None,
+        "window": window,
+        "start": int(grid[0]) if len(grid) else None,
+        "end": int(grid[-1]) if len(grid) else None,
+        "points": len(grid),
+        "last": dict(zip(tickers, _clean(prices[:, -1]) if len(grid) else [None] * len(tickers))),
+        "total_return": dict(zip(tickers, _clean(total))),
+        "volatility": dict(zip(tickers, _clean(volatility))),
+        "correlation": _clean(correlation(returns)),
+    }
+    if series:
+        out["timestamps"] = grid.tolist()
+        out["returns"] = dict(zip(tickers, _clean(returns)))
+    return out
+
+
+class AnalyticsCache:
+    """analyze() results, recomputed only once the grid gains a point"""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self.hits = self.misses = 0
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, logs: dict, range_key: str, step_ms: int = None, window: int = 1, series: bool = False) -> dict:
+        logs = dict(sorted(logs.items()))  # one cache entry (and row order) per set
+        grid = make_grid(range_key, logs, step_ms)
+        key = (tuple(sorted(logs.items())), range_key, step_ms, window, series, int(grid[-1]), int(grid[0]))
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = analyze(logs, range_key, step_ms, window, series, grid)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+        return result
@@ -0,0 +1,518 @@
+"""HTTP service for the chart pages.
+
+Usage:
+    pip install flask requests beautifulsoup4
+    python -m stockitup.api                # site + API on http://127.0.0.1:5000
+    python -m stockitup.api --port 8000 --max-tickers 20
+
+Serves the pages (and only the files they load) and runs one in-process collector, so
+/create-json only registers a ticker with it instead of starting a scraper
+per click.
+
+/metrics exposes the collector's and the API's timings in the Prometheus
+text format, and /api/profiler switches the sampling profiler on and off
+(see stockitup.metrics). Both answer only on localhost, or, when
+STOCKITUP_OPS_TOKEN is set, to requests that send it as a bearer token.
+
+Live streams (/api/stream) are served by an asyncio server on
+--stream-port (default: --port + 1) that Flask redirects to, so
+subscribers don't each hold a Flask worker thread. --stream-port 0 keeps
+them in Flask.
+"""
+import argparse
+import functools
+import hmac
+import ipaddress
+import os
+import posixpath
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from flask import Flask, Response, abort, g, jsonify, redirect, request, send_from_directory
+from werkzeug.utils import safe_join
+
+from stockitup.analytics import MAX_GRID, MIN_STEP, AnalyticsCache, logs_by_ticker
+from stockitup.candles import RESOLUTIONS, query_candles
+from stockitup.collector import DEFAULT_CONCURRENCY, DEFAULT_INTERVAL, JSON_FOLDER, ROOT, Collector
+from stockitup.compact import LEGACY_ARRAYS
+from stockitup.downsample import MODES
+from stockitup.indicators import MAX_INDICATORS, IndicatorStore, make_indicator, overlay
+from stockitup.metrics import CONTENT_TYPE, Histogram, profiler
+from stockitup.newsindex import NewsIndex
+from stockitup.pubsub import STREAM_PATH, StreamServer, TickHub
+from stockitup.quotes import QuoteTable
+from stockitup.series import DEFAULT_RANGE, MAX_POINTS, RANGE_OPTIONS, get_index, query_series, resolve_log
+from stockitup.snapshots import SNAPSHOT_DIR
+from stockitup.tickcache import TickCache
+from stockitup.ticklog import log_path_for
+
+MAX_ACTIVE_TICKERS = int(os.environ.get("STOCKITUP_MAX_TICKERS", 50))
+MAX_POINTS_LIMIT = 5000
+MAX_QUOTE_TICKERS = 200
+MAX_NEWS_PER_PAGE = 50
+MAX_CORRELATION_TICKERS = 100
+TICKER_RE = re.compile(r"^[A-Z0-9][A-Z0-9.&_-]{0,19}$")
+
+# What the pages load from the repo: their folders' assets, the feeds they
+# chart and news.json. Everything else (.git, scripts, configs) is a 404.
+PAGE_FOLDERS = ("", "bronze", "copper", "platinum", "silver", "homepage.index")
+ASSET_EXTENSIONS = (".html", ".css", ".js", ".png", ".jpg", ".svg", ".ico")
+COMPANY_FOLDER = os.path.relpath(JSON_FOLDER, ROOT)
+FEED_FOLDERS = (*PAGE_FOLDERS, COMPANY_FOLDER)
+FEEDS = {os.path.splitext(name)[0] for name in LEGACY_ARRAYS} | {"news"}
+
+app = Flask(__name__, static_folder=None)
+app.config["MAX_ACTIVE_TICKERS"] = MAX_ACTIVE_TICKERS
+app.config["OPS_TOKEN"] = os.environ.get("STOCKITUP_OPS_TOKEN")
+
+collector = Collector(DEFAULT_INTERVAL, DEFAULT_CONCURRENCY)
+hub = TickHub()
+collector.on_tick.append(lambda entry: hub.publish(entry, collector.find_log(entry["ticker"])))
+stream_server = None  # StreamServer, once main() starts one
+tick_cache = TickCache()
+collector.on_tick.append(tick_cache.append)
+news_index = NewsIndex()
+indicator_store = IndicatorStore()
+analytics_cache = AnalyticsCache()
+request_seconds = Histogram("stockitup_http_request_seconds", "API response time (until the first byte)",
+                            ("endpoint",))
+_collector_thread = None
+_start_lock = threading.Lock()
+_register_lock = threading.Lock()
+
+
+def get_collector() -> Collector:
+    """Start the shared collector thread on first use"""
+    global _collector_thread
+    with _start_lock:
+        if _collector_thread is None:
+            _collector_thread = collector.start_in_thread()
+    return collector
+
+
+# ==============================
+# Collector control
+# ==============================
+@app.route("/create-json", methods=["POST"])
+def create_json():
+    data = request.get_json(silent=True) or {}
+    ticker = str(data.get("ticker", "")).strip().upper()
+    exchange = str(data.get("exchange", "NSE")).strip().upper() or "NSE"
+    if not TICKER_RE.match(ticker) or not TICKER_RE.match(exchange):
+        return jsonify({"error": "Invalid ticker or exchange"}), 400
+
+    c = get_collector()
+    with _register_lock:
+        if c.is_active(ticker, exchange):
+            return jsonify({"status": f"Already collecting {ticker} ({exchange})"}), 200
+        if len(c.active()) >= app.config["MAX_ACTIVE_TICKERS"]:
+            return jsonify({"error": f"Too many active tickers (max {app.config['MAX_ACTIVE_TICKERS']})"}), 429
+        c.add(ticker, exchange)
+    return jsonify({"status": f"Started collecting {ticker} ({exchange})"}), 201
+
+
+@app.route("/api/tickers")
+def list_tickers():
+    return jsonify(get_collector().active())
+
+
+# ==============================
+# Series queries
+# ==============================
+def find_log(ticker: str):
+    return collector.find_log(ticker) or resolve_log(JSON_FOLDER, ticker)
+
+
+def page_log(url_path: str):
+    """Stored ticks behind a page's feed URL (e.g. /bronze.jsonl): the .jsonl
+    log, else its legacy .json array. None outside the site root."""
+    path = safe_join(ROOT, url_path.lstrip("/"))
+    root, ext = os.path.splitext(path or "")
+    if ext not in (".jsonl", ".json"):
+        return None
+    return next((p for p in (root + ".jsonl", root + ".json") if os.path.isfile(p)), None)
+
+
+def collected_here(ticker: str, path: str) -> bool:
+    """True if this process's collector writes `path` for `ticker`"""
+    own = collector.find_log(ticker)
+    return bool(own) and os.path.abspath(own) == os.path.abspath(path)
+
+
+quotes = QuoteTable(find_log)
+collector.on_tick.append(quotes.update)
+
+
+def series_index(path: str, ticker: str, span=None, since=None):
+    """RAM ring for tickers collected in this process (kept current by
+    on_tick); the on-disk index for everything else and for cache misses"""
+    if not collected_here(ticker, path):
+        return get_index(path, ticker)
+    ring = tick_cache.get(ticker, span, since)
+    if ring is not None:
+        return ring
+    index = get_index(path, ticker)
+    tick_cache.load(ticker, index)
+    return index
+
+
+def live_candle_for(ticker: str):
+    """Open-candle lookup for a ticker collected in this process, else None"""
+    item = collector.find(ticker)
+    builder = item["candles"] if item else None
+    return builder.current if builder else None
+
+
+def conditional_json(index, build):
+    """jsonify(build()) with ETag/Last-Modified; 304 without building if unchanged"""
+    etag = index.version
+    latest = index.latest_ts
+    last_modified = datetime.fromtimestamp(latest / 1000, tz=timezone.utc) if latest else None
+
+    if request.if_none_match:
+        unchanged = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        unchanged = bool(since and last_modified and last_modified.replace(microsecond=0) <= since)
+
+    if unchanged:
+        resp = app.response_class(status=304)
+    else:
+        resp = jsonify(build())
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = last_modified
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@app.route("/api/quotes")
+def batch_quotes():
+    """Latest price, change since the day's first tick and timestamp for
+    many tickers in one response (?tickers=A,B,C)"""
+    tickers = [t.strip().upper() for t in request.args.get("tickers", "").split(",") if t.strip()]
+    if not tickers:
+        return jsonify({"error": "tickers is required"}), 400
+    if len(tickers) > MAX_QUOTE_TICKERS:
+        return jsonify({"error": f"At most {MAX_QUOTE_TICKERS} tickers per request"}), 400
+    bad = [t for t in tickers if not TICKER_RE.match(t)]
+    if bad:
+        return jsonify({"error": f"Invalid ticker: {bad[0]}"}), 400
+
+    found, missing = {}, []
+    for ticker in dict.fromkeys(tickers):
+        quote = quotes.get(ticker)
+        if quote:
+            found[ticker] = quote
+        else:
+            missing.append(ticker)
+    resp = jsonify({"quotes": found, "missing": missing})
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+@app.route("/api/series")
+def series():
+    """Chart points for a range (?ticker=&range=&max_points=&mode=), or only
+    the ticks after ?since=. ?indicators=sma:20,rsi:14 adds indicator series
+    aligned with the points (see stockitup.indicators). ?log=/bronze.jsonl
+    reads the feed a page charts instead of looking the ticker up."""
+    ticker = request.args.get("ticker", "").strip()
+    range_key = request.args.get("range", DEFAULT_RANGE).strip().upper()
+    max_points = request.args.get("max_points", MAX_POINTS, type=int)
+    since = request.args.get("since", None, type=int)
+    mode = request.args.get("mode", "lttb").strip().lower()
+    specs = list(dict.fromkeys(s.strip().lower() for s in request.args.get("indicators", "").split(",") if s.strip()))
+    if not TICKER_RE.match(ticker.upper()):
+        return jsonify({"error": "Invalid ticker"}), 400
+    if range_key not in RANGE_OPTIONS:
+        return jsonify({"error": f"Unknown range (use one of {', '.join(RANGE_OPTIONS)})"}), 400
+    if mode not in MODES:
+        return jsonify({"error": f"Unknown mode (use one of {', '.join(MODES)})"}), 400
+    if len(specs) > MAX_INDICATORS:
+        return jsonify({"error": f"At most {MAX_INDICATORS} indicators per request"}), 400
+    try:
+        for spec in specs:
+            make_indicator(spec)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    max_points = max(1, min(max_points, MAX_POINTS_LIMIT))
+
+    log = request.args.get("log", "").strip()
+    path = page_log(log) if log else find_log(ticker)
+    if not path:
+        return jsonify({"error": f"No data for {ticker}"}), 404
+    index = series_index(path, ticker, RANGE_OPTIONS[range_key], since)
+    live = live_candle_for(ticker) if collected_here(ticker, path) else None
+
+    def build():
+        result = query_series(index, range_key, max_points, since, mode, live)
+        if specs:
+            result["indicators"] = overlay(get_index(path, ticker), result, specs, indicator_store, live)
+        return result
+    return conditional_json(index, build)
+
+
+@app.route("/api/cache")
+def cache_stats():
+    """Hit/miss counters of the recent-ticks cache"""
+    return jsonify(tick_cache.stats())
+
+
+@app.route("/api/candles")
+def candles():
+    """OHLC candles: ?ticker=RELIANCE&res=5m&range=10D"""
+    ticker = request.args.get("ticker", "").strip()
+    res = request.args.get("res", "5m").strip()
+    range_key = request.args.get("range", "1D").strip().upper()
+    if not TICKER_RE.match(ticker.upper()):
+        return jsonify({"error": "Invalid ticker"}), 400
+    if res not in RESOLUTIONS:
+        return jsonify({"error": f"Unknown resolution (use one of {', '.join(RESOLUTIONS)})"}), 400
+    if range_key not in RANGE_OPTIONS:
+        return jsonify({"error": f"Unknown range (use one of {', '.join(RANGE_OPTIONS)})"}), 400
+
+    path = find_log(ticker)
+    if not path:
+        return jsonify({"error": f"No data for {ticker}"}), 404
+    index = get_index(path, ticker)
+    start, _, _ = index.bounds(RANGE_OPTIONS[range_key])
+    live = live_candle_for(ticker)
+
+    def build():
+        out = query_candles(index.path, res, start, live(res) if live else None)
+        return {"ticker": index.ticker, "range": range_key, "res": res, **out}
+    return conditional_json(index, build)
+
+
+# ==============================
+# Cross-ticker analytics
+# ==============================
+@app.route("/api/correlation")
+def correlation():
+    """Tickers resampled onto one grid: correlation matrix of their rolling
+    returns plus per-ticker return and volatility.
+
+    ?tickers=A,B,C (default: every known log), ?range=10D, ?window=1 (grid
+    steps per return), ?step=60 (seconds per grid point, raised if the range
+    would need more than MAX_GRID), ?series=1 (add the grid and returns)
+    """
+    range_key = request.args.get("range", "1D").strip().upper()
+    window = request.args.get("window", 1, type=int)
+    step = request.args.get("step", None, type=int)
+    tickers = [t.strip().upper() for t in request.args.get("tickers", "").split(",") if t.strip()]
+    if range_key not in RANGE_OPTIONS:
+        return jsonify({"error": f"Unknown range (use one of {', '.join(RANGE_OPTIONS)})"}), 400
+    if len(tickers) > MAX_CORRELATION_TICKERS:
+        return jsonify({"error": f"At most {MAX_CORRELATION_TICKERS} tickers per request"}), 400
+    bad = [t for t in tickers if not TICKER_RE.match(t)]
+    if bad:
+        return jsonify({"error": f"Invalid ticker: {bad[0]}"}), 400
+    if not 1 <= window < MAX_GRID:
+        return jsonify({"error": f"window must be between 1 and {MAX_GRID - 1}"}), 400
+    if step is not None and step * 1000 < MIN_STEP:
+        return jsonify({"error": f"step must be at least {MIN_STEP // 1000}s"}), 400
+
+    known = logs_by_ticker()
+    logs, missing = {}, []
+    for ticker in dict.fromkeys(tickers or known):
+        path = find_log(ticker) or known.get(ticker)
+        if path:
+            logs[ticker] = path
+        else:
+            missing.append(ticker)
+    if len(logs) > MAX_CORRELATION_TICKERS:
+        return jsonify({"error": f"At most {MAX_CORRELATION_TICKERS} tickers per request"}), 400
+    result = analytics_cache.get(logs, range_key, step * 1000 if step else None, window,
+                                 request.args.get("series") == "1")
+    resp = jsonify({**result, "missing": missing})
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+# ==============================
+# News
+# ==============================
+@app.route("/api/news/search")
+def news_search():
+    """Ranked news search, one page at a time: ?q=gold&page=1&per_page=10
+    (terms also match as prefixes; no q pages through the newest)"""
+    query = request.args.get("q", "").strip()[:200]
+    page = max(1, request.args.get("page", 1, type=int))
+    per_page = max(1, min(request.args.get("per_page", 10, type=int), MAX_NEWS_PER_PAGE))
+    return jsonify(news_index.refresh().search(query, page, per_page))
+
+
+# ==============================
+# Live push
+# ==============================
+def stream_target(params) -> tuple:
+    """(ticker, log) a stream request subscribes to: the page's feed
+    (?log=) or the ticker's log. Every log is followed on disk, so ticks
+    written by other processes are pushed too."""
+    ticker = str(params.get("ticker", "")).strip()
+    if not TICKER_RE.match(ticker.upper()):
+        raise ValueError("Invalid ticker")
+    log = str(params.get("log", "")).strip()
+    path = page_log(log) if log else find_log(ticker)
+    if not path:
+        raise LookupError(f"No data for {ticker}")
+    return ticker, log_path_for(path)  # a legacy array's ticks arrive in its .jsonl
+
+
+@app.route(STREAM_PATH)
+def stream():
+    """Server-Sent Events: one `tick` event per new tick of `ticker`"""
+    if stream_server is not None:
+        host = urlsplit(request.host_url).hostname
+        host = f"[{host}]" if ":" in host else host
+        return redirect(f"{request.scheme}://{host}:{stream_server.port}{request.full_path}", code=307)
+    try:
+        ticker, log = stream_target(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    return Response(hub.stream(ticker, log, request.headers.get("Last-Event-ID")), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# ==============================
+# Static files
+# ==============================
+def is_public(url_path: str) -> bool:
+    """True for a page asset or a feed the pages fetch"""
+    folder, name = posixpath.split(url_path)
+    stem, ext = os.path.splitext(name)
+    if ext in ASSET_EXTENSIONS:
+        return folder in PAGE_FOLDERS
+    if ext in (".json", ".jsonl"):
+        return folder == COMPANY_FOLDER or posixpath.join(folder, stem) in FEEDS
+    return False
+
+
+@app.route("/", defaults={"path": "index.html"})
+@app.route("/<path:path>")
+def static_file(path):
+    if not is_public(path):
+        abort(404)
+    return send_from_directory(ROOT, path)
+
+
+@app.route("/snapshots/<name>", defaults={"folder": ""})
+@app.route("/<path:folder>/snapshots/<name>")
+def snapshot(folder, name):
+    """Serve a snapshot's precompressed sibling when the client accepts it"""
+    directory = safe_join(ROOT, folder, SNAPSHOT_DIR)
+    if folder not in FEED_FOLDERS or directory is None:
+        abort(404)
+    for suffix, encoding in ((".br", "br"), (".gz", "gzip")):
+        if encoding in request.accept_encodings and os.path.isfile(os.path.join(directory, name + suffix)):
+            response = send_from_directory(directory, name + suffix, mimetype="application/json")
+            response.headers["Content-Encoding"] = encoding
+            break
+    else:
+        response = send_from_directory(directory, name)
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+# ==============================
+# Metrics
+# ==============================
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+
+
+@app.after_request
+def record_timing(response):
+    if "started" in g:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        request_seconds.observe(time.perf_counter() - g.started, endpoint)
+    return response
+
+
+def operator_only(view):
+    """403 unless the request carries the ops token (when one is set) or
+    comes from localhost (when none is)"""
+    @functools.wraps(view)
+    def guarded(*args, **kwargs):
+        token = app.config["OPS_TOKEN"]
+        if token:
+            allowed = hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+        else:
+            try:
+                allowed = ipaddress.ip_address(request.remote_addr or "").is_loopback
+            except ValueError:
+                allowed = False
+        if not allowed:
+            abort(403)
+        return view(*args, **kwargs)
+    return guarded
+
+
+@app.route("/metrics")
+@operator_only
+def metrics():
+    """Prometheus scrape endpoint"""
+    body = collector.metrics.render() + "\n".join(request_seconds.render()) + "\n"
+    return Response(body, content_type=CONTENT_TYPE, headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/api/profiler", methods=["GET", "POST"])
+@operator_only
+def profile():
+    """GET: the hottest stacks (?format=folded for flame graph tools);
+    POST {"action": "start"|"stop"}: switch the sampling profiler"""
+    if request.method == "POST":
+        action = (request.get_json(silent=True) or {}).get("action")
+        if action not in ("start", "stop"):
+            return jsonify({"error": "action must be start or stop"}), 400
+        if action == "start":
+            profiler.start()
+        else:
+            profiler.stop()
+    if request.args.get("format") == "folded":
+        return Response(profiler.collapsed(), mimetype="text/plain")
+    return jsonify(profiler.report(request.args.get("top", 20, type=int)))
+
+
+# ==============================
+# Main
+# ==============================
+def main():
+    global stream_server
+    parser = argparse.ArgumentParser(description="Serve the site, API and collector")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--max-tickers", type=int, default=MAX_ACTIVE_TICKERS)
+    parser.add_argument("--watchlist", help="also collect everything in this watchlist file")
+    parser.add_argument("--metrics-every", type=float, default=None,
+                        help="seconds between collector metrics log lines (off by default)")
+    parser.add_argument("--market-hours", action="store_true",
+                        help="don't poll while a ticker's exchange is closed (see market_calendar.json)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="back off exponentially while a price is unchanged")
+    parser.add_argument("--stream-port", type=int, default=None,
+                        help="port of the live stream server (default: --port + 1; 0 serves streams from Flask)")
+    args = parser.parse_args()
+
+    app.config["MAX_ACTIVE_TICKERS"] = args.max_tickers
+    collector.watchlist = args.watchlist
+    collector.metrics_every = args.metrics_every
+    collector.market_hours = args.market_hours
+    collector.adaptive = args.adaptive
+    get_collector()
+    stream_port = args.port + 1 if args.stream_port is None else args.stream_port
+    if stream_port:
+        stream_server = StreamServer(hub, stream_target).start(args.host, stream_port)
+        print(f"📡 Live streams on port {stream_server.port}")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
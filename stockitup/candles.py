@@ -0,0 +1,192 @@
+"""OHLC candles maintained incrementally at ingest time.
+
+For every tick log foo.jsonl the collector keeps foo.candles.<res>.jsonl
+(one closed candle per line: {"t", "o", "h", "l", "c", "n"}) for each
+resolution below. Each tick only touches the open candle of each
+resolution, and a candle is appended to disk once when it closes. Buckets
+are aligned to local time, so "1D" candles start at local midnight.
+"""
+import bisect
+import os
+import threading
+import time
+
+from stockitup.ticklog import append_tick, iter_ticks, last_entry, offset_at, parse_ts_ms
+
+RESOLUTIONS = {
+    "1m": 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "1D": 24 * 60 * 60 * 1000,
+}
+FIELDS = ("t", "o", "h", "l", "c", "n")
+
+
+def candle_path(log_file: str, res: str) -> str:
+    root, _ = os.path.splitext(log_file)
+    return f"{root}.candles.{res}.jsonl"
+
+
+def bucket_start(ts_ms: int, span_ms: int) -> int:
+    offset = time.localtime(ts_ms / 1000).tm_gmtoff * 1000
+    return (ts_ms + offset) // span_ms * span_ms - offset
+
+
+def build_candles(ticks, span_ms: int) -> list:
+    """Candles for (ts_ms, price) pairs in time order (used by compaction)"""
+    out = []
+    for ts, price in ticks:
+        start = bucket_start(ts, span_ms)
+        candle = out[-1] if out else None
+        if candle is None or start > candle["t"]:
+            out.append({"t": start, "o": price, "h": price, "l": price, "c": price, "n": 1})
+        elif start == candle["t"]:
+            candle["h"] = max(candle["h"], price)
+            candle["l"] = min(candle["l"], price)
+            candle["c"] = price
+            candle["n"] += 1
+    return out
+
+
+# ==============================
+# Builder (write side)
+# ==============================
+class CandleBuilder:
+    """Open candles for one ticker; closed ones are appended to disk"""
+
+    def __init__(self, log_file: str, resolutions=RESOLUTIONS):
+        self.log_file = log_file
+        self.resolutions = dict(resolutions)
+        self.open = {res: None for res in self.resolutions}
+        self._lock = threading.Lock()
+        self._resume()
+
+    def _resume(self):
+        """Rebuild open candles from the raw ticks after the last persisted ones"""
+        closed_until = {}
+        for res, span in self.resolutions.items():
+            last = last_entry(candle_path(self.log_file, res))
+            closed_until[res] = last["t"] + span if last and isinstance(last.get("t"), int) else None
+        resume_from = min(closed_until.values(), key=lambda t: t or 0) if closed_until else None
+        offset = offset_at(self.log_file, resume_from) if resume_from else 0
+        for _, entry in iter_ticks(self.log_file, offset):
+            ts = parse_ts_ms(entry.get("timestamp"))
+            price = entry.get("price")
+            if ts is None or not isinstance(price, (int, float)):
+                continue
+            for res in self.resolutions:
+                if closed_until[res] is None or ts >= closed_until[res]:
+                    self._update_one(res, ts, float(price))
+
+    def _update_one(self, res: str, ts_ms: int, price: float):
+        start = bucket_start(ts_ms, self.resolutions[res])
+        candle = self.open[res]
+        if candle is not None and start < candle["t"]:
+            return  # late tick for a candle that is already closed
+        if candle is None or start > candle["t"]:
+            if candle is not None:
+                append_tick(candle_path(self.log_file, res), candle)
+            self.open[res] = {"t": start, "o": price, "h": price, "l": price, "c": price, "n": 1}
+            return
+        candle["h"] = max(candle["h"], price)
+        candle["l"] = min(candle["l"], price)
+        candle["c"] = price
+        candle["n"] += 1
+
+    def update(self, ts_ms: int, price: float):
+        with self._lock:
+            for res in self.resolutions:
+                self._update_one(res, ts_ms, price)
+
+    def add_entry(self, entry: dict):
+        ts = parse_ts_ms(entry.get("timestamp"))
+        if ts is not None:
+            self.update(ts, float(entry["price"]))
+
+    def current(self, res: str):
+        with self._lock:
+            candle = self.open.get(res)
+            return dict(candle) if candle else None
+
+
+# ==============================
+# Reader (query side)
+# ==============================
+class CandleIndex:
+    """Columns of one candle file, extended by reading only its new tail"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.cols = {k: [] for k in FIELDS}
+        self._offset = 0
+        self._stat = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self.cols = {k: [] for k in FIELDS}
+                self._offset, self._stat = 0, None
+                return self
+            if self._stat and (st.st_ino != self._stat[0] or st.st_size < self._offset):
+                self.cols = {k: [] for k in FIELDS}
+                self._offset = 0
+            if (st.st_ino, st.st_size) != self._stat:
+                for offset, candle in iter_ticks(self.path, self._offset):
+                    self._offset = offset
+                    if all(k in candle for k in FIELDS) and (not self.cols["t"] or candle["t"] > self.cols["t"][-1]):
+                        for k in FIELDS:
+                            self.cols[k].append(candle[k])
+                self._stat = (st.st_ino, st.st_size)
+        return self
+
+    def since(self, start_ms=None) -> dict:
+        with self._lock:
+            lo = 0 if start_ms is None else bisect.bisect_left(self.cols["t"], start_ms)
+            return {k: v[lo:] for k, v in self.cols.items()}
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _index(log_file: str, res: str) -> CandleIndex:
+    path = os.path.abspath(candle_path(log_file, res))
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = CandleIndex(path)
+    return index
+
+
+def first_candle(log_file: str, res: str):
+    """Start (epoch ms) of the oldest stored candle, or None"""
+    t = _index(log_file, res).refresh().cols["t"]
+    return t[0] if t else None
+
+
+def last_candle(log_file: str, res: str):
+    """Start (epoch ms) of the newest stored candle, or None"""
+    t = _index(log_file, res).refresh().cols["t"]
+    return t[-1] if t else None
+
+
+def query_candles(log_file: str, res: str, start_ms: int = None, live: dict = None) -> dict:
+    """Closed candles from `start_ms` on, plus the open candle `live` if given"""
+    out = _index(log_file, res).refresh().since(start_ms)
+    if live and (not out["t"] or live["t"] > out["t"][-1]) and (start_ms is None or live["t"] >= start_ms):
+        for k in FIELDS:
+            out[k].append(live[k])
+    return out
+
+
+def pick_resolution(span_ms: int, min_rows: int):
+    """Coarsest resolution that still gives `min_rows` candles over `span_ms`
+    (the finest one if none does)"""
+    for res, span in sorted(RESOLUTIONS.items(), key=lambda kv: kv[1], reverse=True):
+        if span_ms / span >= min_rows:
+            return res
+    return min(RESOLUTIONS, key=RESOLUTIONS.get)
@@ -0,0 +1,478 @@
+"""One asyncio collector process for every ticker in watchlist.json.
+
+Usage:
+    python -m stockitup.collector
+    python -m stockitup.collector --watchlist watchlist.json --interval 10 --concurrency 8
+
+Each watchlist entry is {"ticker", "exchange"} with an optional "file"
+(tick log path relative to the repo root, e.g. "bronze.json" to keep a
+metal page fed) and an optional per-ticker "interval" in seconds. By
+default ticks go to Company-Jsons/<ticker>.jsonl. Edits to the watchlist
+are picked up while running, so tickers can be added or removed without a
+restart.
+
+With --change-only a tick is stored only when the price moves, plus a
+heartbeat every --heartbeat seconds (see stockitup.encoding). Candles still
+see every poll.
+
+With --market-hours a ticker is not polled while its exchange is closed,
+according to market_calendar.json. With --adaptive the delay doubles after
+each unchanged price, up to --max-interval, and drops back to --interval
+as soon as the price moves. Both are implemented in stockitup.schedule.
+
+With --compact-every N the collector also applies the retention tiers from
+stockitup.compact to every active log once every N seconds, and with
+--snapshots it keeps the static chart snapshots (stockitup.snapshots) of
+every ticker up to date.
+
+Per-ticker fetch, parse and write times, tick counts, missing-price pages
+and staleness are kept in Collector.metrics (stockitup.metrics). With
+--metrics-port they are served for Prometheus at /metrics, and with
+--metrics-every N they are summarised in one log line every N seconds.
+kill -USR1 <pid> switches the sampling profiler on, and a second one
+switches it off and writes the collapsed stacks to a temp file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from stockitup.candles import CandleBuilder
+from stockitup.colstore import open_columns
+from stockitup.compact import compact_log
+from stockitup.encoding import HEARTBEAT_EVERY, ChangeFilter
+from stockitup.extract import extract_price
+from stockitup.metrics import CollectorMetrics, profiler, serve_metrics
+from stockitup.schedule import MAX_INTERVAL, PollSchedule, default_calendar
+from stockitup.snapshots import Publisher
+from stockitup.ticklog import append_tick, last_entry, log_path_for, migrate_array, parse_ts_ms
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+JSON_FOLDER = os.path.join(ROOT, "Company-Jsons")
+WATCHLIST_FILE = os.path.join(ROOT, "watchlist.json")
+
+DEFAULT_INTERVAL = 10      # seconds between polls of one ticker
+DEFAULT_CONCURRENCY = 8    # max requests in flight across all tickers
+WATCHLIST_CHECK_EVERY = 2  # seconds between watchlist mtime checks
+
+
+# ==============================
+# Google Finance quote page
+# ==============================
+def quote_url(ticker: str, exchange: str) -> str:
+    return f"https://www.google.com/finance/quote/{ticker}:{exchange}?hl=en"
+
+
+# ==============================
+# Watchlist
+# ==============================
+def ticker_key(ticker: str, exchange: str):
+    return ticker.upper(), exchange.upper()
+
+
+def load_watchlist(path: str) -> dict:
+    """Read watchlist.json into {(TICKER, EXCHANGE): entry}"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read watchlist {path}: {e}")
+        return None
+    entries = {}
+    for item in data if isinstance(data, list) else []:
+        if isinstance(item, dict) and item.get("ticker"):
+            item.setdefault("exchange", "NSE")
+            entries[ticker_key(item["ticker"], item["exchange"])] = item
+    return entries
+
+
+# ==============================
+# Collector
+# ==============================
+class Collector:
+    """Polls many tickers concurrently over one pooled HTTP session.
+
+    Fetches run on worker threads but never more than `concurrency` at a
+    time, so memory and CPU follow the requests in flight rather than the
+    number of tickers. Storing a tick (log, candles, columns, on_tick) also
+    runs on a worker thread, so disk writes never stall the event loop.
+    add() and remove() are safe to call from any thread.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, concurrency=DEFAULT_CONCURRENCY,
+                 json_folder=JSON_FOLDER, watchlist=None, candles=True, columns=True,
+                 change_only=False, heartbeat=HEARTBEAT_EVERY, compact_every=None, metrics_every=None,
+                 market_hours=False, adaptive=False, max_interval=MAX_INTERVAL):
+        self.interval = interval
+        self.candles = candles
+        self.columns = columns
+        self.change_only = change_only  # store a tick only when the price moves
+        self.heartbeat = heartbeat
+        self.market_hours = market_hours  # skip polls while the exchange is closed
+        self.adaptive = adaptive          # back off while the price is unchanged
+        self.max_interval = max_interval
+        self.compact_every = compact_every  # seconds between compactions (None = never)
+        self.metrics_every = metrics_every  # seconds between metrics log lines (None = never)
+        self.metrics = CollectorMetrics()
+        self.concurrency = concurrency
+        self.json_folder = json_folder
+        self.watchlist = watchlist
+        self.on_tick = []  # callbacks(entry) run after every stored tick
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> {"ticker", "exchange", "log_file", "interval", "candles", "columns", "changes", "schedule"}
+        self._tasks = {}    # key -> asyncio.Task
+        self._from_watchlist = set()
+        self._loop = None
+        self._sem = None
+        self._ready = threading.Event()
+
+    # ---------- registration ----------
+    def log_file_for(self, ticker: str, file: str = None) -> str:
+        if file:
+            array_file = file if os.path.isabs(file) else os.path.join(ROOT, file)
+        else:
+            os.makedirs(self.json_folder, exist_ok=True)
+            array_file = os.path.join(self.json_folder, f"{ticker}.json")
+        if array_file.endswith(".jsonl"):
+            return array_file
+        return migrate_array(array_file, log_path_for(array_file))
+
+    def change_filter(self, log_file: str) -> ChangeFilter:
+        """Change-only filter that carries on from the last stored tick"""
+        change = ChangeFilter(self.heartbeat)
+        last = last_entry(log_file)
+        if last and isinstance(last.get("price"), (int, float)):
+            change.classify(parse_ts_ms(last.get("timestamp")) or 0, float(last["price"]))
+        return change
+
+    def add(self, ticker: str, exchange: str = "NSE", file: str = None, interval=None) -> bool:
+        """Start polling a ticker; returns False if it was already active"""
+        key = ticker_key(ticker, exchange)
+        if self.is_active(ticker, exchange):
+            return False
+        log_file = self.log_file_for(ticker, file)
+        item = {
+            "ticker": ticker,
+            "exchange": exchange,
+            "log_file": log_file,
+            "interval": interval or self.interval,
+            "candles": CandleBuilder(log_file) if self.candles else None,
+            "columns": open_columns(log_file, ticker) if self.columns else None,
+            "changes": self.change_filter(log_file) if self.change_only else None,
+            "schedule": PollSchedule(ticker, exchange, interval or self.interval, self.max_interval,
+                                     default_calendar() if self.market_hours else None, self.adaptive),
+        }
+        with self._lock:
+            if key in self._entries:
+                if item["columns"]:
+                    item["columns"].close()
+                return False
+            self._entries[key] = item
+        last = last_entry(log_file)
+        last_ts = parse_ts_ms(last.get("timestamp")) if last else None
+        if last_ts:
+            self.metrics.seen(ticker, last_ts)
+        self._call(self._spawn, key)
+        print(f"➕ Collecting {ticker} ({exchange})")
+        return True
+
+    def remove(self, ticker: str, exchange: str = "NSE") -> bool:
+        """Stop polling a ticker; returns False if it wasn't active"""
+        key = ticker_key(ticker, exchange)
+        with self._lock:
+            item = self._entries.pop(key, None)
+        if item is None:
+            return False
+        self._call(self._cancel, key)
+        self.metrics.forget(item["ticker"])
+        if item["columns"]:
+            item["columns"].close()
+        print(f"➖ Stopped collecting {ticker} ({exchange})")
+        return True
+
+    def active(self) -> list:
+        with self._lock:
+            return [{"ticker": e["ticker"], "exchange": e["exchange"]} for e in self._entries.values()]
+
+    def is_active(self, ticker: str, exchange: str = "NSE") -> bool:
+        with self._lock:
+            return ticker_key(ticker, exchange) in self._entries
+
+    def find(self, ticker: str):
+        """Entry of an active ticker (any exchange), or None"""
+        with self._lock:
+            for (key_ticker, _), item in self._entries.items():
+                if key_ticker == ticker.upper():
+                    return item
+        return None
+
+    def find_log(self, ticker: str):
+        """Tick log path of an active ticker (any exchange), or None"""
+        item = self.find(ticker)
+        return item["log_file"] if item else None
+
+    def _call(self, fn, *args):
+        """Run fn on the event loop thread (or later, once the loop starts)"""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            fn(*args)
+        else:
+            loop.call_soon_threadsafe(fn, *args)
+
+    def _spawn(self, key):
+        with self._lock:
+            wanted = key in self._entries
+        if wanted and key not in self._tasks:
+            self._tasks[key] = self._loop.create_task(self._poll(key))
+
+    def _cancel(self, key):
+        task = self._tasks.pop(key, None)
+        if task:
+            task.cancel()
+
+    # ---------- fetching ----------
+    def _fetch_sync(self, ticker: str, exchange: str):
+        t0 = time.perf_counter()
+        response = self.session.get(quote_url(ticker, exchange), timeout=10)
+        self.metrics.fetch.observe(time.perf_counter() - t0, ticker)
+        response.raise_for_status()
+        t0 = time.perf_counter()
+        price = extract_price(response.text)
+        self.metrics.parse.observe(time.perf_counter() - t0, ticker)
+        return price
+
+    async def fetch_price(self, ticker: str, exchange: str):
+        self.metrics.polls.inc(ticker)
+        async with self._sem:
+            try:
+                price = await asyncio.to_thread(self._fetch_sync, ticker, exchange)
+            except Exception as e:
+                self.metrics.errors.inc(ticker, "fetch")
+                print(f"❌ Error fetching price for {ticker}: {e}")
+                return None
+        if price is None:
+            self.metrics.not_found.inc(ticker)
+            print(f"⚠️ Price element not found for {ticker}. The page structure may have changed.")
+        return price
+
+    def record(self, item: dict, price: float):
+        """Store one polled price; returns the stored entry, or None if the
+        change-only filter dropped it"""
+        entry = {
+            "ticker": item["ticker"],
+            "exchange": item["exchange"],
+            "price": price,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        ts = parse_ts_ms(entry["timestamp"])
+        t0 = time.perf_counter()
+        try:
+            if item["candles"]:
+                item["candles"].update(ts, price)  # every tick, even one the change filter drops
+            if item["changes"]:
+                kind = item["changes"].classify(ts, price)
+                if kind is None:
+                    return None
+                if kind == "heartbeat":
+                    entry["hb"] = 1
+            append_tick(item["log_file"], entry)
+            if item["columns"]:
+                item["columns"].append(ts, price)
+        except Exception as e:
+            self.metrics.errors.inc(item["ticker"], "write")
+            print(f"❌ Error writing to file: {e}")
+            return entry
+        self.metrics.write.observe(time.perf_counter() - t0, item["ticker"])
+        self.metrics.ticks.inc(item["ticker"])
+        self.metrics.seen(item["ticker"], ts)
+        for callback in self.on_tick:
+            try:
+                callback(entry)
+            except Exception as e:
+                print(f"⚠️ on_tick callback failed: {e}")
+        return entry
+
+    async def _poll(self, key):
+        try:
+            while True:
+                with self._lock:
+                    item = self._entries.get(key)
+                if item is None:
+                    return
+                try:
+                    delay = item["schedule"].closed_for()
+                    if not delay:
+                        price = await self.fetch_price(item["ticker"], item["exchange"])
+                        if price is not None:
+                            await asyncio.to_thread(self.record, item, price)
+                        delay = item["schedule"].next_delay(price)
+                except Exception as e:  # keep polling; a dead task would still look active
+                    self.metrics.errors.inc(item["ticker"], "poll")
+                    print(f"❌ Error polling {item['ticker']}: {e}")
+                    delay = item["interval"]
+                await asyncio.sleep(delay)
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+
+    # ---------- watchlist ----------
+    def sync_watchlist(self, entries: dict):
+        """Make the active set match the watchlist (tickers added via add() stay)"""
+        for key, item in entries.items():
+            self.add(item["ticker"], item["exchange"], item.get("file"), item.get("interval"))
+        for key in self._from_watchlist - set(entries):
+            self.remove(*key)
+        self._from_watchlist = set(entries)
+
+    async def _watch(self):
+        last_mtime = None
+        while True:
+            try:
+                mtime = os.path.getmtime(self.watchlist)
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != last_mtime:
+                entries = load_watchlist(self.watchlist)
+                if entries is not None:
+                    self.sync_watchlist(entries)
+                    last_mtime = mtime
+            await asyncio.sleep(WATCHLIST_CHECK_EVERY)
+
+    # ---------- compaction ----------
+    async def _compact(self):
+        while True:
+            await asyncio.sleep(self.compact_every)
+            with self._lock:
+                logs = sorted({item["log_file"] for item in self._entries.values()})
+            for log_file in logs:
+                try:
+                    stats = await asyncio.to_thread(compact_log, log_file)
+                except Exception as e:
+                    print(f"❌ Error compacting {log_file}: {e}")
+                    continue
+                if stats["ticks_dropped"] or stats["candles_dropped"]:
+                    print(f"🧹 Compacted {log_file}: {stats['size_before']} -> {stats['size_after']} bytes")
+
+    # ---------- metrics ----------
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.metrics_every)
+            print(self.metrics.summary())
+
+    # ---------- running ----------
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        # fetches (at most `concurrency`, see _sem) and record() share the pool;
+        # the second half keeps log writes from queueing behind slow fetches
+        self._loop.set_default_executor(ThreadPoolExecutor(2 * self.concurrency, thread_name_prefix="poll"))
+        self._sem = asyncio.Semaphore(self.concurrency)
+        with self._lock:
+            keys = list(self._entries)
+        for key in keys:
+            self._spawn(key)
+        self._ready.set()
+        compactor = self._loop.create_task(self._compact()) if self.compact_every else None
+        reporter = self._loop.create_task(self._report()) if self.metrics_every else None
+        try:
+            if self.watchlist:
+                await self._watch()
+            else:
+                await asyncio.Event().wait()
+        finally:
+            for task in list(self._tasks.values()):
+                task.cancel()
+            if compactor:
+                compactor.cancel()
+            if reporter:
+                reporter.cancel()
+            self.session.close()
+
+    def start_in_thread(self) -> threading.Thread:
+        """Run the collector on a background thread (for use inside a server)"""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True, name="collector")
+        thread.start()
+        self._ready.wait()
+        return thread
+
+
+# ==============================
+# Main
+# ==============================
+def toggle_profiler(signum=None, frame=None):
+    """SIGUSR1 handler: start the sampling profiler, or stop it and save the stacks"""
+    if profiler.start():
+        print("📊 Profiler started")
+        return
+    profiler.stop()
+    path = os.path.join(tempfile.gettempdir(), f"stockitup-profile-{os.getpid()}-{int(time.time())}.folded")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+    print(f"📊 Profiler stopped after {profiler.samples} samples; stacks saved to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect prices for every ticker in a watchlist")
+    parser.add_argument("--watchlist", default=WATCHLIST_FILE)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--change-only", action="store_true",
+                        help="store a tick only when the price changes, plus periodic heartbeats")
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT_EVERY,
+                        help="seconds between heartbeats in --change-only mode")
+    parser.add_argument("--compact-every", type=float, default=None,
+                        help="seconds between compactions of the active logs (off by default)")
+    parser.add_argument("--snapshots", action="store_true",
+                        help="publish static per-range snapshots (stockitup.snapshots) as ticks arrive")
+    parser.add_argument("--market-hours", action="store_true",
+                        help="don't poll while the exchange is closed (see market_calendar.json)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="back off exponentially while the price is unchanged")
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL,
+                        help="slowest poll interval in --adaptive mode")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-every", type=float, default=None,
+                        help="seconds between metrics summary log lines (off by default)")
+    args = parser.parse_args()
+
+    collector = Collector(args.interval, args.concurrency, watchlist=args.watchlist,
+                          change_only=args.change_only, heartbeat=args.heartbeat,
+                          compact_every=args.compact_every, metrics_every=args.metrics_every,
+                          market_hours=args.market_hours, adaptive=args.adaptive,
+                          max_interval=args.max_interval)
+    if args.metrics_port:
+        serve_metrics(collector.metrics.render, port=args.metrics_port)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, toggle_profiler)
+    if args.snapshots:
+        publisher = Publisher()
+        publisher.start()
+        collector.on_tick.append(lambda entry: publisher.mark(collector.find_log(entry["ticker"]), entry["ticker"]))
+    try:
+        asyncio.run(collector.run())
+    except KeyboardInterrupt:
+        print("🛑 Stopped by user.")
+
+
+if __name__ == "__main__":
+    main()
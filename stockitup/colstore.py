@@ -0,0 +1,252 @@
+"""Columnar, memory-mapped tick store.
+
+For every tick log foo.jsonl the collector also keeps foo.cols/ with two
+fixed-width columns:
+
+    ts.i64     int64 epoch milliseconds, ascending
+    price.f64  float64 price
+
+Readers memory-map both files as NumPy arrays, so a range lookup is two
+binary searches (np.searchsorted) and a zero-copy slice. The writer only
+ever appends 8 bytes per column; readers size the arrays from the shorter
+column, so they never see a half-written row while the collector runs.
+Appends hold the lock on ts.i64, which drop_before takes to swap in a
+compacted store.
+"""
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from stockitup.ticklog import is_current, iter_ticks, lock_file, parse_ts_ms, unlock_file
+
+TS_FILE = "ts.i64"
+PRICE_FILE = "price.f64"
+
+
+def columns_dir_for(log_file: str) -> str:
+    root, _ = os.path.splitext(log_file)
+    return root + ".cols"
+
+
+# ==============================
+# Writer
+# ==============================
+class ColumnWriter:
+    """Appends (ts, price) rows; rows older than the last one are dropped"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._open()
+
+    def _open(self):
+        ts_path = os.path.join(self.directory, TS_FILE)
+        self._ts = open(ts_path, "ab")
+        self._price = open(os.path.join(self.directory, PRICE_FILE), "ab")
+        self._trim()
+        size = os.path.getsize(ts_path)
+        self.last_ts = None
+        if size:
+            self.last_ts = int(np.fromfile(ts_path, dtype=np.int64, count=1, offset=size - 8)[0])
+
+    def _lock(self):
+        """Lock the ts column, reopening if a compaction replaced the store"""
+        while True:
+            lock_file(self._ts)
+            if is_current(self._ts, os.path.join(self.directory, TS_FILE)):
+                return
+            self.close()
+            self._open()
+
+    def _trim(self):
+        """Drop a torn trailing row left by a crash between the two writes"""
+        n = min(os.fstat(self._ts.fileno()).st_size, os.fstat(self._price.fileno()).st_size) // 8
+        for f in (self._ts, self._price):
+            if os.fstat(f.fileno()).st_size != n * 8:
+                f.truncate(n * 8)
+
+    def append(self, ts_ms: int, price: float) -> bool:
+        self._lock()
+        try:
+            if self.last_ts is not None and ts_ms < self.last_ts:
+                return False
+            # price first: readers size from the shorter column, so a row only
+            # becomes visible once its timestamp lands
+            self._price.write(np.float64(price).tobytes())
+            self._price.flush()
+            self._ts.write(np.int64(ts_ms).tobytes())
+            self._ts.flush()
+            self.last_ts = ts_ms
+            return True
+        finally:
+            unlock_file(self._ts)
+
+    def append_many(self, ts, prices):
+        ts = np.asarray(ts, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if self.last_ts is not None:
+            keep = ts >= self.last_ts
+            ts, prices = ts[keep], prices[keep]
+        if not len(ts):
+            return
+        self._price.write(prices.tobytes())
+        self._price.flush()
+        self._ts.write(ts.tobytes())
+        self._ts.flush()
+        self.last_ts = int(ts[-1])
+
+    def close(self):
+        self._ts.close()
+        self._price.close()
+
+
+def open_columns(log_file: str, ticker: str = None) -> ColumnWriter:
+    """Writer for a log's column store, backfilled from the log on first use"""
+    directory = columns_dir_for(log_file)
+    if os.path.isdir(directory):
+        return ColumnWriter(directory)
+
+    # Build into a temp dir and rename, so readers never see a partial backfill
+    tmp = directory + ".tmp"
+    if os.path.isdir(tmp):
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+    writer = ColumnWriter(tmp)
+    ts, prices = [], []
+    for _, entry in iter_ticks(log_file):
+        if ticker and str(entry.get("ticker", "")).upper() != ticker.upper():
+            continue
+        t = parse_ts_ms(entry.get("timestamp"))
+        if t is None or not isinstance(entry.get("price"), (int, float)):
+            continue
+        ts.append(t)
+        prices.append(float(entry["price"]))
+    order = np.argsort(np.asarray(ts, dtype=np.int64), kind="stable")
+    writer.append_many(np.asarray(ts, dtype=np.int64)[order], np.asarray(prices)[order])
+    writer.close()
+    os.rename(tmp, directory)
+    return ColumnWriter(directory)
+
+
+def _rows(directory: str) -> int:
+    return min(os.path.getsize(os.path.join(directory, TS_FILE)),
+               os.path.getsize(os.path.join(directory, PRICE_FILE))) // 8
+
+
+def drop_before(directory: str, cutoff_ms: int) -> int:
+    """Compact a column store to the rows at or after `cutoff_ms`.
+
+    The kept rows are copied into <dir>.new without blocking the writer,
+    then rows appended meanwhile are copied and the directories swapped
+    under the ts.i64 lock. Returns the number of rows dropped.
+    """
+    ts_path = os.path.join(directory, TS_FILE)
+    price_path = os.path.join(directory, PRICE_FILE)
+    if not os.path.exists(ts_path):
+        return 0
+    new, old = directory + ".new", directory + ".old"
+    for path in (new, old):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    with open(ts_path, "rb") as held:
+        n = _rows(directory)
+        ts = np.fromfile(ts_path, dtype=np.int64, count=n)
+        lo = int(np.searchsorted(ts, cutoff_ms, side="left"))
+        if lo == 0:
+            return 0
+        os.makedirs(new)
+        with open(os.path.join(new, TS_FILE), "wb") as ts_out, open(os.path.join(new, PRICE_FILE), "wb") as price_out:
+            ts_out.write(ts[lo:].tobytes())
+            price_out.write(np.fromfile(price_path, dtype=np.float64, count=n - lo, offset=lo * 8).tobytes())
+            lock_file(held)
+            m = _rows(directory)
+            if m > n:
+                ts_out.write(np.fromfile(ts_path, dtype=np.int64, count=m - n, offset=n * 8).tobytes())
+                price_out.write(np.fromfile(price_path, dtype=np.float64, count=m - n, offset=n * 8).tobytes())
+        os.rename(directory, old)
+        os.rename(new, directory)
+    shutil.rmtree(old)
+    return lo
+
+
+# ==============================
+# Reader
+# ==============================
+class ColumnIndex:
+    """Memory-mapped view of one column store (same interface as TickIndex)"""
+
+    def __init__(self, directory: str, ticker: str, path: str = None):
+        self.directory = directory
+        self.ticker = ticker.upper()
+        self.path = path or directory  # tick log the columns belong to
+        self.ts = np.empty(0, dtype=np.int64)
+        self.prices = np.empty(0, dtype=np.float64)
+        self._ino = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Remap if the collector appended (or a compaction swapped the store)"""
+        ts_path = os.path.join(self.directory, TS_FILE)
+        price_path = os.path.join(self.directory, PRICE_FILE)
+        try:
+            ino = os.stat(ts_path).st_ino
+            n = _rows(self.directory)
+        except OSError:
+            return self  # mid-swap: keep serving the current mapping
+        with self._lock:
+            if n == len(self.ts) and ino == self._ino:
+                return self
+            self._ino = ino
+            if n == 0:
+                self.ts = np.empty(0, dtype=np.int64)
+                self.prices = np.empty(0, dtype=np.float64)
+            else:
+                self.ts = np.memmap(ts_path, dtype=np.int64, mode="r", shape=(n,))
+                self.prices = np.memmap(price_path, dtype=np.float64, mode="r", shape=(n,))
+        return self
+
+    def _arrays(self):
+        with self._lock:
+            return self.ts, self.prices
+
+    @property
+    def version(self) -> str:
+        ts, prices = self._arrays()
+        return f"{len(ts)}-{int(ts[-1])}-{float(prices[-1])!r}" if len(ts) else "0"
+
+    @property
+    def latest_ts(self):
+        ts, _ = self._arrays()
+        return int(ts[-1]) if len(ts) else None
+
+    def since(self, since_ms: int):
+        ts, prices = self._arrays()
+        lo = np.searchsorted(ts, since_ms, side="right")
+        return ts[lo:], prices[lo:]
+
+    def range(self, start_ms: int, end_ms: int = None):
+        """Zero-copy (timestamps, prices) views with start_ms <= ts < end_ms"""
+        ts, prices = self._arrays()
+        lo = np.searchsorted(ts, start_ms, side="left")
+        hi = len(ts) if end_ms is None else np.searchsorted(ts, end_ms, side="left")
+        return ts[lo:hi], prices[lo:hi]
+
+    def bounds(self, span_ms):
+        ts, _ = self._arrays()
+        if not len(ts):
+            return None, None, 0
+        end = int(ts[-1])
+        if span_ms is None:
+            return int(ts[0]), end, len(ts)
+        lo = np.searchsorted(ts, end - span_ms, side="left")
+        return end - span_ms, end, len(ts) - int(lo)
+
+    def window(self, span_ms):
+        ts, prices = self._arrays()
+        if not len(ts) or span_ms is None:
+            return ts, prices
+        return self.range(int(ts[-1]) - span_ms)
@@ -0,0 +1,171 @@
+"""Tiered retention for tick histories.
+
+Raw ticks are kept for RETAIN_RAW (10D, the longest range the charts show
+tick by tick). Anything older survives only as OHLC candles, and each
+candle resolution has its own retention in CANDLE_RETENTION (1h and 1D are
+kept forever, at 24 and 1 lines a day). So a log's size is bounded by its
+retention window instead of by uptime.
+
+Usage:
+    python -m stockitup.compact                      # Company-Jsons/ and the metal pages
+    python -m stockitup.compact bronze.json --raw 5D
+
+Every rewrite goes to a temp file that replaces the original by rename,
+under the lock writers take per append, so collectors keep running and
+readers see either the old file or the new one. The collector can also
+run this itself (--compact-every).
+"""
+import argparse
+import glob
+import os
+import time
+
+from stockitup.candles import RESOLUTIONS, bucket_start, build_candles, candle_path
+from stockitup.colstore import columns_dir_for, drop_before
+from stockitup.series import RANGE_OPTIONS
+from stockitup.ticklog import drop_head, iter_ticks, log_path_for, migrate_array, offset_at, parse_ts_ms, rewrite_log
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+JSON_FOLDER = os.path.join(ROOT, "Company-Jsons")
+# The single-ticker scripts write to the folder they are started from: the
+# repo root, or their own folder
+LEGACY_ARRAYS = [
+    "bronze.json", "copper.json", "array.json", "pla.json", "Reliance.json",
+    "bronze/bronze.json", "copper/copper.json", "silver/array.json", "platinum/pla.json",
+    "homepage.index/Reliance.json",
+]
+
+DAY_MS = RESOLUTIONS["1D"]
+RETAIN_RAW = RANGE_OPTIONS["10D"]
+CANDLE_RETENTION = {
+    "1m": 30 * DAY_MS,
+    "5m": 365 * DAY_MS,
+    "15m": 2 * 365 * DAY_MS,
+    "1h": None,
+    "1D": None,
+}
+UNITS = {"m": 60 * 1000, "H": 60 * 60 * 1000, "D": DAY_MS}
+
+
+def parse_span(text: str):
+    """'10D', '12H', '30m' -> milliseconds; 'none' -> None (keep forever)"""
+    if text.lower() == "none":
+        return None
+    try:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    except (KeyError, ValueError, IndexError):
+        raise argparse.ArgumentTypeError(f"bad duration {text!r} (use e.g. 10D, 12H, 30m or none)")
+
+
+# ==============================
+# Compaction
+# ==============================
+def roll_up(log_file: str, ticks: list) -> int:
+    """Add candles for ticks that are about to be dropped, where the candle
+    files don't have them yet. Returns the number of candles added."""
+    added = 0
+    for res, span in RESOLUTIONS.items():
+        built = build_candles(ticks, span)
+
+        def merge(entries):
+            nonlocal added
+            have = {c.get("t") for c in entries}
+            missing = [c for c in built if c["t"] not in have]
+            added += len(missing)
+            return sorted(entries + missing, key=lambda c: c.get("t", 0)) if missing else entries
+
+        if built:
+            rewrite_log(candle_path(log_file, res), merge)
+    return added
+
+
+def trim_candles(log_file: str, res: str, cutoff_ms: int) -> int:
+    """Drop candles older than `cutoff_ms`; returns how many were dropped"""
+    path = candle_path(log_file, res)
+    first = next(iter_ticks(path), (None, {}))[1]
+    if not isinstance(first.get("t"), int) or first["t"] >= cutoff_ms:
+        return 0
+    dropped = 0
+
+    def keep(entries):
+        nonlocal dropped
+        kept = [c for c in entries if c.get("t", 0) >= cutoff_ms]
+        dropped = len(entries) - len(kept)
+        return kept
+
+    rewrite_log(path, keep)
+    return dropped
+
+
+def compact_log(log_file: str, retain_raw=RETAIN_RAW, candle_retention=CANDLE_RETENTION, now_ms: int = None) -> dict:
+    """Apply the retention tiers to one tick log and its candles/columns"""
+    now_ms = now_ms or int(time.time() * 1000)
+    stats = {"log": log_file, "ticks_dropped": 0, "candles_added": 0, "candles_dropped": 0}
+    if not os.path.exists(log_file):
+        return stats
+    stats["size_before"] = os.path.getsize(log_file)
+
+    if retain_raw is not None:
+        # Cut on a local-midnight boundary, so every dropped tick falls in a
+        # bucket that has closed at every resolution
+        cutoff = bucket_start(now_ms - retain_raw, DAY_MS)
+        offset = offset_at(log_file, cutoff)
+        if offset:
+            ticks = []
+            for next_offset, entry in iter_ticks(log_file):
+                if next_offset > offset:
+                    break
+                ts = parse_ts_ms(entry.get("timestamp"))
+                if ts is not None and isinstance(entry.get("price"), (int, float)):
+                    ticks.append((ts, float(entry["price"])))
+            stats["candles_added"] = roll_up(log_file, ticks)
+            drop_head(log_file, offset)
+            stats["ticks_dropped"] = len(ticks)
+            columns = columns_dir_for(log_file)
+            if os.path.isdir(columns):
+                drop_before(columns, cutoff)
+
+    for res, keep in candle_retention.items():
+        if keep is not None:
+            stats["candles_dropped"] += trim_candles(log_file, res, now_ms - keep)
+
+    stats["size_after"] = os.path.getsize(log_file)
+    return stats
+
+
+def default_logs() -> list:
+    logs = [log_path_for(os.path.join(ROOT, name)) for name in LEGACY_ARRAYS]
+    logs += glob.glob(os.path.join(JSON_FOLDER, "*.jsonl"))
+    return [log for log in logs if ".candles." not in log]
+
+
+# ==============================
+# CLI
+# ==============================
+def main():
+    parser = argparse.ArgumentParser(description="Compact tick logs down to their retention tiers")
+    parser.add_argument("paths", nargs="*", help="tick logs (.jsonl) or legacy .json arrays")
+    parser.add_argument("--raw", type=parse_span, default=RETAIN_RAW,
+                        help="how long raw ticks are kept (default 10D)")
+    for res, keep in CANDLE_RETENTION.items():
+        parser.add_argument(f"--keep-{res}", type=parse_span, default=keep, dest=f"keep_{res}",
+                            help=f"how long {res} candles are kept (default {'forever' if keep is None else f'{keep // DAY_MS}D'})")
+    args = parser.parse_args()
+
+    retention = {res: getattr(args, f"keep_{res}") for res in CANDLE_RETENTION}
+    paths = [migrate_array(p) if p.endswith(".json") else p for p in args.paths] or default_logs()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            stats = compact_log(path, args.raw, retention)
+        except OSError as e:
+            print(f"❌ Error compacting {path}: {e}")
+            continue
+        print(f"🧹 {path}: {stats['size_before']} -> {stats['size_after']} bytes, "
+              f"{stats['ticks_dropped']} ticks rolled into {stats['candles_added']} candles, "
+              f"{stats['candles_dropped']} expired candles dropped")
+
+
+if __name__ == "__main__":
+    main()
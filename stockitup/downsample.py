@@ -0,0 +1,76 @@
+"""Reduce a price series to N points without losing its shape.
+
+Three modes, all picking points of the input so timestamps and prices
+stay paired:
+
+  lttb    Largest-Triangle-Three-Buckets: keeps the point in each bucket
+          that forms the largest triangle with its neighbours. Best for
+          line charts.
+  minmax  Keeps the low and the high of each bucket, so no spike is lost.
+  tail    Keeps only the newest `max_points`. /api/series uses it for
+          `since` deltas, which are appended to a chart already on screen.
+
+lttb and minmax always keep the first and last points.
+"""
+import numpy as np
+
+MODES = ("lttb", "minmax", "tail")
+
+
+def lttb_indices(x, y, n_out: int):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1][:max(n_out, 0)])
+
+    # n_out - 2 buckets between the fixed first and last points
+    every = (n - 2) / (n_out - 2)
+    edges = np.floor(np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out: int):
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1][:max(n_out, 0)])
+
+    buckets = (n_out - 2) // 2
+    inner = np.arange(1, n - 1)
+    bucket = (inner - 1) * buckets // (n - 2)
+    # Sort inner points by (bucket, price): first of each bucket is its min, last its max
+    order = inner[np.lexsort((y[inner], bucket))]
+    sorted_bucket = bucket[order - 1]
+    starts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    keep = np.unique(np.concatenate(([0, n - 1], order[starts], order[ends])))
+    return keep
+
+
+def downsample(ts, prices, max_points: int, mode: str = "lttb"):
+    """Return (timestamps, prices) lists with at most `max_points` entries"""
+    ts = np.asarray(ts, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    if max_points and len(prices) > max_points:
+        if mode == "tail":
+            idx = slice(-max_points, None)
+        elif mode == "minmax":
+            idx = minmax_indices(prices, max_points)
+        else:
+            idx = lttb_indices(ts, prices, max_points)
+        ts, prices = ts[idx], prices[idx]
+    return ts.tolist(), prices.tolist()
@@ -0,0 +1,65 @@
+"""Change-only tick encoding with heartbeats.
+
+Most polls return the same price as the one before. In change-only mode a
+tick is stored only when the price moves; while it doesn't, one heartbeat
+record ({..., "hb": 1}) is written every HEARTBEAT_EVERY seconds to show
+the feed was still alive. Heartbeats carry the price, so every existing
+reader keeps working unchanged.
+
+expand() turns the sparse series back into a regular one, forward-filling
+between records and leaving gaps (NaN) where not even a heartbeat arrived.
+stockitup.analytics resamples every ticker onto its common grid with it.
+"""
+import numpy as np
+
+HEARTBEAT_EVERY = 60  # seconds
+EPS = 1e-9
+
+
+class ChangeFilter:
+    """Decides, tick by tick, what a change-only log should store"""
+
+    def __init__(self, heartbeat: float = HEARTBEAT_EVERY):
+        self.heartbeat_ms = int(heartbeat * 1000)
+        self.last_price = None
+        self.last_stored = None
+
+    def classify(self, ts_ms: int, price: float):
+        """'tick' if the price moved, 'heartbeat' if one is due, else None"""
+        if self.last_price is None or abs(price - self.last_price) > EPS:
+            kind = "tick"
+        elif self.last_stored is None or ts_ms - self.last_stored >= self.heartbeat_ms:
+            kind = "heartbeat"
+        else:
+            return None
+        self.last_price = price
+        self.last_stored = ts_ms
+        return kind
+
+
+def expand(ts, prices, step_ms: int, start_ms: int = None, end_ms: int = None,
+           max_gap_ms: int = HEARTBEAT_EVERY * 1000 * 2):
+    """Resample a change-only series onto a regular `step_ms` grid.
+
+    Each grid point takes the last stored price at or before it. Points
+    before the first record, or more than `max_gap_ms` after the last one
+    (the feed was down; None never gives up), are NaN. Returns
+    (grid_ms, values) as NumPy arrays.
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    if not len(ts) and (start_ms is None or end_ms is None):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    start = ts[0] if start_ms is None else start_ms
+    end = ts[-1] if end_ms is None else end_ms
+    grid = np.arange(start, end + 1, step_ms, dtype=np.int64)
+    if not len(ts):
+        return grid, np.full(len(grid), np.nan)
+
+    idx = np.searchsorted(ts, grid, side="right") - 1
+    values = prices[np.clip(idx, 0, None)].copy()
+    dead = idx < 0
+    if max_gap_ms is not None:
+        dead |= grid - ts[np.clip(idx, 0, None)] > max_gap_ms
+    values[dead] = np.nan
+    return grid, values
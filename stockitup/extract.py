@@ -0,0 +1,72 @@
+"""Price extraction from Google Finance quote pages.
+
+Extractors are tried in order until one returns a usable price. The fast
+path is a targeted string search that stops at the first price node; the
+full BeautifulSoup parse is only paid when it misses.
+"""
+import html as htmllib
+
+from bs4 import BeautifulSoup
+
+CLASS_NAME = "YMlKec fxKbKc"
+_MARKER = f'class="{CLASS_NAME}"'
+
+
+# ==============================
+# Extractors (html -> price text or None)
+# ==============================
+def fast_extract(html: str):
+    """Find the first `class="YMlKec fxKbKc"` tag and return its text"""
+    i = html.find(_MARKER)
+    if i < 0:
+        return None
+    start = html.find(">", i + len(_MARKER))
+    if start < 0:
+        return None
+    end = html.find("<", start + 1)
+    if end < 0:
+        return None
+    return htmllib.unescape(html[start + 1:end])
+
+
+def soup_extract(html: str):
+    """Full BeautifulSoup parse (slow but tolerant of markup changes)"""
+    soup = BeautifulSoup(html, "html.parser")
+    price_element = soup.find(class_=CLASS_NAME)
+    return price_element.text if price_element else None
+
+
+EXTRACTORS = [fast_extract, soup_extract]
+
+
+def register_extractor(fn, first: bool = False):
+    """Add an extractor; `first=True` tries it before the built-in ones"""
+    if first:
+        EXTRACTORS.insert(0, fn)
+    else:
+        EXTRACTORS.append(fn)
+
+
+# ==============================
+# Price
+# ==============================
+def to_price(text: str) -> float:
+    """'₹1,385.70' -> 1385.7 (drops the currency symbol and separators)"""
+    text = text.strip()
+    i = 0
+    while i < len(text) and not text[i].isdigit():
+        i += 1
+    return float(text[i:].replace(",", ""))
+
+
+def extract_price(html: str, extractors=None):
+    """Return the price on a quote page, or None if no extractor finds it"""
+    for extractor in extractors or EXTRACTORS:
+        text = extractor(html)
+        if not text:
+            continue
+        try:
+            return to_price(text)
+        except ValueError:
+            continue
+    return None
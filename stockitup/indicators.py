@@ -0,0 +1,430 @@
+"""Technical indicators over the tick and candle stores.
+
+Supported specs (the parameters are optional):
+
+    sma:20      simple moving average of the last 20 prices
+    ema:20      exponential moving average (alpha = 2 / (20 + 1))
+    rsi:14      Wilder's relative strength index
+    bb:20:2     Bollinger bands: 20-price SMA +/- 2 standard deviations
+    vol:30      rolling volatility: std of the last 30 log returns
+
+Every indicator has two paths that give the same numbers. backfill() runs
+vectorized over a whole history with NumPy, and update() folds in one more
+price in O(1) from its running state. The first `warmup` values are NaN.
+
+IndicatorStore keeps one IndicatorSeries per (log, ticker, spec). Each is
+backfilled once from the on-disk index; after that only the ticks that
+arrived since the last request go through update(). overlay() lines the
+values up with the points of a query_series() result. Ranges that are
+read from candles are computed over the candle closes instead; there are
+only a few hundred of them.
+
+VWAP is not offered: the quote pages carry no volume.
+"""
+import bisect
+import collections
+import math
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from stockitup.candles import RESOLUTIONS, query_candles
+
+MAX_PERIOD = 1000
+MAX_INDICATORS = 8          # per request
+STORE_CAPACITY = 50_000     # ticks of indicator history kept per series
+MAX_SERIES = 256            # series kept in the store (LRU)
+EMA_BLOCK_GROWTH = 1e4      # largest weight ratio inside one vectorized EMA block
+
+
+# ==============================
+# Vectorized helpers
+# ==============================
+def ema_filter(x, alpha: float, init: float) -> np.ndarray:
+    """y[i] = y[i-1] + alpha * (x[i] - y[i-1]), starting from y[-1] = init.
+
+    The recursion is unrolled in blocks: inside a block it is a cumulative
+    sum of decay-weighted values. Blocks are kept short enough that the
+    weights stay within EMA_BLOCK_GROWTH of each other, so the result
+    doesn't lose precision.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty_like(x)
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[:] = x
+        return out
+    block = max(1, int(math.log(EMA_BLOCK_GROWTH) / -math.log(decay)))
+    weights = decay ** np.arange(block)   # decay^j
+    inverse = decay ** -np.arange(block)  # decay^-k
+    prev = init
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        m = len(chunk)
+        acc = np.cumsum(chunk * inverse[:m])
+        y = weights[:m] * (decay * prev + alpha * acc)
+        out[start:start + m] = y
+        prev = y[-1]
+    return out
+
+
+def rolling_sums(x, n: int):
+    """Sums of x and x**2 over every window of n values (len(x) - n + 1 of each)"""
+    x = np.asarray(x, dtype=np.float64)
+    c1 = np.concatenate(([0.0], np.cumsum(x)))
+    c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    return c1[n:] - c1[:-n], c2[n:] - c2[:-n]
+
+
+def rsi_from(avg_gain, avg_loss):
+    """RSI from smoothed gains and losses; 100 with no losses, 50 if flat"""
+    avg_gain = np.asarray(avg_gain, dtype=np.float64)
+    avg_loss = np.asarray(avg_loss, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.where(avg_loss > 0, rsi, np.where(avg_gain > 0, 100.0, 50.0))
+
+
+class RollingStats:
+    """Mean and population std of the last n values, updated in O(1)"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.values = collections.deque(maxlen=n)
+        self.total = self.total_sq = 0.0
+
+    def seed(self, values):
+        tail = np.asarray(values, dtype=np.float64)[-self.n:]
+        self.values = collections.deque(tail.tolist(), maxlen=self.n)
+        self.total, self.total_sq = float(tail.sum()), float((tail * tail).sum())
+
+    def push(self, value: float):
+        if len(self.values) == self.n:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.n
+
+    def mean(self) -> float:
+        return self.total / self.n
+
+    def std(self) -> float:
+        mean = self.total / self.n
+        return math.sqrt(max(self.total_sq / self.n - mean * mean, 0.0))
+
+
+# ==============================
+# Indicators
+# ==============================
+class Indicator(ABC):
+    outputs = ("value",)
+    defaults = ()
+
+    @abstractmethod
+    def backfill(self, prices) -> dict:
+        """Output arrays for a whole price history; leaves the state after its last price"""
+
+    @abstractmethod
+    def update(self, price: float) -> dict:
+        """Output values after one more price"""
+
+
+class SMA(Indicator):
+    defaults = (20,)
+
+    def __init__(self, n: int = 20):
+        self.n = self.warmup = n
+        self.ref = None  # prices are summed relative to the first one, for precision
+        self.window = RollingStats(n)
+
+    def backfill(self, prices) -> dict:
+        x = np.asarray(prices, dtype=np.float64)
+        out = np.full(len(x), np.nan)
+        if not len(x):
+            return {"value": out}
+        self.ref = float(x[0])
+        shifted = x - self.ref
+        if len(x) >= self.n:
+            sums, _ = rolling_sums(shifted, self.n)
+            out[self.n - 1:] = sums / self.n + self.ref
+        self.window.seed(shifted)
+        return {"value": out}
+
+    def update(self, price: float) -> dict:
+        if self.ref is None:
+            self.ref = price
+        self.window.push(price - self.ref)
+        return {"value": self.window.mean() + self.ref if self.window.full else math.nan}
+
+
+class EMA(Indicator):
+    defaults = (20,)
+
+    def __init__(self, n: int = 20):
+        self.n = self.warmup = n
+        self.alpha = 2.0 / (n + 1)
+        self.value = None
+        self.count = 0
+
+    def backfill(self, prices) -> dict:
+        x = np.asarray(prices, dtype=np.float64)
+        if not len(x):
+            return {"value": np.full(0, np.nan)}
+        out = ema_filter(x, self.alpha, float(x[0]))
+        self.value, self.count = float(out[-1]), len(x)
+        out[:self.n - 1] = np.nan
+        return {"value": out}
+
+    def update(self, price: float) -> dict:
+        self.value = price if self.value is None else self.value + self.alpha * (price - self.value)
+        self.count += 1
+        return {"value": self.value if self.count >= self.n else math.nan}
+
+
+class RSI(Indicator):
+    defaults = (14,)
+
+    def __init__(self, n: int = 14):
+        self.n = n
+        self.warmup = n + 1  # n price changes
+        self.prev = None
+        self.changes = 0
+        self.avg_gain = self.avg_loss = 0.0  # plain sums until n changes are in
+
+    def backfill(self, prices) -> dict:
+        x = np.asarray(prices, dtype=np.float64)
+        n = self.n
+        if len(x) <= n:
+            values = [self.update(float(p))["value"] for p in x]
+            return {"value": np.asarray(values, dtype=np.float64)}
+        diff = np.diff(x)
+        gain, loss = np.maximum(diff, 0.0), np.maximum(-diff, 0.0)
+        seed_gain, seed_loss = gain[:n].mean(), loss[:n].mean()
+        avg_gain = np.concatenate(([seed_gain], ema_filter(gain[n:], 1.0 / n, seed_gain)))
+        avg_loss = np.concatenate(([seed_loss], ema_filter(loss[n:], 1.0 / n, seed_loss)))
+        out = np.full(len(x), np.nan)
+        out[n:] = rsi_from(avg_gain, avg_loss)
+        self.prev, self.changes = float(x[-1]), len(diff)
+        self.avg_gain, self.avg_loss = float(avg_gain[-1]), float(avg_loss[-1])
+        return {"value": out}
+
+    def update(self, price: float) -> dict:
+        if self.prev is None:
+            self.prev = price
+            return {"value": math.nan}
+        change, self.prev = price - self.prev, price
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self.changes += 1
+        if self.changes < self.n:
+            self.avg_gain += gain
+            self.avg_loss += loss
+            return {"value": math.nan}
+        if self.changes == self.n:
+            self.avg_gain = (self.avg_gain + gain) / self.n
+            self.avg_loss = (self.avg_loss + loss) / self.n
+        else:
+            self.avg_gain += (gain - self.avg_gain) / self.n
+            self.avg_loss += (loss - self.avg_loss) / self.n
+        return {"value": float(rsi_from(self.avg_gain, self.avg_loss))}
+
+
+class Bollinger(Indicator):
+    outputs = ("upper", "middle", "lower")
+    defaults = (20, 2.0)
+
+    def __init__(self, n: int = 20, k: float = 2.0):
+        self.n = self.warmup = n
+        self.k = k
+        self.ref = None
+        self.window = RollingStats(n)
+
+    def backfill(self, prices) -> dict:
+        x = np.asarray(prices, dtype=np.float64)
+        middle, width = np.full(len(x), np.nan), np.full(len(x), np.nan)
+        if len(x):
+            self.ref = float(x[0])
+            shifted = x - self.ref
+            if len(x) >= self.n:
+                sums, sums_sq = rolling_sums(shifted, self.n)
+                mean = sums / self.n
+                middle[self.n - 1:] = mean + self.ref
+                width[self.n - 1:] = self.k * np.sqrt(np.maximum(sums_sq / self.n - mean * mean, 0.0))
+            self.window.seed(shifted)
+        return {"upper": middle + width, "middle": middle, "lower": middle - width}
+
+    def update(self, price: float) -> dict:
+        if self.ref is None:
+            self.ref = price
+        self.window.push(price - self.ref)
+        if not self.window.full:
+            return {"upper": math.nan, "middle": math.nan, "lower": math.nan}
+        middle, width = self.window.mean() + self.ref, self.k * self.window.std()
+        return {"upper": middle + width, "middle": middle, "lower": middle - width}
+
+
+class Volatility(Indicator):
+    defaults = (30,)
+
+    def __init__(self, n: int = 30):
+        self.n = n
+        self.warmup = n + 1  # n returns
+        self.prev = None
+        self.window = RollingStats(n)
+
+    def backfill(self, prices) -> dict:
+        x = np.asarray(prices, dtype=np.float64)
+        out = np.full(len(x), np.nan)
+        if len(x) > 1:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns = np.nan_to_num(np.diff(np.log(x)), nan=0.0, posinf=0.0, neginf=0.0)
+            if len(returns) >= self.n:
+                sums, sums_sq = rolling_sums(returns, self.n)
+                mean = sums / self.n
+                out[self.n:] = np.sqrt(np.maximum(sums_sq / self.n - mean * mean, 0.0))
+            self.window.seed(returns)
+        if len(x):
+            self.prev = float(x[-1])
+        return {"value": out}
+
+    def update(self, price: float) -> dict:
+        if self.prev is not None:
+            ret = math.log(price / self.prev) if price > 0 and self.prev > 0 else 0.0
+            self.window.push(ret)
+        self.prev = price
+        return {"value": self.window.std() if self.window.full else math.nan}
+
+
+INDICATORS = {"sma": SMA, "ema": EMA, "rsi": RSI, "bb": Bollinger, "vol": Volatility}
+
+
+def make_indicator(spec: str) -> Indicator:
+    """'bb:20:2' -> Bollinger(20, 2.0); raises ValueError for a bad spec"""
+    name, *params = spec.strip().lower().split(":")
+    cls = INDICATORS.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown indicator {name!r} (use one of {', '.join(INDICATORS)})")
+    if len(params) > len(cls.defaults):
+        raise ValueError(f"Too many parameters in {spec!r}")
+    try:
+        args = [type(default)(p) for default, p in zip(cls.defaults, params)]
+    except ValueError:
+        raise ValueError(f"Bad parameter in {spec!r}")
+    args += list(cls.defaults[len(args):])
+    if not 2 <= args[0] <= MAX_PERIOD or (len(args) > 1 and not 0 < args[1] <= 10):
+        raise ValueError(f"Parameter out of range in {spec!r}")
+    return cls(*args)
+
+
+def compute(spec: str, prices) -> dict:
+    """Vectorized outputs of one indicator over a price array"""
+    return make_indicator(spec).backfill(prices)
+
+
+def _at(ts, values: dict, points) -> dict:
+    """Values at the last ts <= each point (None where undefined), as lists"""
+    idx = np.searchsorted(np.asarray(ts, dtype=np.int64), np.asarray(points, dtype=np.int64), side="right") - 1
+    out = {}
+    for name, column in values.items():
+        column = np.asarray(column, dtype=np.float64)
+        picked = np.where(idx >= 0, column[np.maximum(idx, 0)] if len(column) else np.nan, np.nan)
+        out[name] = [None if math.isnan(v) else v for v in picked.tolist()]
+    return out
+
+
+# ==============================
+# Incremental store
+# ==============================
+class IndicatorSeries:
+    """One indicator over one ticker's ticks: backfilled once, then extended tick by tick"""
+
+    def __init__(self, spec: str, index, capacity: int = STORE_CAPACITY):
+        self.spec = spec
+        self.capacity = capacity
+        self.indicator = make_indicator(spec)
+        ts, prices = index.window(None)
+        ts, prices = np.asarray(ts[-capacity:], dtype=np.int64), np.asarray(prices[-capacity:], dtype=np.float64)
+        self.complete = len(ts) < capacity  # holds every tick the index had
+        self.ts = ts.tolist()
+        self.values = {name: column.tolist() for name, column in self.indicator.backfill(prices).items()}
+        self._lock = threading.Lock()
+
+    def sync(self, index):
+        """Fold in the ticks the index gained since the last call"""
+        with self._lock:
+            ts, prices = index.since(self.ts[-1]) if self.ts else index.window(None)
+            for t, price in zip(ts, prices):
+                self.ts.append(int(t))
+                for name, value in self.indicator.update(float(price)).items():
+                    self.values[name].append(value)
+            if len(self.ts) > 2 * self.capacity:
+                drop = len(self.ts) - self.capacity
+                del self.ts[:drop]
+                for column in self.values.values():
+                    del column[:drop]
+                self.complete = False
+        return self
+
+    def covers(self, start_ms: int) -> bool:
+        with self._lock:
+            return self.complete or (bool(self.ts) and start_ms >= self.ts[0])
+
+    def at(self, points) -> dict:
+        with self._lock:
+            lo = max(0, bisect.bisect_right(self.ts, points[0]) - 1) if points else len(self.ts)
+            return _at(self.ts[lo:], {k: v[lo:] for k, v in self.values.items()}, points)
+
+
+class IndicatorStore:
+    """LRU of IndicatorSeries keyed by (log, ticker, spec)"""
+
+    def __init__(self, max_series: int = MAX_SERIES, capacity: int = STORE_CAPACITY):
+        self.max_series = max_series
+        self.capacity = capacity
+        self._series = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, index, spec: str) -> IndicatorSeries:
+        key = (index.path, index.ticker, spec)
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+        if series is None:
+            series = IndicatorSeries(spec, index, self.capacity)
+            with self._lock:
+                series = self._series.setdefault(key, series)
+                while len(self._series) > self.max_series:
+                    self._series.popitem(last=False)
+        return series.sync(index)
+
+
+def overlay(index, result: dict, specs, store: IndicatorStore, live_candle=None) -> dict:
+    """{spec: {output: [value per point]}} for the points of a query_series() result.
+
+    `index` must be the on-disk index (the full history), not a cache ring.
+    """
+    points = result["timestamps"]
+    out = {}
+    for spec in specs:
+        if not points:
+            out[spec] = {name: [] for name in make_indicator(spec).outputs}
+        elif result["source"] == "ticks":
+            series = store.get(index, spec)
+            if series.covers(points[0]):
+                out[spec] = series.at(points)
+            else:  # older than the store keeps: compute over the whole history
+                ts, prices = index.window(None)
+                out[spec] = _at(ts, compute(spec, prices), points)
+        else:
+            res = result["source"].split(":", 1)[1]
+            start = points[0] - make_indicator(spec).warmup * RESOLUTIONS[res]
+            candles = query_candles(index.path, res, start, live_candle(res) if live_candle else None)
+            out[spec] = _at(candles["t"], compute(spec, candles["c"]), points)
+    return out
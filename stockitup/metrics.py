@@ -0,0 +1,309 @@
+"""Counters, histograms and a sampling profiler for the collector and API.
+
+Collector.metrics records, per ticker, how long the quote page took to
+fetch, to parse and to write. It also counts polls, stored ticks, pages
+without a price element and errors, and keeps the time of the last tick.
+render() writes all of it in the Prometheus text format. stockitup.api
+serves it at /metrics; for a standalone collector, serve_metrics() does.
+summary() condenses the last interval into one log line.
+
+The profiler samples every thread's stack at a fixed rate while it is
+switched on. It reports the hottest stacks in the collapsed
+("a;b;c count") format that flame graph tools read.
+"""
+import bisect
+import collections
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PROFILE_INTERVAL = 0.01  # seconds between stack samples
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ==============================
+# Metric types
+# ==============================
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}  # label values -> count
+        self._lock = threading.Lock()
+
+    def inc(self, *values, amount: float = 1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, count in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, values)} {_num(count)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; bucket i counts values <= buckets[i]"""
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [counts (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def merged(self) -> list:
+        """Per-bucket counts summed over every label set"""
+        with self._lock:
+            return [sum(col) for col in zip(*(s[0] for s in self._series.values()))] or [0] * (len(self.buckets) + 1)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, (counts, total) in sorted(self._series.items()):
+                running = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    running += count
+                    le = _labels(self.labels, values, f'le="{_num(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {running}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, values)} {_num(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labels, values)} {running}")
+        return lines
+
+
+def quantile(buckets, counts, q: float):
+    """Upper bound of the bucket holding the q-quantile, or None if empty"""
+    total = sum(counts)
+    if not total:
+        return None
+    running = 0
+    for bound, count in zip(tuple(buckets) + (float("inf"),), counts):
+        running += count
+        if running >= q * total:
+            return bound
+    return float("inf")
+
+
+# ==============================
+# Collector metrics
+# ==============================
+class CollectorMetrics:
+    def __init__(self):
+        self.fetch = Histogram("stockitup_fetch_seconds", "Quote page HTTP request time", ("ticker",))
+        self.parse = Histogram("stockitup_parse_seconds", "Price extraction time", ("ticker",), FAST_BUCKETS)
+        self.write = Histogram("stockitup_write_seconds", "Tick log and column store write time",
+                               ("ticker",), FAST_BUCKETS)
+        self.polls = Counter("stockitup_polls_total", "Quote page polls", ("ticker",))
+        self.ticks = Counter("stockitup_ticks_total", "Ticks stored", ("ticker",))
+        self.not_found = Counter("stockitup_price_not_found_total", "Pages without a price element", ("ticker",))
+        self.errors = Counter("stockitup_errors_total", "Failed fetches, writes and polls", ("ticker", "stage"))
+        self.started = time.time()
+        self._last_tick = {}  # ticker -> epoch seconds of its newest tick
+        self._lock = threading.Lock()
+        self._window = self._snapshot()
+
+    def seen(self, ticker: str, ts_ms: int):
+        """Note a ticker's newest tick (stored now, or found in its log)"""
+        with self._lock:
+            self._last_tick[ticker] = max(ts_ms / 1000, self._last_tick.get(ticker, 0))
+
+    def forget(self, ticker: str):
+        with self._lock:
+            self._last_tick.pop(ticker, None)
+
+    def staleness(self, now: float = None) -> dict:
+        """Seconds since each active ticker's last tick"""
+        now = now or time.time()
+        with self._lock:
+            return {ticker: max(0.0, now - ts) for ticker, ts in self._last_tick.items()}
+
+    def render(self) -> str:
+        now = time.time()
+        with self._lock:
+            last = dict(self._last_tick)
+        lines = []
+        for metric in (self.fetch, self.parse, self.write, self.polls, self.ticks, self.not_found, self.errors):
+            lines += metric.render()
+        lines += ["# HELP stockitup_last_tick_timestamp_seconds Time of the newest tick",
+                  "# TYPE stockitup_last_tick_timestamp_seconds gauge"]
+        lines += [f'stockitup_last_tick_timestamp_seconds{{ticker="{_escape(t)}"}} {_num(ts)}'
+                  for t, ts in sorted(last.items())]
+        lines += ["# HELP stockitup_staleness_seconds Seconds since the newest tick",
+                  "# TYPE stockitup_staleness_seconds gauge"]
+        lines += [f'stockitup_staleness_seconds{{ticker="{_escape(t)}"}} {_num(round(max(0.0, now - ts), 3))}'
+                  for t, ts in sorted(last.items())]
+        lines += ["# HELP stockitup_uptime_seconds Seconds since the collector started",
+                  "# TYPE stockitup_uptime_seconds gauge",
+                  f"stockitup_uptime_seconds {_num(round(now - self.started, 3))}"]
+        return "\n".join(lines) + "\n"
+
+    def _snapshot(self) -> dict:
+        return {
+            "time": time.monotonic(),
+            "polls": self.polls.total(),
+            "ticks": self.ticks.total(),
+            "not_found": self.not_found.total(),
+            "errors": self.errors.total(),
+            "fetch": self.fetch.merged(),
+            "parse": self.parse.merged(),
+            "write": self.write.merged(),
+        }
+
+    def summary(self) -> str:
+        """One log line for the interval since the previous summary()"""
+        prev, cur = self._window, self._snapshot()
+        self._window = cur
+        elapsed = max(cur["time"] - prev["time"], 1e-9)
+
+        def p95(name):
+            counts = [b - a for a, b in zip(prev[name], cur[name])]
+            bound = quantile(getattr(self, name).buckets, counts, 0.95)
+            if bound is None:
+                return "-"
+            return f">{getattr(self, name).buckets[-1] * 1000:g}ms" if bound == float("inf") else f"≤{bound * 1000:g}ms"
+
+        stale = self.staleness()
+        stalest = max(stale, key=stale.get) if stale else None
+        return (f"📊 {len(stale)} tickers | {(cur['ticks'] - prev['ticks']) / elapsed:.2f} ticks/s, "
+                f"{(cur['polls'] - prev['polls']) / elapsed:.2f} polls/s | p95 fetch {p95('fetch')}, "
+                f"parse {p95('parse')}, write {p95('write')} | "
+                f"{cur['not_found'] - prev['not_found']:g} not found, {cur['errors'] - prev['errors']:g} errors"
+                + (f" | stalest {stalest} {stale[stalest]:.0f}s" if stalest else ""))
+
+
+def serve_metrics(render, host: str = "127.0.0.1", port: int = 9100) -> ThreadingHTTPServer:
+    """Serve render() at http://host:port/metrics on a background thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
+
+
+# ==============================
+# Sampling profiler
+# ==============================
+class SamplingProfiler:
+    """Counts every thread's stack every `interval` seconds while running"""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.started = None
+        self._stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> bool:
+        """Start a fresh profile; False if one is already running"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._stacks.clear()
+            self.samples = 0
+            self.started = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="profiler")
+            self._thread.start()
+        return True
+
+    def stop(self) -> bool:
+        """Stop sampling (the profile stays readable); False if not running"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return False
+        self._stop.set()
+        thread.join()
+        return True
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                key = ";".join(reversed(stack))
+                with self._lock:
+                    self._stacks[key] += 1
+            with self._lock:
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """'thread;outer;...;inner count' lines, hottest first"""
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def report(self, top: int = 20) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "interval": self.interval,
+                "started": self.started,
+                "samples": self.samples,
+                "top": [{"stack": stack.split(";"), "count": count}
+                        for stack, count in self._stacks.most_common(top)],
+            }
+
+
+profiler = SamplingProfiler()  # one per process: it samples every thread
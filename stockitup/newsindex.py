@@ -0,0 +1,117 @@
+"""Ranked, prefix-capable search over news.json.
+
+scripts/build_news.py writes the articles; this module keeps an inverted
+index over their title, topic and source (token -> {article: weight}) plus
+a sorted vocabulary, so a prefix like "infos" expands with two binary
+searches. The index is rebuilt only when news.json changes. A query costs
+the size of its posting lists, not of the archive.
+"""
+import bisect
+import heapq
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+NEWS_FILE = os.path.join(ROOT, "news.json")
+
+FIELD_WEIGHTS = {"title": 3.0, "topic": 2.0, "source": 1.0}
+EXACT_BONUS = 1.5  # a whole-word match ranks above a prefix match
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> list:
+    return TOKEN_RE.findall(str(text or "").lower())
+
+
+def published_ms(article: dict) -> int:
+    try:
+        return int(datetime.fromisoformat(article["publishedAt"].replace("Z", "+00:00")).timestamp() * 1000)
+    except (KeyError, AttributeError, ValueError):
+        return 0
+
+
+class NewsIndex:
+    def __init__(self, path: str = NEWS_FILE):
+        self.path = path
+        self.articles = []  # newest first, as build_news.py writes them
+        self.recency = []
+        self.postings = {}  # token -> {article id: weight}
+        self.vocab = []     # sorted tokens, for prefix expansion
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Rebuild if news.json changed since the last build"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                articles = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            articles = []
+        articles = [a for a in articles if isinstance(a, dict)] if isinstance(articles, list) else []
+
+        postings = {}
+        for i, article in enumerate(articles):
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(article.get(field)):
+                    docs = postings.setdefault(token, {})
+                    docs[i] = docs.get(i, 0.0) + weight
+        with self._lock:
+            self.articles = articles
+            self.recency = [published_ms(a) for a in articles]
+            self.postings = postings
+            self.vocab = sorted(postings)
+            self._mtime = mtime
+        return self
+
+    def _expand(self, term: str) -> dict:
+        """Article id -> score for one query term (exact or as a prefix)"""
+        lo = bisect.bisect_left(self.vocab, term)
+        hi = bisect.bisect_left(self.vocab, term + "\uffff")
+        scores = {}
+        for token in self.vocab[lo:hi]:
+            bonus = EXACT_BONUS if token == term else 1.0
+            for doc, weight in self.postings[token].items():
+                scores[doc] = max(scores.get(doc, 0.0), weight * bonus)
+        return scores
+
+    def search(self, query: str, page: int = 1, per_page: int = 10) -> dict:
+        """Articles matching every term of `query`, best first, one page of them.
+        An empty query pages through the newest articles."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            if terms:
+                scores = None
+                for term in sorted(terms, key=len, reverse=True):
+                    matches = self._expand(term)
+                    if scores is None:
+                        scores = matches
+                    else:
+                        scores = {doc: s + matches[doc] for doc, s in scores.items() if doc in matches}
+                    if not scores:
+                        break
+                total = len(scores)
+                # only the pages up to this one are ordered, not every match
+                top = heapq.nsmallest(page * per_page, scores, key=lambda doc: (-scores[doc], -self.recency[doc]))
+            else:
+                scores = {}
+                total = len(self.articles)
+                top = range(min(page * per_page, total))
+            start = (page - 1) * per_page
+            results = [dict(self.articles[doc], score=round(scores.get(doc, 0.0), 2))
+                       for doc in list(top)[start:]]
+        return {
+            "query": query,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "results": results,
+        }
@@ -0,0 +1,314 @@
+"""Per-ticker fan-out of live ticks to push subscribers (SSE).
+
+A channel is one ticker in one tick log. Ticks reach it two ways: the
+in-process collector publishes each tick as it stores it, and while a
+channel has subscribers, one follower thread tails its log from the last
+byte offset it read (iter_ticks) once a second. So ticks written by
+another process (stock.py, the metal scripts, a standalone
+`python -m stockitup.collector`) are pushed too. A tick seen both ways is
+published once: a channel drops anything not newer than its last tick.
+
+Publishing is O(1): a tick is serialised once, appended to the channel's
+short history ring and every waiting subscriber is woken. Each subscriber
+keeps its own sequence cursor and reads the shared ring, so nothing is
+copied per subscriber and a slow client just skips ahead instead of
+growing a queue.
+
+TickHub.stream() serves one subscriber from a WSGI worker thread.
+StreamServer serves all of them from one asyncio event loop on its own
+port, so an idle subscriber costs a socket and a coroutine rather than a
+thread. stockitup.api runs it next to Flask and redirects /api/stream there.
+"""
+import asyncio
+import collections
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from stockitup.ticklog import iter_ticks, offset_at, parse_ts_ms
+
+HISTORY = 256       # messages kept per channel for subscribers that fall behind
+FOLLOW_EVERY = 1.0  # seconds between checks of followed logs
+KEEPALIVE = 15      # seconds between keep-alive comments on an idle stream
+STREAM_PATH = "/api/stream"
+STREAM_BACKLOG = 1024
+REQUEST_TIMEOUT = 10  # seconds to send the request head
+
+
+class _Channel:
+    def __init__(self, ticker: str, log: str):
+        self.ticker = ticker
+        self.log = log
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.last_ts = None
+        self.messages = collections.deque(maxlen=HISTORY)  # (seq, data)
+        self.subscribers = 0
+        self.offset = None  # follower's read position (None while unsubscribed)
+        self.inode = None
+
+
+def format_events(messages) -> str:
+    return "".join(f"id: {seq}\nevent: tick\ndata: {data}\n\n" for seq, data in messages)
+
+
+class TickHub:
+    def __init__(self, follow_every: float = FOLLOW_EVERY):
+        self.follow_every = follow_every
+        self.listeners = []  # callbacks(channel) run after every publish, on the publishing thread
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._follower = None
+
+    def channel(self, ticker: str, log: str) -> _Channel:
+        key = (ticker.upper(), os.path.abspath(log))
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = _Channel(*key)
+        return channel
+
+    def publish(self, entry: dict, log: str):
+        """Push one stored tick of `log` to its channel (collector on_tick)"""
+        ts = parse_ts_ms(entry["timestamp"])
+        channel = self.channel(entry["ticker"], log)
+        with channel.cond:
+            if ts is not None and channel.last_ts is not None and ts <= channel.last_ts:
+                return  # already pushed by the collector or the follower
+            channel.last_ts = ts if ts is not None else channel.last_ts
+            channel.seq += 1
+            channel.messages.append((channel.seq, json.dumps({
+                "ticker": entry["ticker"],
+                "exchange": entry.get("exchange"),
+                "price": entry["price"],
+                "timestamp": entry["timestamp"],
+                "ts": ts,
+            }, separators=(",", ":"))))
+            channel.cond.notify_all()
+        for listener in self.listeners:
+            listener(channel)
+
+    def read(self, channel: _Channel, cursor: int):
+        """(messages after `cursor`, new cursor) without blocking"""
+        with channel.cond:
+            return [(seq, data) for seq, data in channel.messages if seq > cursor], channel.seq
+
+    def wait(self, channel: _Channel, cursor: int, timeout: float = None):
+        """Block until there are messages after `cursor`.
+
+        Returns (messages, new_cursor); messages is empty on timeout.
+        """
+        with channel.cond:
+            channel.cond.wait_for(lambda: channel.seq > cursor, timeout)
+        return self.read(channel, cursor)
+
+    def start_cursor(self, channel: _Channel, last_event_id=None) -> int:
+        """Where a (re)connecting subscriber starts: after its Last-Event-ID,
+        unless that id is from before a server restart"""
+        try:
+            cursor = int(last_event_id)
+        except (TypeError, ValueError):
+            cursor = None
+        with channel.cond:
+            return cursor if cursor is not None and 0 <= cursor <= channel.seq else channel.seq
+
+    def subscribe(self, ticker: str, log: str) -> _Channel:
+        channel = self.channel(ticker, log)
+        with channel.cond:
+            channel.subscribers += 1
+            if channel.offset is None:
+                try:
+                    st = os.stat(channel.log)
+                    channel.offset, channel.inode = st.st_size, st.st_ino
+                except OSError:
+                    channel.offset, channel.inode = 0, None  # not written yet: follow from its first tick
+        with self._lock:
+            if self._follower is None:
+                self._follower = threading.Thread(target=self._follow, daemon=True, name="tick-follower")
+                self._follower.start()
+        return channel
+
+    def unsubscribe(self, channel: _Channel):
+        with channel.cond:
+            channel.subscribers -= 1
+            if not channel.subscribers:
+                channel.offset = None  # resume from the end of the log next time
+
+    def subscribers(self, ticker: str = None) -> int:
+        with self._lock:
+            channels = [c for c in self._channels.values() if ticker is None or c.ticker == ticker.upper()]
+        return sum(c.subscribers for c in channels)
+
+    # ==============================
+    # Log follower
+    # ==============================
+    def _follow(self):
+        while True:
+            time.sleep(self.follow_every)
+            with self._lock:
+                channels = [c for c in self._channels.values() if c.subscribers]
+            for channel in channels:
+                try:
+                    self.catch_up(channel)
+                except OSError as e:
+                    print(f"⚠️ Could not follow {channel.log}: {e}")
+
+    def catch_up(self, channel: _Channel):
+        """Publish the ticks appended to a channel's log since the last call"""
+        with channel.cond:
+            offset, inode, last_ts = channel.offset, channel.inode, channel.last_ts
+        if offset is None:
+            return
+        try:
+            st = os.stat(channel.log)
+        except OSError:
+            return
+        if inode is not None and (st.st_ino != inode or st.st_size < offset):
+            # Rewritten (e.g. compaction): carry on after the last pushed tick
+            offset = offset_at(channel.log, last_ts + 1) if last_ts is not None else st.st_size
+        if st.st_size != offset:
+            for offset, entry in iter_ticks(channel.log, offset):
+                if (str(entry.get("ticker", "")).upper() == channel.ticker and entry.get("timestamp")
+                        and isinstance(entry.get("price"), (int, float))):
+                    self.publish(entry, channel.log)
+        with channel.cond:
+            if channel.offset is not None:
+                channel.offset, channel.inode = offset, st.st_ino
+
+    # ==============================
+    # One subscriber per thread (WSGI)
+    # ==============================
+    def stream(self, ticker: str, log: str, last_event_id=None, keepalive: float = KEEPALIVE):
+        """Server-Sent Events generator for one subscriber"""
+        channel = self.subscribe(ticker, log)
+        cursor = self.start_cursor(channel, last_event_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                messages, cursor = self.wait(channel, cursor, keepalive)
+                yield format_events(messages) if messages else ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(channel)
+
+
+# ==============================
+# Many subscribers per thread (asyncio)
+# ==============================
+def _response(status: str, body: bytes = b"", content_type: str = "application/json", extra: str = "") -> bytes:
+    return (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Access-Control-Allow-Origin: *\r\n{extra}Connection: close\r\n\r\n").encode() + body
+
+
+class StreamServer:
+    """SSE endpoint for many subscribers on one event loop.
+
+    `resolve(params)` maps the query parameters to (ticker, log), raising
+    ValueError for a bad request and LookupError for nothing to stream.
+    """
+
+    def __init__(self, hub: TickHub, resolve, keepalive: float = KEEPALIVE):
+        self.hub = hub
+        self.resolve = resolve
+        self.keepalive = keepalive
+        self.loop = None
+        self.port = None
+        self._events = {}  # channel -> asyncio.Event set by its next publish
+        hub.listeners.append(self._on_publish)
+
+    def start(self, host: str = "127.0.0.1", port: int = 5001) -> "StreamServer":
+        """Serve on a background thread; raises if the port can't be bound"""
+        ready = threading.Event()
+        failed = []
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            try:
+                server = self.loop.run_until_complete(
+                    asyncio.start_server(self._handle, host, port, backlog=STREAM_BACKLOG))
+            except OSError as e:
+                failed.append(e)
+                ready.set()
+                return
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True, name="stream-server").start()
+        ready.wait()
+        if failed:
+            raise failed[0]
+        return self
+
+    def _on_publish(self, channel):
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake, channel)
+
+    def _wake(self, channel):
+        event = self._events.pop(channel, None)
+        if event is not None:
+            event.set()
+
+    async def _next(self, channel, cursor: int):
+        """Messages after `cursor`, waiting up to `keepalive` for one"""
+        messages, cursor = self.hub.read(channel, cursor)
+        if messages:
+            return messages, cursor
+        event = self._events.get(channel)
+        if event is None:
+            event = self._events[channel] = asyncio.Event()
+        # Re-read after registering: a publish in between has already run _wake
+        messages, cursor = self.hub.read(channel, cursor)
+        if not messages:
+            try:
+                await asyncio.wait_for(event.wait(), self.keepalive)
+            except asyncio.TimeoutError:
+                pass
+            messages, cursor = self.hub.read(channel, cursor)
+        return messages, cursor
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")
+        method, target = (lines[0].split(" ") + ["", ""])[:2]
+        headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+        url = urlsplit(target)
+        channel = None
+        try:
+            if method == "OPTIONS":
+                writer.write(_response("204 No Content", extra="Access-Control-Allow-Headers: Last-Event-ID, "
+                                       "Cache-Control\r\nAccess-Control-Allow-Methods: GET\r\n"))
+                return
+            if method != "GET" or url.path != STREAM_PATH:
+                writer.write(_response("404 Not Found", b'{"error":"Not found"}'))
+                return
+            try:
+                ticker, log = self.resolve({k: v[0] for k, v in parse_qs(url.query).items()})
+            except ValueError as e:
+                writer.write(_response("400 Bad Request", json.dumps({"error": str(e)}).encode()))
+                return
+            except LookupError as e:
+                writer.write(_response("404 Not Found", json.dumps({"error": str(e)}).encode()))
+                return
+
+            channel = self.hub.subscribe(ticker, log)
+            cursor = self.hub.start_cursor(channel, headers.get("last-event-id"))
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\nretry: 5000\n\n")
+            await writer.drain()
+            while True:
+                messages, cursor = await self._next(channel, cursor)
+                writer.write(format_events(messages).encode() if messages else b": keep-alive\n\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if channel is not None:
+                self.hub.unsubscribe(channel)
+            writer.close()
@@ -0,0 +1,105 @@
+"""Latest quote per ticker, kept in memory for batch lookups.
+
+The collector feeds every tick to QuoteTable.update, so answering
+/api/quotes for N tickers is N dict lookups. Tickers the collector isn't
+polling are read from the tail of their tick log (and re-read only when
+the log changes), never parsed in full. Legacy .json arrays have no tail
+to seek to, so those are read whole.
+"""
+import os
+import threading
+import time
+
+from stockitup.candles import RESOLUTIONS, bucket_start
+from stockitup.ticklog import iter_ticks, last_entry, offset_at, parse_ts_ms, read_ticks
+
+DAY_MS = RESOLUTIONS["1D"]
+
+
+def make_quote(entry: dict, open_price: float, ts_ms: int) -> dict:
+    price = float(entry["price"])
+    change = price - open_price
+    return {
+        "ticker": entry["ticker"],
+        "exchange": entry.get("exchange"),
+        "price": price,
+        "open": open_price,
+        "change": round(change, 4),
+        "change_pct": round(change / open_price * 100, 4) if open_price else None,
+        "timestamp": entry["timestamp"],
+        "ts": ts_ms,
+    }
+
+
+def quote_from_array(array_file: str):
+    """Latest quote from a legacy JSON array: its last tick plus the day's first"""
+    ticks = [e for e in read_ticks(array_file) if isinstance(e, dict) and isinstance(e.get("price"), (int, float))]
+    ts = parse_ts_ms(ticks[-1].get("timestamp")) if ticks else None
+    if ts is None:
+        return None
+    day = bucket_start(ts, DAY_MS)
+    first = next(e for e in ticks if (parse_ts_ms(e.get("timestamp")) or 0) >= day)
+    return make_quote(ticks[-1], float(first["price"]), ts)
+
+
+def quote_from_log(log_file: str):
+    """Latest quote from a tick log: its last line plus the day's first tick"""
+    if not log_file.endswith(".jsonl"):
+        return quote_from_array(log_file)
+    last = last_entry(log_file)
+    ts = parse_ts_ms(last.get("timestamp")) if last else None
+    if ts is None or not isinstance(last.get("price"), (int, float)):
+        return None
+    open_price = float(last["price"])
+    for _, entry in iter_ticks(log_file, offset_at(log_file, bucket_start(ts, DAY_MS))):
+        if isinstance(entry.get("price"), (int, float)):
+            open_price = float(entry["price"])
+            break
+    return make_quote(last, open_price, ts)
+
+
+class QuoteTable:
+    def __init__(self, find_log=None):
+        self.find_log = find_log  # ticker -> tick log path (or None)
+        self._quotes = {}  # TICKER -> quote
+        self._mtimes = {}  # TICKER -> log mtime, for quotes read from disk
+        self._lock = threading.Lock()
+
+    def update(self, entry: dict):
+        """Collector on_tick callback"""
+        ts = parse_ts_ms(entry.get("timestamp")) or int(time.time() * 1000)
+        key = entry["ticker"].upper()
+        with self._lock:
+            prev = self._quotes.get(key)
+        if prev is None and self.find_log:
+            log_file = self.find_log(entry["ticker"])
+            prev = quote_from_log(log_file) if log_file else None
+        with self._lock:
+            same_day = prev and bucket_start(prev["ts"], DAY_MS) == bucket_start(ts, DAY_MS)
+            self._quotes[key] = make_quote(entry, prev["open"] if same_day else float(entry["price"]), ts)
+            self._mtimes.pop(key, None)
+
+    def get(self, ticker: str):
+        """Latest quote for a ticker, or None. Tickers the collector hasn't
+        reported are read from their log, again only once it has changed"""
+        key = ticker.upper()
+        with self._lock:
+            quote = self._quotes.get(key)
+            from_disk = key in self._mtimes
+            known_mtime = self._mtimes.get(key)
+        if (quote and not from_disk) or not self.find_log:
+            return quote
+        log_file = self.find_log(ticker)
+        try:
+            mtime = os.path.getmtime(log_file) if log_file else None
+        except OSError:
+            mtime = None
+        if mtime is None or (quote and mtime == known_mtime):
+            return quote
+        quote = quote_from_log(log_file)
+        if quote:
+            with self._lock:
+                if key in self._mtimes or key not in self._quotes:
+                    self._quotes[key] = quote
+                    self._mtimes[key] = mtime
+        return quote
@@ -0,0 +1,169 @@
+"""When to poll: exchange trading hours plus backoff while the price is flat.
+
+MarketCalendar reads market_calendar.json:
+
+    {"NSE": {"timezone": "Asia/Kolkata", "weekdays": ["Mon", ..., "Fri"],
+             "sessions": [["09:15", "15:30"]], "holidays": ["2026-10-02"],
+             "special_sessions": {"2026-11-08": [["18:00", "19:00"]]}}}
+
+Session times are in the exchange's own timezone. A special session
+replaces the regular ones for that date, even on a weekend: an early
+close, or NSE's Muhurat trading. An exchange that isn't listed is
+treated as always open. The file is re-read when it changes.
+
+PollSchedule is one ticker's timer. While its market is closed it sleeps
+until the next open. While the market is open it polls every `fast`
+seconds and doubles the delay after each poll that returns an unchanged
+price (or none), up to `slowest`. The first price move snaps it back to
+`fast`.
+"""
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CALENDAR_FILE = os.path.join(ROOT, "market_calendar.json")
+
+MAX_INTERVAL = 60         # seconds: slowest poll while the price is flat
+BACKOFF_FACTOR = 2.0
+CLOSED_CHECK_EVERY = 300  # seconds: longest sleep while closed, so calendar edits are seen
+LOOKAHEAD_DAYS = 14       # how far ahead to search for the next session
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+EPS = 1e-9
+
+
+# ==============================
+# Calendar
+# ==============================
+def _parse_exchange(spec: dict) -> dict:
+    def sessions(pairs):
+        return [(datetime.strptime(a, "%H:%M").time(), datetime.strptime(b, "%H:%M").time()) for a, b in pairs]
+
+    return {
+        "tz": ZoneInfo(spec["timezone"]),
+        "weekdays": {WEEKDAYS.index(d[:3].title()) for d in spec.get("weekdays", WEEKDAYS[:5])},
+        "sessions": sessions(spec.get("sessions", [])),
+        "holidays": {date.fromisoformat(d) for d in spec.get("holidays", [])},
+        "special": {date.fromisoformat(d): sessions(s) for d, s in spec.get("special_sessions", {}).items()},
+    }
+
+
+class MarketCalendar:
+    def __init__(self, path: str = CALENDAR_FILE):
+        self.path = path
+        self._exchanges = {}
+        self._mtime = None
+
+    def refresh(self):
+        """Re-read the calendar file if it changed (a bad edit keeps the old one)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return self
+        self._mtime = mtime
+        if mtime is None:
+            self._exchanges = {}
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._exchanges = {code.upper(): _parse_exchange(spec) for code, spec in data.items()
+                               if not code.startswith("_")}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Could not read market calendar {self.path}: {e}")
+        return self
+
+    def sessions_on(self, exchange: str, day: date) -> list:
+        """(open, close) aware datetimes of an exchange's sessions on a local date"""
+        spec = self.refresh()._exchanges.get(exchange.upper())
+        if spec is None:
+            return []
+        if day in spec["special"]:
+            sessions = spec["special"][day]
+        elif day.weekday() not in spec["weekdays"] or day in spec["holidays"]:
+            sessions = []
+        else:
+            sessions = spec["sessions"]
+        return [(datetime.combine(day, a, spec["tz"]), datetime.combine(day, b, spec["tz"])) for a, b in sessions]
+
+    def next_open(self, exchange: str, now: datetime = None):
+        """`now` if the exchange is open, else the start of its next session
+        (None if there is none within LOOKAHEAD_DAYS). Unknown exchanges are always open."""
+        now = now or datetime.now(timezone.utc)
+        spec = self.refresh()._exchanges.get(exchange.upper())
+        if spec is None:
+            return now
+        today = now.astimezone(spec["tz"]).date()
+        for offset in range(-1, LOOKAHEAD_DAYS):  # -1: a session that started yesterday
+            for start, end in self.sessions_on(exchange, today + timedelta(days=offset)):
+                if end > now:
+                    return max(start, now)
+        return None
+
+    def is_open(self, exchange: str, now: datetime = None) -> bool:
+        now = now or datetime.now(timezone.utc)
+        return self.next_open(exchange, now) == now
+
+
+_default_calendar = None
+
+
+def default_calendar() -> MarketCalendar:
+    global _default_calendar
+    if _default_calendar is None:
+        _default_calendar = MarketCalendar()
+    return _default_calendar
+
+
+# ==============================
+# Per-ticker schedule
+# ==============================
+class PollSchedule:
+    """Delay before a ticker's next poll. `calendar=None` ignores trading
+    hours; `adaptive=False` keeps a fixed `fast` interval."""
+
+    def __init__(self, ticker: str, exchange: str, fast: float, slowest: float = MAX_INTERVAL,
+                 calendar: MarketCalendar = None, adaptive: bool = True):
+        self.ticker = ticker
+        self.exchange = exchange
+        self.fast = fast
+        self.slowest = max(fast, slowest)
+        self.calendar = calendar
+        self.adaptive = adaptive
+        self.interval = fast
+        self.last_price = None
+        self._closed = False
+
+    def closed_for(self) -> float:
+        """0 while the market is open, else seconds to sleep before checking again"""
+        if self.calendar is None:
+            return 0
+        now = datetime.now(timezone.utc)
+        opens = self.calendar.next_open(self.exchange, now)
+        if opens == now:
+            if self._closed:
+                print(f"💹 {self.exchange} open; resuming {self.ticker}")
+            self._closed = False
+            return 0
+        if not self._closed:
+            when = opens.strftime("%Y-%m-%d %H:%M %Z") if opens else "unknown"
+            print(f"🛑 {self.exchange} closed; {self.ticker} paused until {when}")
+            self._closed = True
+            self.interval = self.fast
+        wait = (opens - now).total_seconds() if opens else CLOSED_CHECK_EVERY
+        return min(max(wait, 1), CLOSED_CHECK_EVERY)
+
+    def next_delay(self, price) -> float:
+        """Seconds until the next poll, given the price this one returned (or None)"""
+        if not self.adaptive:
+            return self.fast
+        if price is not None and (self.last_price is None or abs(price - self.last_price) > EPS):
+            self.interval = self.fast
+        else:
+            self.interval = min(self.interval * BACKOFF_FACTOR, self.slowest)
+        if price is not None:
+            self.last_price = price
+        return self.interval
@@ -0,0 +1,283 @@
+"""Server-side windowing of tick logs for the charts.
+
+Mirrors what updateChartFromJson used to do in the browser: pick the
+range relative to the latest tick, drop consecutive repeats and cap the
+result at `max_points` (downsampled, so long ranges keep their shape
+instead of showing only the newest ticks). Each log is indexed once and then only its new
+tail is read (or, when the collector keeps a column store, the columns are
+memory-mapped), so a query costs O(points in range), not O(file size).
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from stockitup.downsample import downsample
+from stockitup.candles import RESOLUTIONS, first_candle, pick_resolution, query_candles
+from stockitup.colstore import ColumnIndex, columns_dir_for
+from stockitup.ticklog import iter_ticks, log_path_for, parse_ts_ms
+
+HOUR_MS = 60 * 60 * 1000
+RANGE_OPTIONS = {
+    "1H": HOUR_MS,
+    "6H": 6 * HOUR_MS,
+    "12H": 12 * HOUR_MS,
+    "1D": 24 * HOUR_MS,
+    "5D": 5 * 24 * HOUR_MS,
+    "10D": 10 * 24 * HOUR_MS,
+    "ALL": None,
+}
+DEFAULT_RANGE = "6H"
+MAX_POINTS = 200
+EPS = 1e-9
+CANDLE_THRESHOLD = 5000  # raw ticks in a range above which candles are read instead
+COLUMNS_STALE_AFTER = 60  # seconds the log may run ahead of its column store
+LISTING_SETTLE_NS = 2 * 10**9  # folder listings younger than this aren't cached
+CANDLE_ROWS = 2          # candles per plotted point the chosen resolution must at least produce
+
+
+# ==============================
+# Per-log time index
+# ==============================
+class TickIndex:
+    """Sorted (timestamp, price) columns for one ticker in one log file"""
+
+    def __init__(self, path: str, ticker: str):
+        self.path = path
+        self.ticker = ticker.upper()
+        self.ts = []
+        self.prices = []
+        self._offset = 0
+        self._stat = None
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self.ts, self.prices, self._offset = [], [], 0
+
+    def _add(self, entry: dict):
+        if str(entry.get("ticker", "")).upper() != self.ticker:
+            return
+        ts = parse_ts_ms(entry.get("timestamp"))
+        try:
+            price = float(entry.get("price"))
+        except (TypeError, ValueError):
+            return
+        if ts is None or price != price:
+            return
+        if self.ts and ts < self.ts[-1]:
+            i = bisect.bisect_right(self.ts, ts)
+            self.ts.insert(i, ts)
+            self.prices.insert(i, price)
+        else:
+            self.ts.append(ts)
+            self.prices.append(price)
+
+    def refresh(self):
+        """Pick up ticks appended since the last call"""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._reset()
+                self._stat = None
+                return self
+            stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if stat == self._stat:
+                return self
+
+            if self.path.endswith(".jsonl"):
+                # Rewritten or truncated (e.g. compaction): start over
+                if self._stat and (st.st_ino != self._stat[0] or st.st_size < self._offset):
+                    self._reset()
+                for offset, entry in iter_ticks(self.path, self._offset):
+                    self._offset = offset
+                    self._add(entry)
+            else:
+                # Legacy JSON array: no way to read just the tail
+                self._reset()
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    data = []
+                for entry in data if isinstance(data, list) else []:
+                    if isinstance(entry, dict):
+                        self._add(entry)
+            self._stat = stat
+        return self
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the indexed ticks change (used as the ETag)"""
+        with self._lock:
+            if not self.ts:
+                return "0"
+            return f"{len(self.ts)}-{self.ts[-1]}-{self.prices[-1]!r}"
+
+    @property
+    def latest_ts(self):
+        with self._lock:
+            return self.ts[-1] if self.ts else None
+
+    def since(self, since_ms: int):
+        """(timestamps, prices) strictly newer than `since_ms`"""
+        with self._lock:
+            lo = bisect.bisect_right(self.ts, since_ms)
+            return self.ts[lo:], self.prices[lo:]
+
+    def bounds(self, span):
+        """(start_ms, end_ms, tick_count) of the last `span` ms (None = all)"""
+        with self._lock:
+            if not self.ts:
+                return None, None, 0
+            lo = 0 if span is None else bisect.bisect_left(self.ts, self.ts[-1] - span)
+            return self.ts[-1] - span if span else self.ts[0], self.ts[-1], len(self.ts) - lo
+
+    def window(self, span):
+        """(timestamps, prices) within `span` ms of the latest tick (None = all)"""
+        with self._lock:
+            if not self.ts:
+                return [], []
+            lo = 0 if span is None else bisect.bisect_left(self.ts, self.ts[-1] - span)
+            return self.ts[lo:], self.prices[lo:]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _columns_stale(log_file: str, columns: str) -> bool:
+    """True if something other than the collector (e.g. a single-ticker
+    script) has been appending to the log without updating the columns"""
+    try:
+        return os.path.getmtime(log_file) > os.path.getmtime(os.path.join(columns, "ts.i64")) + COLUMNS_STALE_AFTER
+    except OSError:
+        return True
+
+
+def get_index(path: str, ticker: str):
+    """Index for a ticker's log: its memory-mapped column store if the
+    collector keeps one, else an in-memory TickIndex over the log itself"""
+    key = (os.path.abspath(path), ticker.upper())
+    columns = columns_dir_for(key[0])
+    use_columns = os.path.isdir(columns) and not _columns_stale(key[0], columns)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None or isinstance(index, TickIndex) == use_columns:
+            if use_columns:
+                index = ColumnIndex(columns, ticker, key[0])
+            else:
+                index = TickIndex(key[0], ticker)
+            _indexes[key] = index
+    return index.refresh()
+
+
+_listings = {}  # folder -> (mtime_ns, {TICKER: stored ticks})
+_listings_lock = threading.Lock()
+
+
+def resolve_log(json_folder: str, ticker: str):
+    """Find the stored ticks for a ticker: its .jsonl log, else a legacy .json.
+    The folder is listed again only when its mtime changes (a file added,
+    removed or renamed), so a lookup is one stat()."""
+    try:
+        mtime = os.stat(json_folder).st_mtime_ns
+    except OSError:
+        return None
+    with _listings_lock:
+        cached = _listings.get(json_folder)
+    if cached is None or cached[0] != mtime:
+        names = set(os.listdir(json_folder)) if os.path.isdir(json_folder) else set()
+        found = {}
+        for name in sorted(names):
+            root, ext = os.path.splitext(name)
+            if ext in (".jsonl", ".json"):
+                path = os.path.join(json_folder, root + ".json")
+                found.setdefault(root.upper(), log_path_for(path) if root + ".jsonl" in names else path)
+        cached = (mtime, found)
+        # A change in the same mtime tick as this listing would go unseen,
+        # so a folder modified just now is listed again next time
+        if time.time_ns() - mtime > LISTING_SETTLE_NS:
+            with _listings_lock:
+                _listings[json_folder] = cached
+    return cached[1].get(ticker.upper())
+
+
+# ==============================
+# Windowing
+# ==============================
+def dedupe(ts, prices):
+    """Drop ticks whose price equals the previous tick's price"""
+    ts = np.asarray(ts, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) < 2:
+        return ts, prices
+    keep = np.empty(len(prices), dtype=bool)
+    keep[0] = True
+    np.greater(np.abs(np.diff(prices)), EPS, out=keep[1:])
+    return ts[keep], prices[keep]
+
+
+def candle_window(index, range_key: str, max_points: int, live_candle=None):
+    """Close prices of a long range's candles, at the coarsest resolution
+    that still gives CANDLE_ROWS candles per plotted point, or None
+
+    Candles are used when the range holds too many raw ticks, or when it
+    reaches back past raw ticks that compaction has rolled up. Returns None
+    when raw ticks will do, or when the candle files don't cover the range.
+    """
+    span = RANGE_OPTIONS[range_key]
+    start, end, count = index.bounds(span)
+    if start is None:
+        return None
+    first_raw = start if span is None else index.bounds(None)[0]
+    oldest = first_candle(index.path, "1D")
+    compacted = oldest is not None and oldest + RESOLUTIONS["1D"] < first_raw
+    if compacted and span is None:
+        start = oldest
+    if count <= CANDLE_THRESHOLD and not (compacted and start < first_raw):
+        return None
+    finest = RESOLUTIONS[pick_resolution(end - start, max_points * CANDLE_ROWS)]
+    covered_from = first_raw if span is None else start
+    # A coarser resolution stands in when the chosen one has expired (1m) or
+    # is still being backfilled
+    for res in sorted((r for r in RESOLUTIONS if RESOLUTIONS[r] >= finest), key=RESOLUTIONS.get):
+        candles = query_candles(index.path, res, start, live_candle(res) if live_candle else None)
+        if candles["t"] and candles["t"][0] <= covered_from + RESOLUTIONS[res]:
+            return res, candles["t"], candles["c"]
+    return None
+
+
+def query_series(index, range_key: str = DEFAULT_RANGE, max_points: int = MAX_POINTS,
+                 since: int = None, mode: str = "lttb", live_candle=None) -> dict:
+    """Chart points for a range, or only the ticks after `since` (epoch ms)
+
+    Ranges are downsampled to `max_points` with `mode`; long ranges are read
+    from OHLC candles (`live_candle(res)` supplies the still-open one).
+    Deltas are never downsampled, only capped to their newest ticks. The
+    cursor is the newest stored tick, even when dedupe dropped it, so the
+    next `since` poll starts after a flat run instead of inside it.
+    """
+    source = "ticks"
+    cursor = index.latest_ts  # read first: a tick landing mid-query is sent again, never skipped
+    from_candles = candle_window(index, range_key, max_points, live_candle) if since is None else None
+    if from_candles:
+        res, ts, prices = from_candles
+        source = f"candles:{res}"
+    else:
+        ts, prices = index.window(RANGE_OPTIONS[range_key]) if since is None else index.since(since)
+        cursor = int(ts[-1]) if len(ts) else since
+    ts, prices = dedupe(ts, prices)
+    ts, prices = downsample(ts, prices, max_points, mode if since is None else "tail")
+    return {
+        "ticker": index.ticker,
+        "range": range_key,
+        "since": since,
+        "source": source,
+        "timestamps": ts,
+        "prices": prices,
+        "cursor": cursor if cursor is not None else since,
+    }
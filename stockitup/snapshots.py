@@ -0,0 +1,146 @@
+"""Prebuilt per-range chart snapshots for static hosting.
+
+For a tick log Company-Jsons/Reliance.jsonl this writes
+
+    Company-Jsons/snapshots/Reliance.1H.json ... Reliance.ALL.json
+
+each holding exactly what /api/series would return for that range
+(windowed, deduped, downsampled to MAX_POINTS), plus .gz and .br siblings
+for servers that serve precompressed files (brotli is optional). Every
+file is written to a temp name and renamed into place, so a static host
+never serves a half-written snapshot and costs no CPU per request.
+
+Usage:
+    python -m stockitup.snapshots                 # publish once for every log
+    python -m stockitup.snapshots --watch 5       # keep republishing as ticks arrive
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from stockitup.compact import default_logs
+from stockitup.series import MAX_POINTS, RANGE_OPTIONS, get_index, query_series
+from stockitup.ticklog import last_entry
+
+SNAPSHOT_DIR = "snapshots"
+PUBLISH_EVERY = 5  # seconds between republishes of one log
+
+
+def snapshot_path(log_file: str, range_key: str) -> str:
+    folder, name = os.path.split(log_file)
+    root, _ = os.path.splitext(name)
+    return os.path.join(folder, SNAPSHOT_DIR, f"{root}.{range_key}.json")
+
+
+def write_atomic(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def encodings(body: bytes) -> dict:
+    """File suffix -> encoded body, for every encoding available"""
+    out = {".gz": gzip.compress(body, 9, mtime=0)}
+    if brotli:
+        out[".br"] = brotli.compress(body)
+    return out
+
+
+# ==============================
+# Publishing
+# ==============================
+_published = {}  # log path -> index version last written
+
+
+def publish(log_file: str, ticker: str = None, max_points: int = MAX_POINTS) -> bool:
+    """Rewrite a log's snapshots if it changed; returns True if it did"""
+    if ticker is None:
+        last = last_entry(log_file)
+        if not last or not last.get("ticker"):
+            return False
+        ticker = last["ticker"]
+    index = get_index(log_file, ticker)
+    key = os.path.abspath(log_file)
+    if _published.get(key) == index.version:
+        return False
+
+    os.makedirs(os.path.join(os.path.dirname(key), SNAPSHOT_DIR), exist_ok=True)
+    for range_key in RANGE_OPTIONS:
+        path = snapshot_path(key, range_key)
+        body = json.dumps(query_series(index, range_key, max_points), separators=(",", ":")).encode("utf-8")
+        # compressed siblings first, so none of them is older than the .json
+        for suffix, data in encodings(body).items():
+            write_atomic(path + suffix, data)
+        write_atomic(path, body)
+    _published[key] = index.version
+    return True
+
+
+class Publisher:
+    """Batches ticks from the collector and republishes on a background thread"""
+
+    def __init__(self, every: float = PUBLISH_EVERY):
+        self.every = every
+        self._dirty = {}  # log file -> ticker
+        self._cond = threading.Condition()
+
+    def mark(self, log_file: str, ticker: str):
+        with self._cond:
+            self._dirty[log_file] = ticker
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty)
+                dirty, self._dirty = self._dirty, {}
+            for log_file, ticker in dirty.items():
+                try:
+                    publish(log_file, ticker)
+                except Exception as e:
+                    print(f"❌ Error publishing snapshots for {ticker}: {e}")
+            time.sleep(self.every)
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, daemon=True, name="snapshots")
+        thread.start()
+        return thread
+
+
+# ==============================
+# CLI
+# ==============================
+def main():
+    parser = argparse.ArgumentParser(description="Publish static per-range chart snapshots")
+    parser.add_argument("paths", nargs="*", help="tick logs (.jsonl); default: every known log")
+    parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                        help="keep republishing changed logs every SECONDS")
+    args = parser.parse_args()
+    if not brotli:
+        print("⚠️ brotli not installed; writing .gz snapshots only")
+
+    while True:
+        for path in args.paths or default_logs():
+            if not os.path.exists(path):
+                continue
+            try:
+                if publish(path):
+                    print(f"📁 Published snapshots for {path}")
+            except Exception as e:
+                print(f"❌ Error publishing snapshots for {path}: {e}")
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Recent ticks of hot tickers, kept in RAM.
+
+Each cached ticker gets a fixed-capacity ring buffer backed by two NumPy
+arrays. The collector's on_tick appends to it, so it is never stale. A
+range query that the ring covers is answered from memory with two binary
+searches. Anything else is a miss that falls through to the on-disk index
+(TickIndex / ColumnIndex). Rings of tickers nobody has read recently are
+evicted (LRU) to stay within a fixed memory budget.
+"""
+import collections
+import os
+import threading
+
+import numpy as np
+
+from stockitup.ticklog import parse_ts_ms
+
+RING_CAPACITY = 8640  # ticks per ticker: a day at the collector's 10s interval
+CACHE_BUDGET = int(os.environ.get("STOCKITUP_CACHE_MB", 64)) * 1024 * 1024
+
+
+class TickRing:
+    """Ring buffer with the same read interface as TickIndex.
+
+    Every row is written twice, at i and i + capacity, so the live window
+    buf[head:head + capacity] is always one contiguous, ordered slice.
+    """
+    ROW_BYTES = 2 * (8 + 8)
+
+    def __init__(self, ticker: str, path: str, capacity: int = RING_CAPACITY):
+        self.ticker = ticker.upper()
+        self.path = path
+        self.capacity = capacity
+        self.complete = False  # holds the ticker's whole history
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._prices = np.zeros(2 * capacity, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _append(self, ts_ms: int, price: float):
+        cap = self.capacity
+        i = (self._head + self._count) % cap
+        self._ts[i] = self._ts[i + cap] = ts_ms
+        self._prices[i] = self._prices[i + cap] = price
+        if self._count < cap:
+            self._count += 1
+        else:
+            self._head = (self._head + 1) % cap
+            self.complete = False
+
+    def _view(self):
+        lo, hi = self._head, self._head + self._count
+        return self._ts[lo:hi], self._prices[lo:hi]
+
+    def append(self, ts_ms: int, price: float):
+        with self._lock:
+            if not self._count or ts_ms >= self._ts[self._head + self._count - 1]:
+                self._append(ts_ms, price)
+
+    def seed(self, ts, prices, complete: bool):
+        """Put history read from disk in front of whatever was appended meanwhile"""
+        with self._lock:
+            cur_ts, cur_prices = (a.copy() for a in self._view())
+            ts = np.asarray(ts, dtype=np.int64)
+            prices = np.asarray(prices, dtype=np.float64)
+            if len(cur_ts):
+                keep = ts < cur_ts[0]
+                ts, prices = ts[keep], prices[keep]
+            ts = np.concatenate((ts, cur_ts))[-self.capacity:]
+            prices = np.concatenate((prices, cur_prices))[-self.capacity:]
+            n, cap = len(ts), self.capacity
+            self._ts[:n] = self._ts[cap:cap + n] = ts
+            self._prices[:n] = self._prices[cap:cap + n] = prices
+            self._head, self._count = 0, n
+            self.complete = complete and n < cap
+
+    def covers(self, span_ms=None, since_ms=None) -> bool:
+        """True if every tick a query needs is in the ring"""
+        with self._lock:
+            if self.complete:
+                return True
+            if not self._count:
+                return False
+            oldest = self._ts[self._head]
+            latest = self._ts[self._head + self._count - 1]
+        if since_ms is not None:
+            return since_ms >= oldest
+        return span_ms is not None and latest - span_ms >= oldest
+
+    # ---------- TickIndex interface ----------
+    def refresh(self):
+        return self
+
+    @property
+    def version(self) -> str:
+        with self._lock:
+            if not self._count:
+                return "0"
+            i = self._head + self._count - 1
+            return f"{self._count}-{int(self._ts[i])}-{float(self._prices[i])!r}"
+
+    @property
+    def latest_ts(self):
+        with self._lock:
+            return int(self._ts[self._head + self._count - 1]) if self._count else None
+
+    def since(self, since_ms: int):
+        with self._lock:
+            ts, prices = self._view()
+            lo = np.searchsorted(ts, since_ms, side="right")
+            return ts[lo:].copy(), prices[lo:].copy()
+
+    def bounds(self, span_ms):
+        with self._lock:
+            ts, _ = self._view()
+            if not len(ts):
+                return None, None, 0
+            end = int(ts[-1])
+            if span_ms is None:
+                return int(ts[0]), end, len(ts)
+            lo = np.searchsorted(ts, end - span_ms, side="left")
+            return end - span_ms, end, len(ts) - int(lo)
+
+    def window(self, span_ms):
+        with self._lock:
+            ts, prices = self._view()
+            lo = 0 if not len(ts) or span_ms is None else np.searchsorted(ts, ts[-1] - span_ms, side="left")
+            return ts[lo:].copy(), prices[lo:].copy()
+
+
+class TickCache:
+    """LRU of TickRings under a global memory budget, with hit/miss counters"""
+
+    def __init__(self, budget_bytes: int = CACHE_BUDGET, capacity: int = RING_CAPACITY):
+        self.capacity = capacity
+        self.max_rings = max(1, budget_bytes // (capacity * TickRing.ROW_BYTES))
+        self.hits = self.misses = self.evictions = 0
+        self._rings = collections.OrderedDict()  # TICKER -> TickRing, coldest first
+        self._lock = threading.Lock()
+
+    def append(self, entry: dict):
+        """Collector on_tick callback; only tickers already cached are kept"""
+        with self._lock:
+            ring = self._rings.get(entry["ticker"].upper())
+        ts = parse_ts_ms(entry.get("timestamp"))
+        if ring is not None and ts is not None:
+            ring.append(ts, float(entry["price"]))
+
+    def get(self, ticker: str, span_ms=None, since_ms=None):
+        """The ticker's ring if it covers the query (a hit), else None"""
+        key = ticker.upper()
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is not None:
+                self._rings.move_to_end(key)
+        hit = ring is not None and ring.covers(span_ms, since_ms)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return ring if hit else None
+
+    def load(self, ticker: str, index):
+        """Start caching a ticker, seeded with the newest ticks of its on-disk index"""
+        key = ticker.upper()
+        with self._lock:
+            if key in self._rings:
+                return
+            ring = self._rings[key] = TickRing(key, index.path, self.capacity)
+            while len(self._rings) > self.max_rings:
+                self._rings.popitem(last=False)
+                self.evictions += 1
+        # registered before reading the disk, so no tick falls in between
+        ts, prices = index.refresh().window(None)
+        ring.seed(ts[-self.capacity:], prices[-self.capacity:], len(ts) <= self.capacity)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "tickers": len(self._rings),
+                "max_tickers": self.max_rings,
+                "ring_capacity": self.capacity,
+                "bytes": len(self._rings) * self.capacity * TickRing.ROW_BYTES,
+            }
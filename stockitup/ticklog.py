@@ -0,0 +1,261 @@
+"""Append-only tick log (JSON Lines).
+
+Each tick is one line: {"ticker", "exchange", "price", "timestamp"}.
+Appending writes only that line, so the cost per tick stays the same no
+matter how long a collector has been running.
+
+Writers take an exclusive lock on the file for each append and check that
+the path still names the file they opened. That lets compaction replace a
+log (drop_head, rewrite_log) while collectors keep writing to it.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, compaction is best effort
+    fcntl = None
+
+
+# ==============================
+# Paths
+# ==============================
+def log_path_for(array_file: str) -> str:
+    """Map a legacy JSON array path (foo.json) to its tick log (foo.jsonl)"""
+    root, ext = os.path.splitext(array_file)
+    return array_file if ext == ".jsonl" else root + ".jsonl"
+
+
+# ==============================
+# Locking
+# ==============================
+def lock_file(f):
+    """Exclusive lock on an open log (released by unlock_file or close)"""
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def unlock_file(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def is_current(f, path: str) -> bool:
+    """False once `path` was replaced (e.g. compacted) under the open handle"""
+    try:
+        return os.fstat(f.fileno()).st_ino == os.stat(path).st_ino
+    except OSError:
+        return False
+
+
+# ==============================
+# Write
+# ==============================
+def append_tick(path: str, entry: dict):
+    """Append one tick as a single line (O(1), never rewrites the file)"""
+    line = json.dumps(entry, separators=(",", ":")) + "\n"
+    # One write() on an O_APPEND handle, so concurrent readers only ever
+    # see whole lines or a missing tail, never an interleaved record.
+    while True:
+        with open(path, "a", encoding="utf-8") as f:
+            lock_file(f)
+            if is_current(f, path):
+                f.write(line)
+                return
+
+
+def drop_head(path: str, offset: int) -> int:
+    """Atomically remove the first `offset` bytes (whole lines) of a log.
+
+    The tail is copied without blocking the writer; only the catch-up on
+    lines appended meanwhile and the rename happen under the lock.
+    Returns the new size.
+    """
+    tmp = path + ".compact"
+    with open(path, "rb") as src:
+        with open(tmp, "wb") as dst:
+            src.seek(offset)
+            shutil.copyfileobj(src, dst)
+            lock_file(src)
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+            size = dst.tell()
+        if fcntl:
+            os.replace(tmp, path)
+    if not fcntl:
+        os.replace(tmp, path)
+    return size
+
+
+def rewrite_log(path: str, transform) -> int:
+    """Atomically replace a small log with transform(entries), under its lock.
+
+    Used for candle files, which stay short. Returns the number of records
+    written.
+    """
+    tmp = path + ".compact"
+    with open(path, "a+b") as src:
+        lock_file(src)
+        src.seek(0)
+        entries = []
+        for raw in src:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                entries.append(entry)
+        entries = transform(entries)
+        with open(tmp, "w", encoding="utf-8") as dst:
+            for entry in entries:
+                dst.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            dst.flush()
+            os.fsync(dst.fileno())
+        if fcntl:
+            os.replace(tmp, path)
+    if not fcntl:
+        os.replace(tmp, path)
+    return len(entries)
+
+
+def migrate_array(array_file: str, log_file: str = None) -> str:
+    """Seed the tick log from a legacy JSON array, once.
+
+    Does nothing if the log already exists, so collectors can call this
+    on every start-up.
+    """
+    log_file = log_file or log_path_for(array_file)
+    if os.path.exists(log_file) or not os.path.exists(array_file):
+        return log_file
+
+    try:
+        with open(array_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        data = []
+    if not isinstance(data, list):
+        data = []
+
+    tmp = log_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for entry in data:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    os.replace(tmp, log_file)
+    print(f"📁 Migrated {len(data)} ticks from {array_file} to {log_file}")
+    return log_file
+
+
+# ==============================
+# Read
+# ==============================
+def parse_ts_ms(ts: str):
+    """'2025-09-23 12:44:52' (local time, as the collectors write it) -> epoch ms"""
+    try:
+        return int(datetime.fromisoformat(ts).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_ticks(path: str, offset: int = 0):
+    """Yield (next_offset, entry) for every complete line from `offset`.
+
+    A partially written last line is left for the next call, and lines that
+    fail to decode are skipped.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                yield offset, entry
+
+
+def offset_at(path: str, ts_ms: int) -> int:
+    """Byte offset of the first tick at or after `ts_ms`.
+
+    Binary search over the file (the log is written in time order), so
+    resuming from a point in a long log doesn't mean reading all of it.
+    """
+    def line_after(f, pos):
+        f.seek(max(pos - 1, 0))
+        if pos:
+            f.readline()  # finish the line that contains byte pos - 1
+        start = f.tell()
+        return start, f.readline()
+
+    def tick_ts(raw):
+        try:
+            return parse_ts_ms(json.loads(raw).get("timestamp"))
+        except (ValueError, AttributeError):
+            return None
+
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        lo, hi = 0, os.fstat(f.fileno()).st_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, raw = line_after(f, mid)
+            ts = tick_ts(raw) if raw.endswith(b"\n") else None
+            if not raw or (ts is not None and ts >= ts_ms):
+                hi = mid
+            else:
+                lo = mid + 1
+        return line_after(f, lo)[0]
+
+
+def last_entry(path: str):
+    """Last complete record of a log, read from the end of the file"""
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - 4096))
+            lines = f.read().splitlines(keepends=True)
+    except OSError:
+        return None
+    for raw in reversed(lines):
+        if raw.endswith(b"\n"):
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            return entry if isinstance(entry, dict) else None
+    return None
+
+
+def last_tick(path: str):
+    """Last record of a tick log, or of a legacy .json array (read whole)"""
+    if path.endswith(".jsonl"):
+        return last_entry(path)
+    ticks = read_ticks(path)
+    return ticks[-1] if ticks and isinstance(ticks[-1], dict) else None
+
+
+def read_ticks(path: str) -> list:
+    """Read a tick log back into the legacy list-of-dicts shape.
+
+    Legacy .json arrays are accepted too, so callers don't need to care
+    which format a given ticker is stored in.
+    """
+    if path.endswith(".json"):
+        if os.path.exists(log_path_for(path)):
+            path = log_path_for(path)
+        else:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                return []
+            return data if isinstance(data, list) else []
+    return [entry for _, entry in iter_ticks(path)]
@@ -0,0 +1,41 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from stockitup.analytics import analyze, make_grid
+from stockitup.ticklog import parse_ts_ms
+
+START = datetime(2025, 3, 3, 9, 15)  # long past: the grid must not end at the wall clock
+MINUTES = 300
+
+
+def write_log(path, ticker, prices):
+    with open(path, "w") as f:
+        for i, price in enumerate(prices):
+            ts = (START + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+            f.write(json.dumps({"ticker": ticker, "exchange": "NSE", "price": float(price), "timestamp": ts}) + "\n")
+    return str(path)
+
+
+def test_correlation_of_stale_logs(tmp_path):
+    rng = np.random.default_rng(7)
+    a = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, MINUTES)))
+    b = 50 * np.exp(np.cumsum(0.8 * np.diff(np.log(a), prepend=np.log(a[0])) + rng.normal(0, 0.001, MINUTES)))
+    logs = {"AAA": write_log(tmp_path / "AAA.jsonl", "AAA", a), "BBB": write_log(tmp_path / "BBB.jsonl", "BBB", b)}
+
+    grid = make_grid("1D", logs, 60_000)
+    assert grid[-1] == parse_ts_ms((START + timedelta(minutes=MINUTES - 1)).strftime("%Y-%m-%d %H:%M:%S"))
+
+    result = analyze(logs, "1D", 60_000)
+    expected = np.corrcoef(np.diff(np.log(a)), np.diff(np.log(b)))[0, 1]
+    assert result["correlation"][0][0] == 1.0
+    assert abs(result["correlation"][0][1] - expected) < 1e-6
+    assert result["correlation"][0][1] == result["correlation"][1][0]
+    assert abs(result["total_return"]["AAA"] - np.log(a[-1] / a[0])) < 1e-6
+
+
+def test_all_range_covers_every_tick(tmp_path):
+    logs = {"AAA": write_log(tmp_path / "AAA.jsonl", "AAA", np.linspace(100, 110, MINUTES))}
+    grid = make_grid("ALL", logs, 60_000)
+    assert len(grid) == MINUTES
@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scripts import build_news
+
+
+def article(topic, i, minute):
+    return {"title": f"{topic} {i}", "url": f"https://example.com/{i}", "source": {"name": "Wire"},
+            "publishedAt": f"2025-09-25T10:{minute:02d}:00Z"}
+
+
+class Stub:
+    """Stand-in NewsAPI: `respond(topic, attempt)` -> (status, headers, articles)"""
+
+    def __init__(self, respond, latency=0.0):
+        self.respond, self.latency = respond, latency
+        self.lock = threading.Lock()
+        self.requests = []  # (topic, query params), as they arrive
+        self.answered = []  # topics, as they are answered
+        self.in_flight = self.max_in_flight = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                topic = query["q"][0]
+                with stub.lock:
+                    stub.requests.append((topic, query))
+                    attempt = sum(t == topic for t, _ in stub.requests) - 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.latency(topic) if callable(stub.latency) else stub.latency)
+                status, headers, articles = stub.respond(topic, attempt)
+                body = json.dumps({"status": "ok", "articles": articles}).encode()
+                with stub.lock:
+                    stub.in_flight -= 1
+                    stub.answered.append(topic)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v2/everything"
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Start a Stub and point NEWSAPI_BASE_URL (build_news.BASE_URL) at it"""
+    stubs = []
+
+    def start(respond, latency=0.0):
+        stub = Stub(respond, latency)
+        threading.Thread(target=stub.server.serve_forever, args=(0.05,), daemon=True).start()
+        monkeypatch.setenv("NEWSAPI_BASE_URL", stub.url)
+        monkeypatch.setattr(build_news, "BASE_URL", stub.url)
+        stubs.append(stub)
+        return stub
+
+    monkeypatch.setattr(build_news, "bucket", build_news.TokenBucket(1000, 1000))
+    monkeypatch.setattr(build_news, "BACKOFF", 0.01)
+    yield start
+    for stub in stubs:
+        stub.server.shutdown()
+        stub.server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now, self.sleeps = 0.0, []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+def test_token_bucket_allows_a_burst_then_the_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(build_news, "time", clock)
+    bucket = build_news.TokenBucket(rate=4, burst=2)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.sleeps == [0.25, 0.25, 0.25]
+    clock.now += 10  # idle: refills to the burst, never beyond
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == [0.25, 0.25, 0.25, 0.25]
+
+
+def test_fetch_all_caps_concurrency(serve, monkeypatch):
+    monkeypatch.setattr(build_news, "CONCURRENCY", 3)
+    stub = serve(lambda topic, attempt: (200, {}, [article(topic, topic, 0)]), latency=0.1)
+    results = build_news.fetch_all([f"t{i}" for i in range(9)])
+    assert [len(articles) for _, articles in results] == [1] * 9
+    assert stub.max_in_flight == 3
+
+
+def test_fetch_all_keeps_topic_order(serve):
+    stub = serve(lambda topic, attempt: (200, {}, [article(topic, topic, 0)]),
+                 latency=lambda topic: 0.2 if topic == "slow" else 0.0)
+    results = build_news.fetch_all(["slow", "fast", "other"])
+    assert [topic for topic, _ in results] == ["slow", "fast", "other"]
+    assert stub.answered[-1] == "slow"
+
+
+def test_retries_429_and_5xx_then_succeeds(serve):
+    statuses = [(429, {"Retry-After": "0"}), (503, {}), (200, {})]
+    stub = serve(lambda topic, attempt: (*statuses[attempt], [article(topic, "x", 0)] if attempt == 2 else []))
+    assert build_news.fetch_all(["markets"]) == [("markets", [article("markets", "x", 0)])]
+    assert len(stub.requests) == 3
+
+
+def test_gives_up_after_the_retries(serve):
+    stub = serve(lambda topic, attempt: (500, {}, []))
+    assert build_news.fetch_all(["markets"]) == [("markets", [])]
+    assert len(stub.requests) == build_news.RETRIES + 1
+
+
+def test_client_errors_are_not_retried(serve):
+    stub = serve(lambda topic, attempt: (401, {}, []))
+    assert build_news.fetch_all(["markets"]) == [("markets", [])]
+    assert len(stub.requests) == 1
+
+
+def test_backoff_doubles_unless_the_server_says_when(monkeypatch):
+    monkeypatch.setattr(build_news, "BACKOFF", 0.5)
+
+    class Response:
+        def __init__(self, headers):
+            self.headers = headers
+
+    assert [build_news.retry_delay(Response({}), attempt) for attempt in range(3)] == [0.5, 1.0, 2.0]
+    assert build_news.retry_delay(Response({"Retry-After": "3"}), 0) == 3.0
+    assert build_news.retry_delay(Response({"Retry-After": "3600"}), 0) == build_news.MAX_RETRY_AFTER
+
+
+def test_main_dedupes_urls_and_sorts_newest_first(serve, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build_news, "API_KEY", "test")
+    monkeypatch.setattr(build_news, "TOPICS", ["gold", "silver"])
+    feeds = {
+        "gold": [article("gold", "a", 5), article("gold", "shared", 20)],
+        "silver": [article("silver", "shared", 20), article("silver", "b", 30)],
+    }
+    serve(lambda topic, attempt: (200, {}, feeds[topic]), latency=lambda topic: 0.1 if topic == "gold" else 0.0)
+    build_news.main()
+    news = json.loads((tmp_path / "news.json").read_text())
+    assert [a["url"] for a in news] == ["https://example.com/b", "https://example.com/shared", "https://example.com/a"]
+    assert news[1]["topic"] == "gold"  # the first topic to list a URL keeps it
+
+
+@pytest.fixture
+def feeds(serve, monkeypatch, tmp_path):
+    """Per-topic article lists served like NewsAPI: only those published at or after ?from="""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build_news, "API_KEY", "test")
+    monkeypatch.setattr(build_news, "TOPICS", ["gold", "silver"])
+    monkeypatch.delenv("NEWS_FULL", raising=False)
+    data = {"gold": [], "silver": []}
+
+    def respond(topic, attempt):
+        since = dict(stub.requests)[topic].get("from", [""])[0]
+        return 200, {}, [a for a in data[topic] if a["publishedAt"] >= since]
+
+    stub = serve(respond)
+    data["stub"] = stub
+    return data
+
+
+def test_run_without_new_articles_leaves_news_json_untouched(feeds, tmp_path):
+    feeds["gold"] += [article("gold", "a", 5), article("gold", "b", 10)]
+    build_news.main()
+    news = tmp_path / "news.json"
+    before = news.read_bytes(), news.stat().st_mtime_ns
+    time.sleep(0.01)
+
+    build_news.main()
+    assert (news.read_bytes(), news.stat().st_mtime_ns) == before
+    # the second run asked only for what is newer than the topic's cursor
+    assert dict(feeds["stub"].requests)["gold"]["from"] == ["2025-09-25T10:10:00Z"]
+
+
+def test_run_with_new_articles_merges_only_those(feeds, tmp_path):
+    feeds["gold"] += [article("gold", "a", 5), article("gold", "b", 10)]
+    feeds["silver"] += [article("silver", "c", 7)]
+    build_news.main()
+    first = json.loads((tmp_path / "news.json").read_text())
+
+    feeds["gold"] += [article("gold", "d", 30)]
+    feeds["silver"] += [article("silver", "e", 20), article("silver", "b", 25)]  # b: already stored under gold
+    build_news.main()
+    news = json.loads((tmp_path / "news.json").read_text())
+    assert [a["url"] for a in news] == [f"https://example.com/{i}" for i in "debca"]
+    assert news[2:] == first
+    index = json.loads((tmp_path / "news.index.json").read_text())
+    assert index["cursors"] == {"gold": "2025-09-25T10:30:00Z", "silver": "2025-09-25T10:25:00Z"}
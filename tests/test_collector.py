@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from stockitup.collector import Collector
+
+
+class Failing:
+    def update(self, ts, price):
+        raise OSError("disk full")
+
+    def append(self, ts, price):
+        raise OSError("disk full")
+
+    def close(self):
+        pass
+
+
+def make_collector(tmp_path, **kwargs):
+    c = Collector(json_folder=str(tmp_path), **kwargs)
+    c.add("ABC")
+    return c, c.find("ABC")
+
+
+def test_candle_write_error_stays_inside_record(tmp_path):
+    c, item = make_collector(tmp_path, columns=False)
+    item["candles"] = Failing()
+    assert c.record(item, 10.0)["price"] == 10.0
+    assert c.metrics.errors.total() == 1
+    assert c.metrics.ticks.total() == 0
+
+
+def test_column_write_error_stays_inside_record(tmp_path):
+    c, item = make_collector(tmp_path, candles=False)
+    item["columns"].close()
+    item["columns"] = Failing()
+    assert c.record(item, 10.0)["price"] == 10.0
+    assert c.metrics.errors.total() == 1
+
+
+def test_poll_loop_survives_an_unexpected_error(tmp_path):
+    c, item = make_collector(tmp_path, candles=False, columns=False)
+    item["interval"] = 0
+    calls = []
+
+    async def fetch_price(ticker, exchange):
+        calls.append(ticker)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        if len(calls) == 3:
+            c.remove("ABC")
+        return 10.0
+
+    c.fetch_price = fetch_price
+    item["schedule"].next_delay = lambda price: 0
+    asyncio.run(c._poll(("ABC", "NSE")))
+    assert len(calls) == 3
+    assert c.metrics.errors.total() == 1
+
+
+def test_poll_stores_ticks_off_the_event_loop(tmp_path):
+    c, item = make_collector(tmp_path, candles=False, columns=False)
+    threads = []
+
+    async def fetch_price(ticker, exchange):
+        return 10.0
+
+    def record(item, price):
+        threads.append(threading.current_thread())
+        c.remove("ABC")
+
+    c.fetch_price, c.record = fetch_price, record
+    item["schedule"].next_delay = lambda price: 0
+    asyncio.run(c._poll(("ABC", "NSE")))
+    assert threads and threads[0] is not threading.current_thread()
@@ -0,0 +1,81 @@
+import os
+import threading
+
+import numpy as np
+
+from stockitup.colstore import PRICE_FILE, ColumnIndex, ColumnWriter, drop_before
+
+ROWS = 3000
+
+
+def test_reader_never_sees_a_half_written_row(tmp_path):
+    directory = str(tmp_path / "t.cols")
+    writer = ColumnWriter(directory)
+    reader = ColumnIndex(directory, "T")
+    done = threading.Event()
+    problems = []
+
+    def read():
+        while not done.is_set():
+            ts, prices = reader.refresh()._arrays()
+            if len(ts) != len(prices) or not np.array_equal(ts.astype(np.float64), prices):
+                problems.append(len(ts))
+            elif len(ts) > 1 and np.any(np.diff(ts) <= 0):
+                problems.append("order")
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    try:
+        for t in range(1, ROWS + 1):
+            writer.append(t, float(t))  # price == ts, so a mismatched row shows
+    finally:
+        done.set()
+        thread.join()
+    assert problems == []
+    assert len(reader.refresh().ts) == ROWS
+
+    # a price written without its timestamp (a crash between the two writes) stays invisible
+    with open(os.path.join(directory, PRICE_FILE), "ab") as f:
+        f.write(np.float64(-1).tobytes())
+    assert len(reader.refresh().ts) == ROWS
+    writer.close()
+    writer = ColumnWriter(directory)  # and the next writer trims it
+    writer.append(ROWS + 1, ROWS + 1.0)
+    assert reader.refresh().prices[-1] == ROWS + 1.0
+    writer.close()
+
+
+def test_drop_before_swaps_under_a_running_writer(tmp_path):
+    directory = str(tmp_path / "t.cols")
+    writer = ColumnWriter(directory)
+    for t in range(1, 1001):
+        writer.append(t, float(t))
+    reader = ColumnIndex(directory, "T").refresh()
+
+    stop = threading.Event()
+    appended = []
+
+    def write():
+        t = 1001
+        while not stop.is_set() or t < 1200:
+            writer.append(t, float(t))
+            appended.append(t)
+            t += 1
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    dropped = drop_before(directory, 500)
+    stop.set()
+    thread.join()
+
+    assert dropped == 499
+    assert not os.path.exists(directory + ".old") and not os.path.exists(directory + ".new")
+    ts, prices = reader.refresh()._arrays()
+    # every row at or after the cutoff survived, including those appended mid-swap
+    assert ts.tolist() == list(range(500, appended[-1] + 1))
+    assert np.array_equal(ts.astype(np.float64), prices)
+
+    writer.append(appended[-1] + 1, 0.0)  # the writer follows the swapped-in store
+    assert reader.refresh().ts[-1] == appended[-1] + 1
+    writer.close()
+    assert drop_before(directory, 0) == 0
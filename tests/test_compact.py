@@ -0,0 +1,70 @@
+import json
+import time
+
+from stockitup.candles import RESOLUTIONS, bucket_start, build_candles, candle_path, query_candles
+from stockitup.colstore import ColumnIndex, columns_dir_for, open_columns
+from stockitup.compact import DAY_MS, RETAIN_RAW, compact_log
+from stockitup.ticklog import iter_ticks, parse_ts_ms
+
+HOUR = RESOLUTIONS["1h"]
+STEP = 30 * 60 * 1000
+START = bucket_start(parse_ts_ms("2025-09-01 00:00:00"), DAY_MS)
+DAYS = 15
+
+
+def stamp(ts_ms):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts_ms / 1000))
+
+
+def make_log(tmp_path):
+    """A tick every 30 min for 15 days; 1h candles only from day 3 on, as
+    if the collector had started building them then"""
+    ticks = [(START + i * STEP, 100.0 + i % 7) for i in range(DAYS * DAY_MS // STEP)]
+    log = tmp_path / "T.jsonl"
+    with open(log, "w") as f:
+        for ts, price in ticks:
+            f.write(json.dumps({"ticker": "T", "exchange": "NSE", "price": price, "timestamp": stamp(ts)}) + "\n")
+    ingested = build_candles([t for t in ticks if t[0] >= START + 3 * DAY_MS], HOUR)[:-1]  # the last is still open
+    with open(candle_path(str(log), "1h"), "w") as f:
+        f.writelines(json.dumps(c) + "\n" for c in ingested)
+    return str(log), ticks
+
+
+def test_rolls_up_and_drops_the_head(tmp_path):
+    log, ticks = make_log(tmp_path)
+    columns = open_columns(log, "T")
+    columns.close()
+    tail = open(log, "rb").read()
+    now = ticks[-1][0]
+    cutoff = bucket_start(now - RETAIN_RAW, DAY_MS)
+
+    stats = compact_log(log, now_ms=now)
+    kept = [t for t in ticks if t[0] >= cutoff]
+    assert stats["ticks_dropped"] == len(ticks) - len(kept)
+    # the head went, the rest of the log is byte for byte what it was
+    assert tail.endswith(open(log, "rb").read())
+    assert [parse_ts_ms(e["timestamp"]) for _, e in iter_ticks(log)] == [t[0] for t in kept]
+    assert ColumnIndex(columns_dir_for(log), "T").refresh().ts.tolist() == [t[0] for t in kept]
+
+    # 1h candles: rolled-up history meets the ingested ones with no gap or overlap
+    hours = query_candles(log, "1h")["t"]
+    assert hours == list(range(START, hours[-1] + HOUR, HOUR))
+    assert hours[-1] >= cutoff
+    first = [p for ts, p in ticks if ts < START + HOUR]
+    c = {k: v[0] for k, v in query_candles(log, "1h").items()}
+    assert (c["o"], c["h"], c["l"], c["c"]) == (first[0], max(first), min(first), first[-1])
+    # every resolution reaches back to the first tick
+    assert all(query_candles(log, res)["t"][0] == START for res in RESOLUTIONS)
+
+    again = compact_log(log, now_ms=now)
+    assert (again["ticks_dropped"], again["candles_added"]) == (0, 0)
+
+
+def test_trims_candles_past_their_retention(tmp_path):
+    log, ticks = make_log(tmp_path)
+    now = ticks[-1][0]
+    stats = compact_log(log, candle_retention={"1m": 12 * DAY_MS, "1h": None}, now_ms=now)
+    assert stats["candles_dropped"] > 0
+    minutes = query_candles(log, "1m")["t"]
+    assert minutes and minutes[0] >= now - 12 * DAY_MS
+    assert query_candles(log, "1h")["t"][0] == START
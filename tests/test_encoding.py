@@ -0,0 +1,48 @@
+import math
+
+from stockitup.encoding import EPS, ChangeFilter, expand
+
+
+def test_first_tick_is_stored():
+    assert ChangeFilter(heartbeat=60).classify(0, 100.0) == "tick"
+
+
+def test_unchanged_price_waits_for_heartbeat():
+    change = ChangeFilter(heartbeat=60)
+    change.classify(0, 100.0)
+    assert change.classify(10_000, 100.0) is None
+    assert change.classify(59_999, 100.0) is None
+    assert change.classify(60_000, 100.0) == "heartbeat"
+    # the heartbeat restarts the clock
+    assert change.classify(90_000, 100.0) is None
+    assert change.classify(120_000, 100.0) == "heartbeat"
+
+
+def test_price_move_restarts_heartbeat_clock():
+    change = ChangeFilter(heartbeat=60)
+    change.classify(0, 100.0)
+    assert change.classify(50_000, 101.0) == "tick"
+    assert change.classify(100_000, 101.0) is None
+    assert change.classify(110_000, 101.0) == "heartbeat"
+
+
+def test_moves_within_eps_count_as_unchanged():
+    change = ChangeFilter(heartbeat=60)
+    change.classify(0, 100.0)
+    assert change.classify(1_000, 100.0 + EPS / 2) is None
+    assert change.classify(2_000, 100.0 + EPS * 10) == "tick"
+
+
+def test_expand_forward_fills_and_marks_gaps():
+    grid, values = expand([0, 30_000, 200_000], [1.0, 2.0, 3.0], step_ms=10_000,
+                          start_ms=-10_000, end_ms=200_000, max_gap_ms=120_000)
+    assert grid[0] == -10_000 and grid[-1] == 200_000
+    assert math.isnan(values[0])                 # before the first record
+    assert values[1] == 1.0 and values[4] == 2.0
+    assert math.isnan(values[grid.tolist().index(160_000)])  # feed silent for > max_gap
+    assert values[-1] == 3.0
+
+
+def test_expand_without_gap_limit_on_empty_series():
+    grid, values = expand([], [], step_ms=10_000, start_ms=0, end_ms=30_000, max_gap_ms=None)
+    assert len(grid) == 4 and all(math.isnan(v) for v in values)
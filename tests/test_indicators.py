@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+import pytest
+
+from stockitup.indicators import Indicator, IndicatorSeries, make_indicator
+
+SPECS = ["sma:20", "ema:20", "ema:3", "rsi:14", "bb:20:2", "vol:30"]
+
+
+def walk(n=600, seed=3):
+    rng = np.random.default_rng(seed)
+    prices = 1000 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    if n > 240:
+        prices[200:240] = prices[199]  # a flat run: zero gains, losses and returns
+    return prices
+
+
+def stepwise(spec, prices):
+    indicator = make_indicator(spec)
+    rows = [indicator.update(float(p)) for p in prices]
+    return {name: np.array([row[name] for row in rows]) for name in indicator.outputs}
+
+
+def assert_same(a, b):
+    """Same NaNs, same values to ~8 significant digits (the running sums
+    leave ~1e-9 relative noise in a flat run's Bollinger width)"""
+    assert a.keys() == b.keys()
+    for name in a:
+        np.testing.assert_array_equal(np.isnan(a[name]), np.isnan(b[name]))
+        np.testing.assert_allclose(a[name], b[name], rtol=1e-8, atol=1e-8, equal_nan=True)
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_backfill_matches_update(spec):
+    prices = walk()
+    assert_same(make_indicator(spec).backfill(prices), stepwise(spec, prices))
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_update_carries_on_after_backfill(spec):
+    prices = walk()
+    indicator = make_indicator(spec)
+    head = indicator.backfill(prices[:400])
+    tail = [indicator.update(float(p)) for p in prices[400:]]
+    joined = {name: np.concatenate((head[name], [row[name] for row in tail])) for name in head}
+    assert_same(joined, stepwise(spec, prices))
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_short_histories(spec):
+    for n in (0, 1, 5, 15):
+        prices = walk(n)
+        assert_same(make_indicator(spec).backfill(prices), stepwise(spec, prices))
+
+
+def test_warmup_is_nan():
+    values = make_indicator("sma:20").backfill(walk())["value"]
+    assert np.isnan(values[:19]).all() and not np.isnan(values[19:]).any()
+    assert np.isnan(make_indicator("rsi:14").backfill(walk())["value"][:14]).all()
+
+
+def test_series_folds_in_new_ticks():
+    prices = walk()
+
+    class Index:
+        def __init__(self, n):
+            self.ts, self.prices = list(range(n)), prices[:n].tolist()
+
+        def window(self, span):
+            return self.ts, self.prices
+
+        def since(self, since_ms):
+            return self.ts[since_ms + 1:], self.prices[since_ms + 1:]
+
+    series = IndicatorSeries("bb:20:2", Index(300))
+    series.sync(Index(len(prices)))
+    assert_same({k: np.array(v, dtype=np.float64) for k, v in series.values.items()}, stepwise("bb:20:2", prices))
+
+
+def test_indicator_is_abstract():
+    class Half(Indicator):
+        def update(self, price):
+            return {"value": price}
+
+    with pytest.raises(TypeError):
+        Half()
+    assert math.isnan(make_indicator("ema:5").update(1.0)["value"])
@@ -0,0 +1,66 @@
+import json
+import os
+
+from stockitup.newsindex import NewsIndex
+
+ARTICLES = [  # newest first, as build_news.py writes them
+    {"title": "Gold slips as dollar firms", "topic": "gold price", "source": "Mint", "publishedAt": "2025-09-25T12:00:00Z"},
+    {"title": "Infosys wins a deal", "topic": "infosys", "source": "Reuters", "publishedAt": "2025-09-25T11:00:00Z"},
+    {"title": "Markets close flat", "topic": "markets", "source": "Goldman notes", "publishedAt": "2025-09-25T10:00:00Z"},
+    {"title": "Gold hits a record", "topic": "gold price", "source": "Reuters", "publishedAt": "2025-09-25T09:00:00Z"},
+    {"title": "Silver tracks gold higher", "topic": "silver price", "source": "Mint", "publishedAt": "2025-09-25T08:00:00Z"},
+]
+
+
+def write_news(path, articles):
+    path.write_text(json.dumps(articles))
+    return NewsIndex(str(path)).refresh()
+
+
+def titles(result):
+    return [a["title"] for a in result["results"]]
+
+
+def test_ranks_by_field_weight_then_recency(tmp_path):
+    index = write_news(tmp_path / "news.json", ARTICLES)
+    result = index.search("gold")
+    # title + topic beat title only, which beats a prefix match in the source
+    assert titles(result) == ["Gold slips as dollar firms", "Gold hits a record",
+                              "Silver tracks gold higher", "Markets close flat"]
+    assert result["total"] == 4
+
+
+def test_every_term_must_match(tmp_path):
+    index = write_news(tmp_path / "news.json", ARTICLES)
+    assert titles(index.search("gold reuters")) == ["Gold hits a record"]
+    assert index.search("gold infosys")["total"] == 0
+
+
+def test_prefix_query_matches_its_prefix(tmp_path):
+    index = write_news(tmp_path / "news.json", ARTICLES)
+    assert titles(index.search("infos")) == ["Infosys wins a deal"]
+    assert titles(index.search("gol")) == titles(index.search("gold"))[:3] + ["Markets close flat"]
+    assert index.search("golds")["total"] == 0
+
+
+def test_pages(tmp_path):
+    index = write_news(tmp_path / "news.json", ARTICLES)
+    everything = titles(index.search("gold", 1, 10))
+    assert titles(index.search("gold", 1, 3)) == everything[:3]
+    assert titles(index.search("gold", 2, 3)) == everything[3:]
+    assert titles(index.search("gold", 3, 3)) == []
+    # no query pages through the newest
+    assert titles(index.search("", 2, 2)) == [a["title"] for a in ARTICLES[2:4]]
+
+
+def test_rebuilds_when_the_file_is_rewritten(tmp_path):
+    path = tmp_path / "news.json"
+    index = write_news(path, ARTICLES)
+    assert index.refresh().search("copper")["total"] == 0
+
+    path.write_text(json.dumps([{"title": "Copper rallies", "topic": "copper price", "source": "Mint",
+                                 "publishedAt": "2025-09-26T09:00:00Z"}] + ARTICLES))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert titles(index.refresh().search("copper")) == ["Copper rallies"]
+    assert index.search("")["total"] == len(ARTICLES) + 1
@@ -0,0 +1,31 @@
+import pytest
+
+from stockitup.api import app
+
+REMOTE = {"REMOTE_ADDR": "203.0.113.7"}
+
+
+@pytest.fixture
+def client():
+    token = app.config["OPS_TOKEN"]
+    app.config["OPS_TOKEN"] = None
+    yield app.test_client()
+    app.config["OPS_TOKEN"] = token
+
+
+@pytest.mark.parametrize("url", ["/metrics", "/api/profiler"])
+def test_ops_endpoints_are_local_only(client, url):
+    assert client.get(url).status_code == 200
+    assert client.get(url, environ_base=REMOTE).status_code == 403
+
+
+def test_remote_profiler_start_is_refused(client):
+    resp = client.post("/api/profiler", json={"action": "start"}, environ_base=REMOTE)
+    assert resp.status_code == 403
+
+
+def test_token_is_required_once_set(client):
+    app.config["OPS_TOKEN"] = "s3cret"
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}, environ_base=REMOTE).status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}, environ_base=REMOTE).status_code == 200
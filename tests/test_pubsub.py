@@ -0,0 +1,92 @@
+import socket
+import time
+
+from stockitup.pubsub import StreamServer, TickHub
+from stockitup.ticklog import append_tick
+
+
+def tick(price, second, ticker="LIVE"):
+    return {"ticker": ticker, "exchange": "NSE", "price": price, "timestamp": f"2026-10-16 10:00:{second:02d}"}
+
+
+def test_follower_publishes_ticks_written_elsewhere(tmp_path):
+    log = str(tmp_path / "LIVE.jsonl")
+    append_tick(log, tick(100.0, 0))
+    hub = TickHub(follow_every=3600)  # drive catch_up by hand
+    channel = hub.subscribe("live", log)
+    cursor = hub.start_cursor(channel)
+
+    append_tick(log, tick(101.0, 5))
+    append_tick(log, tick(999.0, 6, ticker="OTHER"))
+    hub.catch_up(channel)
+    messages, cursor = hub.read(channel, cursor)
+    assert [m for _, m in messages] == ['{"ticker":"LIVE","exchange":"NSE","price":101.0,'
+                                        '"timestamp":"2026-10-16 10:00:05","ts":%d}' % channel.last_ts]
+
+    # the same tick from the in-process collector is not pushed twice
+    hub.publish(tick(101.0, 5), log)
+    assert hub.read(channel, cursor)[0] == []
+
+
+def test_follower_resumes_after_compaction(tmp_path):
+    log = tmp_path / "LIVE.jsonl"
+    append_tick(str(log), tick(100.0, 0))
+    hub = TickHub(follow_every=3600)
+    channel = hub.subscribe("LIVE", str(log))
+    append_tick(str(log), tick(101.0, 5))
+    hub.catch_up(channel)
+    cursor = hub.start_cursor(channel)
+
+    rewritten = tmp_path / "LIVE.tmp"
+    rewritten.write_text(log.read_text().splitlines(keepends=True)[-1])
+    rewritten.replace(log)
+    append_tick(str(log), tick(102.0, 10))
+    hub.catch_up(channel)
+    assert [m for _, m in hub.read(channel, cursor)[0]] == [m for _, m in channel.messages][-1:]
+    assert channel.seq == 2
+
+
+def read_until(sock, marker: bytes, timeout=5) -> bytes:
+    sock.settimeout(timeout)
+    data = b""
+    while marker not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_stream_server_pushes_followed_ticks(tmp_path):
+    log = str(tmp_path / "LIVE.jsonl")
+    append_tick(log, tick(100.0, 0))
+
+    def resolve(params):
+        if params.get("ticker") != "LIVE":
+            raise LookupError("No data")
+        return "LIVE", log
+
+    hub = TickHub(follow_every=0.05)
+    server = StreamServer(hub, resolve, keepalive=0.2).start("127.0.0.1", 0)
+
+    with socket.create_connection(("127.0.0.1", server.port)) as missing:
+        missing.sendall(b"GET /api/stream?ticker=NOPE HTTP/1.1\r\nHost: x\r\n\r\n")
+        assert read_until(missing, b"}").startswith(b"HTTP/1.1 404")
+
+    subscribers = []
+    for _ in range(50):
+        sock = socket.create_connection(("127.0.0.1", server.port))
+        sock.sendall(b"GET /api/stream?ticker=LIVE HTTP/1.1\r\nHost: x\r\n\r\n")
+        assert b"text/event-stream" in read_until(sock, b"retry: 5000\n\n")
+        subscribers.append(sock)
+    assert hub.subscribers("LIVE") == 50
+
+    append_tick(log, tick(101.0, 5))
+    for sock in subscribers:
+        assert b'event: tick\ndata: {"ticker":"LIVE","exchange":"NSE","price":101.0' in read_until(sock, b"101.0")
+        sock.close()
+
+    deadline = time.time() + 5
+    while hub.subscribers("LIVE") and time.time() < deadline:
+        time.sleep(0.05)
+    assert hub.subscribers("LIVE") == 0
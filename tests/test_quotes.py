@@ -0,0 +1,28 @@
+import json
+
+from stockitup.quotes import quote_from_log
+from stockitup.series import resolve_log
+
+
+def write_array(path, rows):
+    path.write_text(json.dumps([{"ticker": "OLD", "exchange": "NSE", "price": p, "timestamp": ts} for ts, p in rows]))
+
+
+def test_quote_from_legacy_array(tmp_path):
+    array = tmp_path / "OLD.json"
+    write_array(array, [("2026-10-15 15:20:00", 90.0), ("2026-10-16 09:15:00", 100.0), ("2026-10-16 11:00:00", 105.0)])
+    quote = quote_from_log(str(array))
+    assert quote["price"] == 105.0
+    assert quote["open"] == 100.0
+    assert quote["change_pct"] == 5.0
+
+
+def test_resolve_log_prefers_jsonl_and_sees_new_files(tmp_path):
+    write_array(tmp_path / "OLD.json", [("2026-10-16 09:15:00", 100.0)])
+    assert resolve_log(str(tmp_path), "old") == str(tmp_path / "OLD.json")
+    assert resolve_log(str(tmp_path), "NEW") is None
+
+    (tmp_path / "OLD.jsonl").write_text("")
+    (tmp_path / "NEW.jsonl").write_text("")
+    assert resolve_log(str(tmp_path), "OLD") == str(tmp_path / "OLD.jsonl")
+    assert resolve_log(str(tmp_path), "new") == str(tmp_path / "NEW.jsonl")
@@ -0,0 +1,84 @@
+import json
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from stockitup import schedule
+from stockitup.schedule import CLOSED_CHECK_EVERY, MarketCalendar, PollSchedule
+
+IST = ZoneInfo("Asia/Kolkata")
+
+
+@pytest.fixture
+def calendar(tmp_path):
+    path = tmp_path / "market_calendar.json"
+    path.write_text(json.dumps({
+        "_note": "ignored",
+        "NSE": {"timezone": "Asia/Kolkata", "weekdays": ["Mon", "Tue", "Wed", "Thu", "Fri"],
+                "sessions": [["09:15", "15:30"]], "holidays": ["2026-10-02"],
+                "special_sessions": {"2026-11-08": [["18:00", "19:00"]]}},
+    }))
+    return MarketCalendar(str(path))
+
+
+def ist(*args):
+    return datetime(*args, tzinfo=IST)
+
+
+def test_sessions_weekends_and_holidays(calendar):
+    assert calendar.is_open("NSE", ist(2026, 10, 1, 10, 0))        # Thursday
+    assert not calendar.is_open("NSE", ist(2026, 10, 1, 9, 0))     # before the open
+    assert not calendar.is_open("NSE", ist(2026, 10, 1, 15, 30))   # at the close
+    assert not calendar.is_open("NSE", ist(2026, 10, 2, 10, 0))    # Friday holiday
+    assert not calendar.is_open("NSE", ist(2026, 10, 3, 10, 0))    # Saturday
+    assert calendar.is_open("nse", ist(2026, 11, 8, 18, 30))       # Sunday special session
+    assert calendar.is_open("NYSE", ist(2026, 10, 3, 3, 0))        # not listed: always open
+
+
+def test_next_open_skips_holiday_and_weekend(calendar):
+    assert calendar.next_open("NSE", ist(2026, 10, 1, 16, 0)) == ist(2026, 10, 5, 9, 15)
+    assert calendar.sessions_on("NSE", date(2026, 10, 2)) == []
+
+
+def at(monkeypatch, now):
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.astimezone(tz)
+
+    monkeypatch.setattr(schedule, "datetime", Clock)
+
+
+def test_closed_for(calendar, monkeypatch):
+    poll = PollSchedule("TCS", "NSE", 10, 60, calendar)
+    at(monkeypatch, ist(2026, 10, 1, 10, 0))
+    assert poll.closed_for() == 0
+    at(monkeypatch, ist(2026, 10, 1, 9, 14, 30))
+    assert poll.closed_for() == 30
+    at(monkeypatch, ist(2026, 10, 2, 10, 0))  # holiday: capped, so calendar edits are seen
+    assert poll.closed_for() == CLOSED_CHECK_EVERY
+    at(monkeypatch, ist(2026, 10, 1, 10, 0).astimezone(timezone.utc))
+    assert PollSchedule("TCS", "NSE", 10, 60).closed_for() == 0  # no calendar: never closed
+
+
+def test_backoff_ceiling_and_reset():
+    poll = PollSchedule("TCS", "NSE", 10, 60)
+    assert poll.next_delay(100.0) == 10
+    assert [poll.next_delay(100.0) for _ in range(4)] == [20, 40, 60, 60]
+    assert poll.next_delay(None) == 60   # a failed poll doesn't reset the backoff
+    assert poll.next_delay(100.5) == 10  # the price moved
+    assert poll.next_delay(None) == 20
+    assert poll.next_delay(100.5) == 40  # compared with the last real price
+
+    assert [PollSchedule("TCS", "NSE", 10, 60, adaptive=False).next_delay(1.0) for _ in range(3)] == [10, 10, 10]
+    assert PollSchedule("TCS", "NSE", 30, 5).slowest == 30
+
+
+def test_closing_resets_the_backoff(calendar, monkeypatch):
+    poll = PollSchedule("TCS", "NSE", 10, 60, calendar)
+    for _ in range(5):
+        poll.next_delay(100.0)
+    at(monkeypatch, ist(2026, 10, 3, 10, 0))
+    poll.closed_for()
+    assert poll.interval == 10
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+from stockitup.series import TickIndex, query_series
+from stockitup.ticklog import append_tick, parse_ts_ms
+
+START = datetime(2026, 10, 16, 10, 0, 0)
+
+
+def write_log(path, prices, step_s=5):
+    for i, price in enumerate(prices):
+        ts = (START + timedelta(seconds=i * step_s)).strftime("%Y-%m-%d %H:%M:%S")
+        append_tick(str(path), {"ticker": "FLAT", "exchange": "NSE", "price": price, "timestamp": ts})
+    return [parse_ts_ms((START + timedelta(seconds=i * step_s)).strftime("%Y-%m-%d %H:%M:%S"))
+            for i in range(len(prices))]
+
+
+def test_cursor_is_newest_tick_after_flat_run(tmp_path):
+    log = tmp_path / "FLAT.jsonl"
+    stamps = write_log(log, [100.0, 101.0] + [102.0] * 20)
+    result = query_series(TickIndex(str(log), "FLAT").refresh(), "1H")
+    assert result["prices"] == [100.0, 101.0, 102.0]
+    assert result["timestamps"][-1] == stamps[2]
+    assert result["cursor"] == stamps[-1]
+
+
+def test_flat_delta_catches_up_in_one_poll(tmp_path):
+    log = tmp_path / "FLAT.jsonl"
+    stamps = write_log(log, [100.0] * 30)
+    index = TickIndex(str(log), "FLAT").refresh()
+
+    delta = query_series(index, "1H", since=stamps[0])
+    assert delta["prices"] == [100.0]
+    assert delta["cursor"] == stamps[-1]
+
+    caught_up = query_series(index, "1H", since=delta["cursor"])
+    assert caught_up["timestamps"] == []
+    assert caught_up["cursor"] == stamps[-1]
@@ -0,0 +1,64 @@
+import importlib
+import io
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("pptx")  # react/slide.py imports python-pptx at module level
+
+
+class FakePool:
+    """Stands in for the process pool: jobs stay pending until finished by hand"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+
+@pytest.fixture
+def slide(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # importing creates uploads/ and static/slides/ in the cwd
+    module = importlib.import_module("react.slide")
+    for name in ("UPLOAD_FOLDER", "SLIDES_FOLDER"):
+        folder = tmp_path / name.lower()
+        folder.mkdir()
+        monkeypatch.setattr(module, name, str(folder))
+    pool = FakePool()
+    monkeypatch.setattr(module, "get_pool", lambda: pool)
+    monkeypatch.setattr(module, "MAX_PENDING", 2)
+    monkeypatch.setattr(module, "jobs", {})
+    module.pool = pool
+    return module
+
+
+def upload(client, data):
+    return client.post("/", data={"pptx": (io.BytesIO(data), "deck.pptx")},
+                       headers={"Accept": "application/json"}, content_type="multipart/form-data")
+
+
+def test_same_deck_joins_the_pending_job(slide):
+    first = slide.submit_job("deck1", "deck1.pptx", "deck1.pptx")
+    assert slide.submit_job("deck1", "deck1.pptx", "deck1.pptx") == first
+    assert len(slide.pool.futures) == 1
+
+    slide.pool.futures[0].set_result({"deck": "deck1", "slides": []})
+    assert slide.submit_job("deck1", "deck1.pptx", "deck1.pptx") != first  # finished: a new conversion
+
+
+def test_full_queue_answers_503(slide):
+    client = slide.app.test_client()
+    assert upload(client, b"deck one").status_code == 202
+    again = upload(client, b"deck one")
+    assert again.status_code == 202 and len(slide.pool.futures) == 1  # same content, same job
+    assert upload(client, b"deck two").status_code == 202
+
+    busy = upload(client, b"deck three")
+    assert busy.status_code == 503
+    assert len(slide.pool.futures) == 2
+
+    slide.pool.futures[0].set_exception(RuntimeError("libreoffice failed"))
+    assert upload(client, b"deck three").status_code == 202
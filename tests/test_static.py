@@ -0,0 +1,14 @@
+import pytest
+
+from stockitup.api import app
+
+
+@pytest.mark.parametrize("url", ["/", "/stock.js", "/bronze/index.html", "/bronze.json", "/Company-Jsons/AAPL.json"])
+def test_page_files_are_served(url):
+    assert app.test_client().get(url).status_code == 200
+
+
+@pytest.mark.parametrize("url", ["/.git/config", "/.git/HEAD", "/requests.jsonl", "/watchlist.json", "/server.py",
+                                 "/stockitup/api.py", "/homepage.index/stock.py", "/bronze/../.git/config"])
+def test_everything_else_is_404(url):
+    assert app.test_client().get(url).status_code == 404
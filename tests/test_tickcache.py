@@ -0,0 +1,74 @@
+import numpy as np
+
+from stockitup.tickcache import TickCache, TickRing
+
+
+class FakeIndex:
+    def __init__(self, ts):
+        self.path = "fake.jsonl"
+        self.ts = np.asarray(ts, dtype=np.int64)
+
+    def refresh(self):
+        return self
+
+    def window(self, span):
+        return self.ts, self.ts.astype(np.float64)
+
+
+def ring_bytes(capacity):
+    return capacity * TickRing.ROW_BYTES
+
+
+def test_evicts_least_recently_read_ticker():
+    cache = TickCache(budget_bytes=3 * ring_bytes(10), capacity=10)
+    assert cache.max_rings == 3
+    for ticker in ("A", "B", "C"):
+        cache.load(ticker, FakeIndex([1, 2]))
+    assert cache.get("A") is not None  # A is now the most recent; B the coldest
+    cache.load("D", FakeIndex([1, 2]))
+    assert cache.get("B") is None
+    assert all(cache.get(t) is not None for t in ("A", "C", "D"))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_budget_bounds_the_rings():
+    budget = 5 * ring_bytes(100) + ring_bytes(100) // 2  # room for five and a half rings
+    cache = TickCache(budget_bytes=budget, capacity=100)
+    for i in range(20):
+        cache.load(f"T{i}", FakeIndex(range(100)))
+    stats = cache.stats()
+    assert stats["tickers"] == 5
+    assert stats["bytes"] <= budget
+    assert stats["evictions"] == 15
+    assert [t for t in (f"T{i}" for i in range(20)) if cache.get(t, span_ms=0)] == [f"T{i}" for i in range(15, 20)]
+    # a budget too small for one ring still keeps one
+    assert TickCache(budget_bytes=1, capacity=100).max_rings == 1
+
+
+def test_ring_wraps_around_in_order():
+    ring = TickRing("T", "fake.jsonl", capacity=5)
+    ring.seed([1, 2, 3], [1.0, 2.0, 3.0], complete=True)
+    assert ring.covers(since_ms=0)
+    for t in range(4, 13):
+        ring.append(t, float(t))
+    ts, prices = ring.window(None)
+    assert ts.tolist() == [8, 9, 10, 11, 12]
+    assert prices.tolist() == [8.0, 9.0, 10.0, 11.0, 12.0]
+    assert not ring.complete  # history fell off the end
+    assert ring.since(9)[0].tolist() == [10, 11, 12]
+    assert ring.bounds(2) == (10, 12, 3)
+    assert ring.covers(since_ms=8) and not ring.covers(since_ms=7)
+    assert ring.covers(span_ms=4) and not ring.covers(span_ms=5)
+    assert ring.version == "5-12-12.0"
+    ring.append(11, 0.0)  # out of order: ignored
+    assert ring.latest_ts == 12
+
+
+def test_appends_only_reach_cached_tickers():
+    cache = TickCache(budget_bytes=ring_bytes(10), capacity=10)
+    cache.append({"ticker": "A", "price": 1.0, "timestamp": "2025-09-25 10:00:00"})
+    assert cache.get("A") is None
+    cache.load("a", FakeIndex([]))
+    cache.append({"ticker": "A", "price": 2.0, "timestamp": "2025-09-25 10:00:00"})
+    assert cache.get("A", since_ms=0).window(None)[1].tolist() == [2.0]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1